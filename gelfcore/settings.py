@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'gelfmp.middleware.AdminLoginRedirectMiddleware',
+    'gelfmp.middleware.ChartDataMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -103,6 +104,23 @@ CACHES = {
     }
 }
 
+# Diretório dos vector tiles (MVT) gerados pela API de tiles.
+TILE_CACHE_DIR = BASE_DIR / '.cache' / 'tiles'
+
+# Cópia opcional (DuckDB) das tabelas usadas pelos painéis, atualizada pelo comando sync_analytics.
+# Com ANALYTICS_BACKEND=duckdb, as agregações dos gráficos são feitas nela em vez do SQLite.
+ANALYTICS_BACKEND = env.str('ANALYTICS_BACKEND', 'sqlite')
+ANALYTICS_DB_PATH = BASE_DIR / '.cache' / 'analytics.duckdb'
+
+# Dias em que os registros de exclusão (Tombstone) são mantidos pelo comando prune_tombstones. Clientes
+# da sincronização incremental com `since` anterior a esse período precisam sincronizar tudo novamente.
+TOMBSTONE_RETENTION_DAYS = env.int('TOMBSTONE_RETENTION_DAYS', 90)
+
+# Diretórios dos limites de estados e municípios: os arquivos originais
+# e as versões simplificadas geradas pelo comando build_boundary_layers.
+BOUNDARY_SOURCE_DIR = BASE_DIR / 'static' / 'data' / 'geojson'
+BOUNDARY_LAYERS_DIR = BASE_DIR / 'static' / 'data' / 'boundaries'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
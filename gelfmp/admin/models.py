@@ -75,6 +75,18 @@ class DocumentAdmin(BaseModelAdmin):
     autocomplete_fields = ('supplier',)
 
     actions = ['delete_files']
+    readonly_fields = (
+        'geometry_status',
+        'geometry_error',
+        'min_lon',
+        'min_lat',
+        'max_lon',
+        'max_lat',
+        'centroid_lon',
+        'centroid_lat',
+        'area_ha',
+        'vertex_count',
+    )
 
     fieldsets = (
         (
@@ -91,8 +103,18 @@ class DocumentAdmin(BaseModelAdmin):
             },
         ),
         (
-            '',
-            {'fields': ('geojson',)},
+            'Geometria',
+            {
+                'classes': ('collapse',),
+                'fields': (
+                    'geometry_status',
+                    'geometry_error',
+                    ('min_lon', 'min_lat'),
+                    ('max_lon', 'max_lat'),
+                    ('centroid_lon', 'centroid_lat'),
+                    ('area_ha', 'vertex_count'),
+                ),
+            },
         ),
     )
 
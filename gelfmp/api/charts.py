@@ -1,10 +1,14 @@
 import hashlib
+from datetime import date
 from inspect import getmembers, isfunction, signature
+from urllib.parse import urlencode
 
-from django.http import HttpRequest, JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpRequest, HttpResponse, JsonResponse
 
 from gelfcore.logger import log
 from gelfmp.charts import charts
+from gelfmp.services import chart_cache
 
 CHARTS = {name: chart_func for name, chart_func in getmembers(charts, isfunction)}
 CHART_ARGS = {name: set(signature(chart_func).parameters.keys()) for name, chart_func in CHARTS.items()}
@@ -20,20 +24,95 @@ def generate_cache_key(chart_id, args):
     return cache_key
 
 
+def normalize_chart_args(args):
+    """
+    Normaliza os parâmetros do gráfico para a chave de cache, incluindo a versão do cache
+    e a data atual, já que os gráficos usam períodos relativos ao dia (ex: últimos 3 meses).
+    """
+
+    normalized = sorted(args.items())
+    return f'{chart_cache.get_version()}:{date.today().isoformat()}:{urlencode(normalized)}'
+
+
+def get_chart_data(chart_id, params):
+    """
+    Gera (ou busca no cache) o gráfico `chart_id` usando apenas os parâmetros aceitos pela
+    função do gráfico. Retorna os dados do gráfico e se eles vieram do cache.
+    """
+
+    chart_function = CHARTS[chart_id]
+    chart_function_accepted_args = CHART_ARGS[chart_id]
+
+    args = {arg: value for arg, value in params.items() if arg in chart_function_accepted_args}
+
+    cache_key = generate_cache_key(chart_id, normalize_chart_args(args))
+    return chart_cache.get_or_build(cache_key, lambda: chart_function(**args))
+
+
 def update_chart(request: HttpRequest):
     try:
         chart_id = request.GET.get('chart_id')
         if not chart_id or chart_id not in CHARTS:
             return JsonResponse({'error': 'Missing or invalid chart_id'}, status=400)
 
-        chart_function = CHARTS[chart_id]
-        chart_function_accepted_args = CHART_ARGS[chart_id]
+        updated_chart_json, hit = get_chart_data(chart_id, request.GET)
+
+        return JsonResponse(
+            {'chart_data': updated_chart_json},
+            safe=False,
+            headers={'X-Cache': 'HIT' if hit else 'MISS'},
+        )
+
+    except Exception as e:
+        log.error(str(e))
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def chart_html(request: HttpRequest):
+    """
+    Retorna o html do gráfico `chart_id` para ser carregado via htmx, permitindo
+    que as páginas de gráficos sejam renderizadas antes dos gráficos serem gerados.
+    """
+
+    try:
+        chart_id = request.GET.get('chart_id')
+        if not chart_id or chart_id not in CHARTS:
+            return JsonResponse({'error': 'Missing or invalid chart_id'}, status=400)
+
+        chart, hit = get_chart_data(chart_id, {**request.GET.dict(), 'html': True})
 
-        args = {arg: value for arg, value in request.GET.items() if arg in chart_function_accepted_args}
+        return HttpResponse(chart, headers={'X-Cache': 'HIT' if hit else 'MISS'})
 
-        updated_chart_json = chart_function(**args)
-        return JsonResponse({'chart_data': updated_chart_json}, safe=False)
+    except Exception as e:
+        log.error(str(e))
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def batch_charts(request: HttpRequest):
+    """
+    Gera vários gráficos com os mesmos parâmetros em uma única requisição (`chart_id` repetido).
+    Os gráficos de entradas de carvão compartilham a mesma agregação dentro da requisição.
+    """
+
+    try:
+        chart_ids = list(dict.fromkeys(request.GET.getlist('chart_id')))
+        if not chart_ids or any(chart_id not in CHARTS for chart_id in chart_ids):
+            return JsonResponse({'error': 'Missing or invalid chart_id'}, status=400)
+
+        charts_data = {}
+        hits = 0
+
+        for chart_id in chart_ids:
+            charts_data[chart_id], hit = get_chart_data(chart_id, request.GET)
+            hits += hit
+
+        return JsonResponse({'charts': charts_data}, headers={'X-Cache-Hits': f'{hits}/{len(chart_ids)}'})
 
     except Exception as e:
         log.error(str(e))
         return JsonResponse({'error': str(e)}, status=500)
+
+
+@staff_member_required
+def chart_cache_stats(request: HttpRequest):
+    return JsonResponse(chart_cache.get_stats())
@@ -0,0 +1,94 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from gelfmp.models import Tombstone
+from gelfmp.services import data_version
+
+# Tempo máximo (em segundos) em que o fingerprint fica em cache. A versão dos dados muda a cada
+# gravação pelo ORM; o limite cobre alterações que não passam pelos sinais (ex: `QuerySet.update`).
+FINGERPRINT_CACHE_TIMEOUT = 60
+
+
+def compute_models_fingerprint(models):
+    last_modified = None
+    parts = []
+
+    for model in models:
+        state = model.objects.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        parts.append(f'{model._meta.label}:{state["count"]}:{state["last_modified"]}')
+
+        if state['last_modified'] and (last_modified is None or state['last_modified'] > last_modified):
+            last_modified = state['last_modified']
+
+    # As exclusões não alteram o `updated_at` dos registros restantes, então a data
+    # do último Tombstone dos modelos também conta como uma modificação.
+    labels = [model._meta.label for model in models]
+    deleted = Tombstone.objects.filter(model__in=labels).order_by().aggregate(mark=Max('created_at'))['mark']
+    parts.append(f'deleted:{deleted}')
+
+    if deleted and (last_modified is None or deleted > last_modified):
+        last_modified = deleted
+
+    etag = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+def get_models_fingerprint(models):
+    """
+    Retorna um hash da contagem e da última atualização dos registros dos modelos informados e a
+    data da última modificação, incluindo as exclusões. O resultado fica em cache na versão atual
+    dos dados, que muda a cada gravação, evitando as agregações a cada requisição.
+    """
+
+    labels = ','.join(model._meta.label for model in models)
+    cache_key = f'models_fingerprint_{data_version.get_version()}_{labels}'
+
+    if cached := cache.get(cache_key):
+        return cached
+
+    fingerprint = compute_models_fingerprint(models)
+    cache.set(cache_key, fingerprint, FINGERPRINT_CACHE_TIMEOUT)
+
+    return fingerprint
+
+
+def conditional_on(*models):
+    """
+    Decorador que adiciona os validadores ETag e Last-Modified à view com base
+    nos modelos informados, respondendo 304 sem executar a view caso os dados
+    não tenham mudado desde a última requisição do cliente.
+
+    O ETag também inclui os parâmetros da requisição (ex: `fields`, filtros), já
+    que cada combinação gera uma representação diferente dos mesmos dados.
+    """
+
+    def get_fingerprint(request, *args, **kwargs):
+        # Calcula o fingerprint uma única vez por requisição,
+        # já que ele é usado tanto para o ETag quanto para o Last-Modified.
+        if not hasattr(request, '_models_fingerprint'):
+            etag, last_modified = get_models_fingerprint(models)
+
+            # Parâmetros ordenados pelo nome, para que a ordem na URL não altere o ETag.
+            params = urlencode(sorted(request.GET.lists()), doseq=True)
+            etag = hashlib.md5(f'{etag}|{params}'.encode()).hexdigest()
+
+            request._models_fingerprint = etag, last_modified
+
+        return request._models_fingerprint
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: get_fingerprint(request)[0],
+            last_modified_func=lambda request, *args, **kwargs: get_fingerprint(request)[1],
+        )(view)
+
+        # Força o navegador a revalidar a resposta em toda requisição,
+        # em vez de reutilizar a cópia em cache por heurística.
+        return cache_control(no_cache=True)(conditional_view)
+
+    return decorator
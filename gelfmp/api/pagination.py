@@ -0,0 +1,72 @@
+import base64
+import binascii
+
+import orjson
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values):
+    """Codifica os valores da chave de ordenação em um cursor opaco para a URL."""
+
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decodifica um cursor gerado por `encode_cursor`, validando a quantidade de valores."""
+
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError('Cursor inválido.')
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor inválido.')
+
+    return values
+
+
+def parse_page_size(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+
+    try:
+        page_size = int(value)
+    except ValueError:
+        raise ValueError('O parâmetro `limit` deve ser um número inteiro.')
+
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f'O parâmetro `limit` deve estar entre 1 e {MAX_PAGE_SIZE}.')
+
+    return page_size
+
+
+def keyset_paginate(queryset, fields, cursor, page_size):
+    """
+    Pagina o queryset pela chave composta `fields` (ordem crescente), retornando
+    os registros da página e o cursor da próxima página (ou None na última).
+    """
+
+    queryset = queryset.order_by(*fields)
+
+    if cursor:
+        values = decode_cursor(cursor, len(fields))
+
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        for index, field in enumerate(fields):
+            equal_prefix = {prefix: value for prefix, value in zip(fields[:index], values)}
+            condition |= Q(**equal_prefix, **{f'{field}__gt': values[index]})
+
+        queryset = queryset.filter(condition)
+
+    page = list(queryset[: page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+
+    page = page[:page_size]
+    last = page[-1]
+
+    return page, encode_cursor(*(getattr(last, field) for field in fields))
@@ -1,111 +1,456 @@
 import re
 
-from django.http import HttpRequest, JsonResponse
+import orjson
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Prefetch, Q, TextField
+from django.db.models.functions import Cast
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from gelfmp.models import CharcoalEntry, Document, DocumentType, Supplier
+from gelfmp.api.conditional import conditional_on, get_models_fingerprint
+from gelfmp.api.pagination import keyset_paginate, parse_page_size
+from gelfmp.models import (
+    CharcoalEntry,
+    CharcoalIQF,
+    Document,
+    DocumentGeometry,
+    Supplier,
+    SupplierSummary,
+    Tombstone,
+)
+from gelfmp.models.choices import SHAPEFILE_DOCUMENT_TYPES
+from gelfmp.models.document import EXTENT_FIELDS, MEASUREMENT_FIELDS
+from gelfmp.services import document_geometry, geojson, shapefile_index, topology
+from gelfmp.utils.streaming import STREAM_CHUNK_SIZE, StreamingJSONArrayResponse, raw_json
 
+# Modelos dos quais as respostas de shapefiles dependem.
+SHAPEFILE_MODELS = (Supplier, Document, DocumentGeometry)
 
-def get_charcoal_recent_stats(recent_entries):
-    if recent_entries:
-        last_date = recent_entries[0].entry_date.strftime('%d/%m/%Y')
-        first_date = recent_entries[-1].entry_date.strftime('%d/%m/%Y')
+TOPOLOGY_CACHE_TIMEOUT = 60 * 60 * 24  # 24 horas
+
+
+def get_charcoal_recent_stats(summary: SupplierSummary | None):
+    if summary and summary.entries_count:
+        last_date = summary.last_entry_date.strftime('%d/%m/%Y')
+        first_date = summary.first_entry_date.strftime('%d/%m/%Y')
 
         return {
-            'average_moisture': sum(entry.moisture for entry in recent_entries) / len(recent_entries),
-            'average_fines': sum(entry.fines for entry in recent_entries) / len(recent_entries),
-            'average_density': sum(entry.density for entry in recent_entries) / len(recent_entries),
+            'average_moisture': summary.average_moisture,
+            'average_fines': summary.average_fines,
+            'average_density': summary.average_density,
             'period': f'{first_date} - {last_date}',
-            'count': len(recent_entries),
+            'count': summary.entries_count,
         }
 
     return None
 
 
+def get_rating(summary: SupplierSummary | None):
+    if summary and summary.rating is not None:
+        return f'{summary.rating:.1f}'
+
+    return None
+
+
+def get_summary(supplier: Supplier):
+    return getattr(supplier, 'summary', None)
+
+
+def serialize_documents(supplier: Supplier):
+    return [
+        {
+            'id': document.id,
+            'name': document.name,
+            'type': document.get_document_type_display(),
+            'filepath': document.file.url,
+            'validity': document.validity,
+        }
+        for document in supplier.visible_documents
+    ]
+
+
+# Campos que podem ser selecionados através do parâmetro `fields`,
+# na ordem em que aparecem na resposta.
+SUPPLIER_FIELDS = {
+    'id': lambda supplier: supplier.id,
+    'corporate_name': lambda supplier: supplier.corporate_name,
+    'cpf_cnpj': lambda supplier: supplier.cpf_cnpj,
+    'material_type': lambda supplier: supplier.material_type,
+    'rating': lambda supplier: get_rating(get_summary(supplier)),
+    'state': lambda supplier: {'abbr': supplier.state.abbr, 'name': supplier.state.name},
+    'city': lambda supplier: {'id': supplier.city.id, 'name': supplier.city.name},
+    'distance_in_meters': lambda supplier: supplier.distance_in_meters,
+    'documents': serialize_documents,
+    'charcoal_recent_stats': lambda supplier: get_charcoal_recent_stats(get_summary(supplier)),
+}
+
+# Relacionamentos necessários para cada campo.
+SUPPLIER_FIELDS_RELATED = {
+    'rating': 'summary',
+    'charcoal_recent_stats': 'summary',
+    'state': 'state',
+    'city': 'city',
+}
+
+# Filtros aceitos como parâmetros e o campo correspondente no modelo.
+SUPPLIER_FILTERS = {
+    'material_type': 'material_type',
+    'supplier_type': 'supplier_type',
+    'state': 'state_id',
+    'city': 'city_id',
+    'active': 'active',
+}
+
+SUPPLIER_PAGINATION_KEY = ('corporate_name', 'id')
+
+
+def serialize_supplier(supplier: Supplier, fields=SUPPLIER_FIELDS):
+    return {field: SUPPLIER_FIELDS[field](supplier) for field in fields}
+
+
+def parse_supplier_fields(value):
+    if not value:
+        return list(SUPPLIER_FIELDS)
+
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    if invalid := requested - SUPPLIER_FIELDS.keys():
+        raise ValueError(f'Campos inválidos: {", ".join(sorted(invalid))}.')
+
+    return [field for field in SUPPLIER_FIELDS if field in requested]
+
+
+def parse_supplier_filters(params):
+    filters = {}
+
+    for param, field in SUPPLIER_FILTERS.items():
+        value = params.get(param)
+        if value is None:
+            continue
+
+        if param == 'active':
+            if value.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError('O parâmetro `active` deve ser true ou false.')
+
+            value = value.lower() in ('true', '1')
+
+        elif param == 'state':
+            value = value.upper()
+
+        filters[field] = value
+
+    return filters
+
+
+def get_suppliers_queryset(fields, filters):
+    """Monta o queryset de fornecedores carregando apenas o necessário para os campos pedidos."""
+
+    suppliers = Supplier.objects.filter(**filters)
+
+    related = {SUPPLIER_FIELDS_RELATED[field] for field in fields if field in SUPPLIER_FIELDS_RELATED}
+    if related:
+        suppliers = suppliers.select_related(*sorted(related))
+
+    if 'documents' in fields:
+        visible_documents = Document.objects.filter(visible=True).only(
+            'id',
+            'name',
+            'document_type',
+            'file',
+            'validity',
+            'supplier_id',
+        )
+
+        suppliers = suppliers.prefetch_related(
+            Prefetch('documents', queryset=visible_documents, to_attr='visible_documents')
+        )
+
+    return suppliers
+
+
+@conditional_on(Supplier, SupplierSummary, Document, CharcoalEntry, CharcoalIQF)
 def get_suppliers(request: HttpRequest):
+    """
+    Lista os fornecedores. Aceita os parâmetros:
+
+    - `fields`: campos retornados, separados por vírgula (padrão: todos).
+    - `material_type`, `supplier_type`, `state`, `city` e `active`: filtros.
+    - `limit` e `cursor`: paginação por (razão social, id). Quando há uma próxima
+      página, o cursor dela é enviado no header `X-Next-Cursor`.
+    """
+
     try:
-        suppliers = Supplier.objects.select_related('city', 'state').all()
-        data = []
+        fields = parse_supplier_fields(request.GET.get('fields'))
+        filters = parse_supplier_filters(request.GET)
+        suppliers = get_suppliers_queryset(fields, filters)
+
+        if 'limit' not in request.GET and 'cursor' not in request.GET:
+            return StreamingJSONArrayResponse(
+                serialize_supplier(supplier, fields)
+                for supplier in suppliers.order_by(*SUPPLIER_PAGINATION_KEY).iterator(chunk_size=STREAM_CHUNK_SIZE)
+            )
+
+        page, next_cursor = keyset_paginate(
+            suppliers,
+            SUPPLIER_PAGINATION_KEY,
+            request.GET.get('cursor'),
+            parse_page_size(request.GET.get('limit')),
+        )
+
+        response = StreamingJSONArrayResponse(serialize_supplier(supplier, fields) for supplier in page)
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+
+        return response
+
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def parse_since(value):
+    if not value:
+        raise ValueError('O parâmetro `since` é obrigatório.')
+
+    since = parse_datetime(value)
+    if not since:
+        raise ValueError('O parâmetro `since` deve ser uma data/hora no formato ISO 8601.')
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    return since
+
+
+def changed_since(since):
+    """
+    Condição que identifica fornecedores cujo próprio registro, documentos,
+    entradas, IQFs ou resumo foram alterados (ou excluídos) após `since`.
+    """
+
+    related_changes = Q()
+    for model in (Document, CharcoalEntry, CharcoalIQF, SupplierSummary):
+        related_changes |= Exists(model.objects.filter(supplier=OuterRef('pk'), updated_at__gt=since))
+
+    deleted_children = Tombstone.objects.filter(created_at__gt=since, supplier_id__isnull=False).exclude(
+        model=Supplier._meta.label
+    )
+
+    return Q(updated_at__gt=since) | related_changes | Q(id__in=deleted_children.values('supplier_id'))
 
-        for supplier in suppliers:
-            recent_entries = list(CharcoalEntry.objects.filter(supplier=supplier).order_by('-entry_date')[:30])
-            charcoal_recent_stats = get_charcoal_recent_stats(recent_entries)
 
-            # Calcula a média dos ultimos 3 IQFs existentes,
-            # caso não existam, define rating como None.
-            iqfs = supplier.get_iqfs().all()[:3].values_list('iqf', flat=True)
-            rating = f'{round(sum(iqfs) / len(iqfs), 1):.1f}' if len(iqfs) == 3 else None
+def get_supplier_changes(request: HttpRequest):
+    """
+    Retorna os fornecedores alterados após `since` e os IDs dos fornecedores excluídos.
+    O valor de `until` deve ser usado como `since` na próxima sincronização.
 
-            supplier_visible_documents = [
+    Os registros de exclusão são mantidos apenas por TOMBSTONE_RETENTION_DAYS, então um `since`
+    mais antigo recebe 410 e o cliente precisa buscar todos os fornecedores novamente.
+    """
+
+    try:
+        until = timezone.now()
+        since = parse_since(request.GET.get('since'))
+        fields = parse_supplier_fields(request.GET.get('fields'))
+
+        if since < Tombstone.retention_start():
+            return JsonResponse(
                 {
-                    'id': document.id,
-                    'name': document.name,
-                    'type': document.get_document_type_display(),
-                    'filepath': document.file.url,
-                    'validity': document.validity,
-                }
-                for document in supplier.get_visible_documents()
-            ]
-
-            supplier_data = {
-                'id': supplier.id,
-                'corporate_name': supplier.corporate_name,
-                'cpf_cnpj': supplier.cpf_cnpj,
-                'material_type': supplier.material_type,
-                'rating': rating,
-                'state': {
-                    'abbr': supplier.state.abbr,
-                    'name': supplier.state.name,
-                },
-                'city': {
-                    'id': supplier.city.id,
-                    'name': supplier.city.name,
+                    'error': 'As exclusões anteriores a `since` já foram descartadas. Sincronize tudo novamente.',
+                    'full_resync': True,
                 },
-                'distance_in_meters': supplier.distance_in_meters,
-                'documents': supplier_visible_documents,
-                'charcoal_recent_stats': charcoal_recent_stats,
-            }
+                status=410,
+            )
+
+        suppliers = get_suppliers_queryset(fields, {}).filter(changed_since(since)).order_by(*SUPPLIER_PAGINATION_KEY)
+
+        deleted = Tombstone.objects.filter(model=Supplier._meta.label, created_at__gt=since).values_list(
+            'object_id', flat=True
+        )
+
+        data = {
+            'since': since,
+            'until': until,
+            'changed': [serialize_supplier(supplier, fields) for supplier in suppliers],
+            'deleted': list(deleted),
+        }
 
-            data.append(supplier_data)
+        return HttpResponse(orjson.dumps(data), content_type='application/json')
 
-        return JsonResponse(data, safe=False)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def parse_geometry_level(params):
+    """
+    Define o nível de geometria a partir dos parâmetros `zoom` ou `tolerance`.
+    Sem nenhum deles, o GeoJSON é enviado na resolução original (None).
+    """
+
+    if zoom := params.get('zoom'):
+        try:
+            return geojson.level_for_zoom(int(zoom))
+        except ValueError:
+            raise ValueError('O parâmetro `zoom` deve ser um número inteiro.')
+
+    if tolerance := params.get('tolerance'):
+        try:
+            return geojson.level_for_tolerance(float(tolerance))
+        except ValueError:
+            raise ValueError('O parâmetro `tolerance` deve ser um número.')
+
+    return None
+
+
+def get_shapefile_rows(condition, geojson_expression):
+    """Percorre os shapefiles que atendem à condição, primeiro os de propriedade."""
+
+    for document_type in SHAPEFILE_DOCUMENT_TYPES:
+        documents = (
+            Document.objects
+            .filter(condition, document_type=document_type)
+            .annotate(shapefile_geojson=geojson_expression)
+            .values_list('id', 'name', 'supplier__corporate_name', 'shapefile_geojson')
+        )
+
+        yield from documents.iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+
+def iter_shapefiles(condition, level=None):
+    """
+    Envia o GeoJSON dos shapefiles exatamente como está armazenado no banco, sem decodificá-lo.
+    Documentos cujas geometrias simplificadas ainda não foram geradas são enviados na resolução original.
+    """
+
+    raw_geojson = Cast(document_geometry.document_geojson(level), TextField())
+
+    for id, name, supplier_name, geojson_text in get_shapefile_rows(condition, raw_geojson):
+        yield {
+            'supplier_name': supplier_name,
+            'id': id,
+            'name': name,
+            'geojson': raw_json(geojson_text),
+        }
+
+
+def get_state_topology(state, level):
+    """
+    Retorna a topologia (TopoJSON) dos shapefiles do estado. O resultado fica em cache
+    e a chave inclui o fingerprint dos modelos, então muda quando os documentos mudam.
+    """
+
+    version, _ = get_models_fingerprint(SHAPEFILE_MODELS)
+    cache_key = f'shapefiles_topology_{state}_{level}_{version}'
+
+    if cached := cache.get(cache_key):
+        return cached
+
+    shapefiles = get_shapefile_rows(Q(supplier__state=state), document_geometry.document_geojson(level))
+    encoded = topology.encode_topology(row for row in shapefiles if row[3])
+
+    cache.set(cache_key, encoded, TOPOLOGY_CACHE_TIMEOUT)
+
+    return encoded
+
+
+@conditional_on(*SHAPEFILE_MODELS)
 def get_state_shapefiles(request: HttpRequest, state):
     if not re.match(r'^[A-Z]{2}$', state):
         return JsonResponse({'error': 'Invalid state code.'}, status=400)
 
-    property_shapefiles = Document.objects.filter(
-        document_type=DocumentType.PROPERTY_SHAPEFILE,
-        supplier__state=state.upper(),
-    ).values('id', 'name', 'supplier__corporate_name', 'geojson')
+    output_format = request.GET.get('format', 'geojson')
+    if output_format not in ('geojson', 'topojson'):
+        return JsonResponse({'error': 'O parâmetro `format` deve ser geojson ou topojson.'}, status=400)
 
-    shapefiles = Document.objects.filter(
-        document_type=DocumentType.SHAPEFILE,
-        supplier__state=state.upper(),
-    ).values('id', 'name', 'supplier__corporate_name', 'geojson')
+    try:
+        level = parse_geometry_level(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-    data = [
-        {
-            'supplier_name': doc.pop('supplier__corporate_name'),
-            'id': doc.pop('id'),
-            'name': doc.pop('name'),
-            'geojson': doc.pop('geojson'),
-        }
-        for doc in property_shapefiles
-    ] + [
-        {
-            'supplier_name': doc.pop('supplier__corporate_name'),
-            'id': doc.pop('id'),
-            'name': doc.pop('name'),
-            'geojson': doc.pop('geojson'),
-        }
-        for doc in shapefiles
-    ]
+    if output_format == 'topojson':
+        content, geojson_size = get_state_topology(state.upper(), level)
+
+        return HttpResponse(
+            content,
+            content_type='application/json',
+            headers={'X-GeoJSON-Size': geojson_size, 'X-TopoJSON-Size': len(content)},
+        )
+
+    return StreamingJSONArrayResponse(iter_shapefiles(Q(supplier__state=state.upper()), level))
 
-    return JsonResponse(
-        data,
-        safe=False,
+
+@conditional_on(Supplier, Document)
+def get_shapefiles_overview(request: HttpRequest):
+    """
+    Retorna apenas a caixa delimitadora, o centróide, a área e a quantidade de vértices de cada
+    shapefile, lidos das colunas do documento. Usado pelo mapa afastado, que mostra um marcador
+    por propriedade sem precisar baixar os polígonos.
+    """
+
+    documents = Document.objects.filter(document_type__in=SHAPEFILE_DOCUMENT_TYPES, centroid_lon__isnull=False)
+
+    if state := request.GET.get('state'):
+        if not re.match(r'^[A-Z]{2}$', state):
+            return JsonResponse({'error': 'Invalid state code.'}, status=400)
+
+        documents = documents.filter(supplier__state=state)
+
+    rows = documents.order_by().values_list(
+        'id',
+        'name',
+        'supplier_id',
+        'supplier__corporate_name',
+        *EXTENT_FIELDS,
+        *MEASUREMENT_FIELDS,
     )
+
+    def serialize(row):
+        id, name, supplier_id, supplier_name, *extent, centroid_lon, centroid_lat, area_ha, vertex_count = row
+
+        return {
+            'id': id,
+            'name': name,
+            'supplier_id': supplier_id,
+            'supplier_name': supplier_name,
+            'bbox': extent,
+            'centroid': [centroid_lon, centroid_lat],
+            'area_ha': area_ha,
+            'vertex_count': vertex_count,
+        }
+
+    return StreamingJSONArrayResponse(serialize(row) for row in rows.iterator(chunk_size=STREAM_CHUNK_SIZE))
+
+
+def parse_bbox(value):
+    if not value:
+        raise ValueError('O parâmetro `bbox` é obrigatório.')
+
+    try:
+        minx, miny, maxx, maxy = (float(coordinate) for coordinate in value.split(','))
+    except ValueError:
+        raise ValueError('O parâmetro `bbox` deve estar no formato minx,miny,maxx,maxy.')
+
+    if minx > maxx or miny > maxy:
+        raise ValueError('O parâmetro `bbox` deve estar no formato minx,miny,maxx,maxy.')
+
+    return minx, miny, maxx, maxy
+
+
+@conditional_on(*SHAPEFILE_MODELS)
+def get_shapefiles(request: HttpRequest):
+    """Retorna apenas os shapefiles que intersectam a área visível do mapa (`bbox`)."""
+
+    try:
+        bbox = parse_bbox(request.GET.get('bbox'))
+        level = parse_geometry_level(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    document_ids = shapefile_index.query(bbox)
+
+    return StreamingJSONArrayResponse(iter_shapefiles(Q(id__in=document_ids), level))
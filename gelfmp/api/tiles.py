@@ -0,0 +1,18 @@
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+from gelfmp.api.conditional import conditional_on
+from gelfmp.models import Document, DocumentGeometry, Supplier
+from gelfmp.services import vector_tiles
+
+
+@conditional_on(Supplier, Document, DocumentGeometry)
+def get_tile(request: HttpRequest, z, x, y):
+    if z > vector_tiles.MAX_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        return JsonResponse({'error': 'Invalid tile coordinates.'}, status=400)
+
+    try:
+        tile = vector_tiles.get_tile(z, x, y)
+        return HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,11 +1,18 @@
 from django.urls import path
 
-from . import admin, charts, suppliers
+from . import admin, charts, suppliers, tiles
 
 urlpatterns = [
     path('cities/', admin.get_cities, name='get_cities'),
     path('supplier/', admin.get_supplier, name='get_supplier'),
     path('suppliers/', suppliers.get_suppliers, name='get_suppliers'),
+    path('suppliers/changes', suppliers.get_supplier_changes, name='get_supplier_changes'),
     path('chart/update/', charts.update_chart, name='update_chart'),
+    path('chart/batch/', charts.batch_charts, name='batch_charts'),
+    path('chart/html/', charts.chart_html, name='chart_html'),
+    path('chart/cache/', charts.chart_cache_stats, name='chart_cache_stats'),
+    path('shapefiles', suppliers.get_shapefiles, name='get_shapefiles'),
+    path('shapefiles/overview', suppliers.get_shapefiles_overview, name='get_shapefiles_overview'),
     path('shapefiles/<str:state>', suppliers.get_state_shapefiles, name='get_state_shapefiles'),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', tiles.get_tile, name='get_tile'),
 ]
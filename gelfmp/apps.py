@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GelfmpConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gelfmp'
+
+    def ready(self):
+        from gelfmp import signals  # noqa: F401
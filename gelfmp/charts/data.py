@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from gelfmp.models import CharcoalEntry, CharcoalEntryDaily, CharcoalMonthlyPlan, Supplier
+from gelfmp.services import analytics, charcoal_rollup
+from gelfmp.utils import dtutils
+
+TRUNC_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+ENTRIES_FRAME_COLUMNS = ['entry_period', 'total_volume', 'average_moisture', 'average_fines', 'average_density']
+
+# Resultados já calculados na requisição atual. Fora de `request_scope`
+# (comandos, shell, testes) é None e nada é reaproveitado.
+_memo = ContextVar('chart_data_memo', default=None)
+
+
+@contextmanager
+def request_scope():
+    """Permite que os gráficos gerados dentro do bloco reaproveitem os mesmos dados agregados."""
+
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def memoized(key, build):
+    memo = _memo.get()
+    if memo is None:
+        return build()
+
+    if key not in memo:
+        memo[key] = build()
+
+    return memo[key]
+
+
+def get_supplier(supplier_id):
+    return memoized(('supplier', str(supplier_id)), lambda: Supplier.objects.filter(id=supplier_id).first())
+
+
+def build_entries_frame(group_by, start_date, end_date, supplier_id):
+    if analytics.is_enabled():
+        return analytics.entries_frame(group_by, start_date, end_date, supplier_id)
+
+    entries = CharcoalEntryDaily.objects.all()
+    if start_date:
+        entries = entries.filter(entry_date__gte=start_date)
+
+    if end_date:
+        entries = entries.filter(entry_date__lte=end_date)
+
+    if supplier_id is not None:
+        entries = entries.filter(supplier_id=supplier_id)
+
+    periods = (
+        entries
+        .annotate(entry_period=TRUNC_FUNCTIONS[group_by]('entry_date'))
+        .values('entry_period')
+        .annotate(
+            total_volume=Sum('total_volume'),
+            average_moisture=charcoal_rollup.average('moisture'),
+            average_fines=charcoal_rollup.average('fines'),
+            average_density=charcoal_rollup.average('density'),
+        )
+        .order_by('entry_period')
+    )
+
+    return pd.DataFrame.from_records(list(periods), columns=ENTRIES_FRAME_COLUMNS)
+
+
+def entries_frame(group_by='day', months=3, start_date=None, end_date=None, supplier_id=None):
+    """
+    Retorna as entradas de carvão agregadas por período (`group_by`), com o volume total e as
+    médias de umidade, finos e densidade. Sem datas informadas, considera os últimos `months` meses.
+    Os gráficos do mesmo painel usam os mesmos filtros, então a consulta é feita uma única vez.
+    """
+
+    if group_by not in TRUNC_FUNCTIONS:
+        group_by = 'day'
+
+    if not start_date and not end_date:
+        # Converte para a data local, como o filtro do DateField faria, para que
+        # a chave seja a mesma em todos os gráficos da requisição.
+        start_date = CharcoalEntryDaily._meta.get_field('entry_date').to_python(
+            dtutils.first_day_months_ago(int(months))
+        )
+
+    key = ('entries', group_by, str(start_date), str(end_date), supplier_id)
+
+    return memoized(key, lambda: build_entries_frame(group_by, start_date, end_date, supplier_id))
+
+
+def bucketed_entries_frame(group_by='day', max_points=None, **filters):
+    """
+    Retorna as entradas agregadas por `group_by` ou, caso passem de `max_points` períodos,
+    pelo primeiro agrupamento mais grosso (semana, mês) que respeite o limite.
+    Retorna o agrupamento usado junto das entradas.
+    """
+
+    if group_by not in TRUNC_FUNCTIONS:
+        group_by = 'day'
+
+    levels = list(TRUNC_FUNCTIONS)
+    for level in levels[levels.index(group_by) :]:
+        entries = entries_frame(level, **filters)
+        if not max_points or len(entries) <= max_points:
+            break
+
+    return level, entries
+
+
+def schedule_volumes(year):
+    """
+    Retorna os volumes programados e realizados no ano, somados por tipo de
+    fornecedor e mês, como tuplas (tipo de fornecedor, mês, volume).
+    """
+
+    if analytics.is_enabled():
+        return analytics.schedule_volumes(year)
+
+    planned = (
+        CharcoalMonthlyPlan.objects
+        .filter(year=year)
+        .order_by()
+        .values_list('supplier__supplier_type', 'month')
+        .annotate(volume=Sum('planned_volume'))
+    )
+
+    realized = (
+        CharcoalEntry.objects
+        .filter(entry_date__year=year)
+        .order_by()
+        .values_list('supplier__supplier_type', 'entry_date__month')
+        .annotate(volume=Sum('entry_volume'))
+    )
+
+    return planned, realized
@@ -0,0 +1,48 @@
+import numpy as np
+
+# Quantidade máxima de pontos enviada por série pelos formulários de filtro dos gráficos.
+DEFAULT_MAX_POINTS = 400
+
+
+def lttb(x, y, max_points):
+    """
+    Seleciona até `max_points` pontos da série com o algoritmo Largest-Triangle-Three-Buckets,
+    mantendo o primeiro e o último ponto. Retorna os índices dos pontos selecionados.
+
+    Os pontos intermediários são divididos em `max_points - 2` buckets e, de cada bucket, é
+    escolhido o ponto que forma o maior triângulo com o ponto escolhido no bucket anterior e
+    com a média do bucket seguinte. Valores NaN são ignorados.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    valid = np.flatnonzero(~np.isnan(y))
+    size = len(valid)
+
+    if max_points < 3 or size <= max_points:
+        return valid
+
+    x, y = x[valid], y[valid]
+
+    # Limites dos buckets (o último "bucket" é o ponto final, usado como média do seguinte).
+    edges = np.append(np.linspace(1, size - 1, max_points - 1).astype(int), size)
+    counts = np.diff(edges)
+    average_x = np.add.reduceat(x, edges[:-1]) / counts
+    average_y = np.add.reduceat(y, edges[:-1]) / counts
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = size - 1
+
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        previous = selected[bucket]
+
+        areas = np.abs(
+            (x[previous] - average_x[bucket + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y[bucket + 1] - y[previous])
+        )
+        selected[bucket + 1] = start + np.argmax(areas)
+
+    return valid[selected]
@@ -0,0 +1,247 @@
+import numpy as np
+import orjson
+import plotly.io as pio
+
+from gelfmp.charts import downsampling, theme
+
+# O tema é convertido para dict uma única vez, em vez de ser validado a cada gráfico.
+TEMPLATE = {'layout': theme.custom_layout.to_plotly_json()}
+
+PRIMARY_COLOR = TEMPLATE['layout']['colorway'][0]
+SECONDARY_COLOR = '#4797ed'
+
+PLOTLY_CONFIG = {'showTips': False}
+
+CARTESIAN_AXES = {
+    'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0]},
+    'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0]},
+}
+
+
+def figure(traces, layout):
+    """
+    Monta a especificação (dict) de uma figura do Plotly, já com o tema personalizado.
+    Os eixos recebem a mesma âncora e domínio que o plotly.express definiria.
+    """
+
+    layout = {**layout, 'template': TEMPLATE}
+    for axis, defaults in CARTESIAN_AXES.items():
+        layout[axis] = {**defaults, **layout.get(axis, {})}
+
+    return {'data': traces, 'layout': layout}
+
+
+def to_json(fig):
+    return orjson.dumps(fig, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def to_html(fig):
+    # O plotly.js é carregado uma única vez pela página (base.html), e não a cada gráfico.
+    return pio.to_html(fig, config=PLOTLY_CONFIG, full_html=False, include_plotlyjs=False, validate=False)
+
+
+def trace(type, x, y, **attributes):
+    return {'type': type, 'x': x, 'y': y, 'xaxis': 'x', 'yaxis': 'y', 'orientation': 'v', **attributes}
+
+
+def charcoal_entries(entries, title, hovertemplate, dtick, xrange=None):
+    """Gráfico de barras do volume total, com as médias de umidade, finos e densidade no hover."""
+
+    volumes = entries['total_volume'].to_numpy(dtype=float)
+    xaxis = {'title': {'text': ''}, 'dtick': dtick}
+    if xrange is not None:
+        xaxis['range'] = xrange
+
+    bar = trace(
+        'bar',
+        entries['entry_period'].tolist(),
+        volumes,
+        text=volumes,
+        # O orjson só serializa arrays contíguos na memória (C order).
+        customdata=np.ascontiguousarray(entries[['average_moisture', 'average_fines', 'average_density']], dtype=float),
+        name='',
+        showlegend=False,
+        marker={'color': PRIMARY_COLOR, 'pattern': {'shape': ''}},
+        texttemplate='%{text:,.2f}',
+        textfont={'color': 'white'},
+        textposition='outside',
+        cliponaxis=False,
+        hovertemplate=hovertemplate,
+    )
+
+    return figure(
+        [bar],
+        {
+            'title': {'text': title, 'x': 0.5},
+            'xaxis': xaxis,
+            'yaxis': {'title': {'text': 'Volume Total (m³)'}},
+            'legend': {'tracegroupgap': 0},
+            'barmode': 'relative',
+            'uniformtext': {'minsize': 8, 'mode': 'hide'},
+            'margin': {'l': 30, 'r': 15, 't': 40, 'b': 20},
+            'autosize': True,
+        },
+    )
+
+
+def period_series(entries, column, max_points=None):
+    """
+    Retorna os períodos e os valores da coluna, reduzidos a no máximo `max_points`
+    pontos (LTTB) quando informado, preservando o formato da linha.
+    """
+
+    x = entries['entry_period'].tolist()
+    y = entries[column].to_numpy(dtype=float)
+
+    if not max_points or len(x) <= max_points:
+        return x, y
+
+    positions = np.asarray(x, dtype='datetime64[D]').astype(float)
+    indices = downsampling.lttb(positions, y, max_points)
+
+    return [x[index] for index in indices], y[indices]
+
+
+def line(x, y, name, color, hovertemplate, showlegend):
+    return trace(
+        'scatter',
+        x,
+        y,
+        name=name,
+        showlegend=showlegend,
+        mode='lines+markers',
+        line={'color': color, 'dash': 'solid', 'shape': 'spline'},
+        marker={'symbol': 'circle'},
+        hovertemplate=hovertemplate,
+    )
+
+
+def average_moisture_and_fines(entries, title, max_points=None):
+    """Gráfico de linhas das médias de finos e umidade por período."""
+
+    traces = [
+        line(
+            *period_series(entries, 'average_fines', max_points),
+            'Finos (%)',
+            PRIMARY_COLOR,
+            '<b>Data:</b> %{x|%d-%m-%Y}<br><b>Finos:</b> %{y:.2f}%<br><extra></extra>',
+            showlegend=True,
+        ),
+        line(
+            *period_series(entries, 'average_moisture', max_points),
+            'Umidade (%)',
+            SECONDARY_COLOR,
+            '<b>Data:</b> %{x|%d-%m-%Y}<br><b>Umidade:</b> %{y:.2f}%<br><extra></extra>',
+            showlegend=True,
+        ),
+    ]
+
+    return figure(
+        traces,
+        {
+            'title': {'text': title, 'x': 0.5},
+            'xaxis': {'title': {'text': ''}},
+            'yaxis': {'title': {'text': 'Valores Médios (%)'}},
+            'legend': {'title': {'text': 'Variáveis'}, 'tracegroupgap': 0},
+            'margin': {'l': 30, 'r': 15, 't': 40, 'b': 20},
+        },
+    )
+
+
+def average_density(entries, title, max_points=None):
+    """Gráfico de linha da densidade média por período."""
+
+    density = line(
+        *period_series(entries, 'average_density', max_points),
+        '',
+        PRIMARY_COLOR,
+        '<b>Data:</b> %{x|%d-%m-%Y}<br><b>Densidade:</b> %{y:.2f}<br><extra></extra>',
+        showlegend=False,
+    )
+
+    return figure(
+        [density],
+        {
+            'title': {'text': title, 'x': 0.5},
+            'xaxis': {'title': {'text': ''}},
+            'yaxis': {'title': {'text': 'Densidade Média'}},
+            'legend': {'tracegroupgap': 0},
+            'margin': {'l': 30, 'r': 15, 't': 40, 'b': 20},
+        },
+    )
+
+
+def supplier_iqfs(labels, iqfs, title):
+    """Gráfico de área dos IQFs de um fornecedor por mês."""
+
+    area = trace(
+        'scatter',
+        labels,
+        iqfs,
+        text=iqfs,
+        name='',
+        showlegend=False,
+        mode='lines+markers+text',
+        stackgroup='1',
+        fillpattern={'shape': ''},
+        line={'color': PRIMARY_COLOR, 'width': 2},
+        marker={'symbol': 'circle', 'size': 8},
+        hovertemplate='%{text:.1f}%',
+        texttemplate='%{text:.1f}%',
+        textfont={'color': 'white'},
+        textposition='top center',
+        cliponaxis=False,
+    )
+
+    xaxis_range = [-0.2, len(labels) - 0.9] if len(labels) > 1 else [-0.1, 0.1]
+
+    return figure(
+        [area],
+        {
+            'title': {'text': title, 'y': 0.95},
+            'xaxis': {'title': {'text': ''}, 'range': xaxis_range, 'tickfont': {'size': 10}},
+            'yaxis': {'title': {'text': 'IQF'}, 'automargin': True, 'rangemode': 'tozero', 'ticksuffix': '%'},
+            'legend': {'tracegroupgap': 0},
+            'uniformtext': {'minsize': 8, 'mode': 'hide'},
+            'margin': {'l': 30, 'r': 20, 't': 50, 'b': 40},
+            'autosize': True,
+            'dragmode': False,
+        },
+    )
+
+
+def charcoal_schedule(series, month_labels, title):
+    """
+    Gráfico de linhas do volume realizado por tipo de fornecedor. Cada item de `series`
+    contém o nome, a cor, o volume realizado e os dados do hover (planejado e percentual).
+    """
+
+    traces = [
+        {
+            'type': 'scatter',
+            'x': month_labels,
+            'y': serie['realized'],
+            'mode': 'lines+markers',
+            'name': serie['name'],
+            'cliponaxis': False,
+            'hovertemplate': (
+                '<b>Mês: %{x}</b><br>'
+                'Realizado: %{y:.2f} m³ (%{customdata[1]:.2f}%)<br>'
+                'Planejado: %{customdata[0]:.2f} m³'
+            ),
+            'line': {'color': serie['color']},
+            'customdata': serie['customdata'],
+        }
+        for serie in series
+    ]
+
+    return {
+        'data': traces,
+        'layout': {
+            'template': TEMPLATE,
+            'title': {'text': title},
+            'yaxis': {'title': {'text': 'Volume Realizado (m³)'}},
+            'showlegend': True,
+            'margin': {'l': 40, 'r': 15, 't': 40, 'b': 20},
+        },
+    }
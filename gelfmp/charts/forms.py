@@ -1,5 +1,6 @@
 from django import forms
 
+from gelfmp.charts.downsampling import DEFAULT_MAX_POINTS
 from gelfmp.models import Supplier
 
 
@@ -29,6 +30,9 @@ class CharcoalEntriesChartForm(forms.Form):
         required=False,
     )
 
+    # Limita a quantidade de pontos enviada ao navegador em períodos longos.
+    max_points = forms.IntegerField(widget=forms.HiddenInput, initial=DEFAULT_MAX_POINTS, required=False)
+
 
 class CharcoalSupplierEntriesChartForm(forms.Form):
     group_by = forms.ChoiceField(
@@ -51,6 +55,9 @@ class CharcoalSupplierEntriesChartForm(forms.Form):
         required=False,
     )
 
+    # Limita a quantidade de pontos enviada ao navegador em períodos longos.
+    max_points = forms.IntegerField(widget=forms.HiddenInput, initial=DEFAULT_MAX_POINTS, required=False)
+
     def __init__(self, *args, supplier_id=None, **kwargs):
         super().__init__(*args, **kwargs)
 
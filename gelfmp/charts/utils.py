@@ -1,14 +1,36 @@
+import os
 from datetime import datetime
 
 from django.template.loader import render_to_string
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from gelfmp.charts import figures
+from gelfmp.utils.precompressed import write_precompressed
 
 WEEK_DTICK = 1000 * 60 * 60 * 24 * 7
 
+# Caminho (relativo ao diretório static) do plotly.js incluído no pacote do plotly.
+# A versão no nome do arquivo garante que o navegador não use uma cópia antiga em cache.
+PLOTLYJS_PATH = f'js/plotly-{get_plotlyjs_version()}.min.js'
+
 
 def html_else_json(fig, html):
-    """Função que retorna a Figure em json ou html com base nos dados informados."""
+    """Função que retorna a figura (dict montado por `figures`) em json ou html com base nos dados informados."""
+
+    return figures.to_html(fig) if html else figures.to_json(fig)
+
+
+def build_plotlyjs(static_dir):
+    """
+    Grava no diretório static o plotly.js da mesma versão usada para gerar os gráficos,
+    junto das cópias pré-comprimidas. Retorna o caminho do arquivo gerado.
+    """
+
+    path = os.path.join(static_dir, PLOTLYJS_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_precompressed(path, get_plotlyjs().encode())
 
-    return fig.to_html(config={'showTips': False}, full_html=False) if html else fig.to_json()
+    return path
 
 
 def no_data_error(title):
@@ -1,2 +1,5 @@
+from gelfmp.charts.utils import PLOTLYJS_PATH
+
+
 def global_context(request):
-    return dict()
+    return dict(plotlyjs_path=PLOTLYJS_PATH)
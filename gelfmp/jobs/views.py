@@ -7,6 +7,7 @@ from django.shortcuts import get_object_or_404, render
 from gelfcore.logger import log
 from gelfcore.router import Router
 from gelfmp.models.charcoal_contract import CharcoalContract
+from gelfmp.services.cache_warmer import schedule_warm_caches
 from gelfmp.services.contract_filler import contract_filler
 from gelfmp.services.entries_processor import EntriesProcessor
 from gelfmp.services.iqf_calculator import calculate_suppliers_iqf
@@ -95,6 +96,9 @@ def charcoal_entries_upload(request: HttpRequest):
             processor = EntriesProcessor()
             processor.process([file])
 
+            # Gera os gráficos e painéis com os dados novos antes do primeiro acesso.
+            schedule_warm_caches()
+
             return JsonResponse({'status': 'success', 'message': 'Arquivo processado com sucesso.'})
 
         except ValueError as e:
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils.timezone import now
+
+from gelfmp.charts import data as chart_data
+from gelfmp.management.commands.benchmark_charts import best_time
+from gelfmp.services import analytics
+
+
+def analytics_cases(year, start_date, end_date):
+    """Agregações feitas pelos painéis, com os mesmos filtros usados nos gráficos e na programação."""
+
+    cases = {
+        f'entries_frame ({group_by})': lambda group_by=group_by: chart_data.build_entries_frame(
+            group_by, start_date, end_date, None
+        )
+        for group_by in chart_data.TRUNC_FUNCTIONS
+    }
+
+    cases['schedule_volumes'] = lambda: [list(volumes) for volumes in chart_data.schedule_volumes(year)]
+    return cases
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o tempo das agregações dos painéis feitas no SQLite e na cópia DuckDB '
+        '(é preciso executar o sync_analytics antes).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Período (em dias) dos gráficos de entradas.')
+        parser.add_argument('--repeat', type=int, default=5, help='Quantidade de medições por agregação.')
+
+    def handle(self, *args, **options):
+        with override_settings(ANALYTICS_BACKEND='duckdb'):
+            if not analytics.is_enabled():
+                raise CommandError('A cópia DuckDB não está disponível, execute o sync_analytics antes.')
+
+        today = now().date()
+        cases = analytics_cases(today.year, today - timedelta(days=options['days']), today)
+
+        self.stdout.write(f'{"Agregação":<28} {"SQLite":>12} {"DuckDB":>12} {"ganho":>8}')
+
+        for name, aggregate in cases.items():
+            with override_settings(ANALYTICS_BACKEND='sqlite'):
+                sqlite_time = best_time(aggregate, options['repeat'])
+
+            with override_settings(ANALYTICS_BACKEND='duckdb'):
+                duckdb_time = best_time(aggregate, options['repeat'])
+
+            self.stdout.write(
+                f'{name:<28} {sqlite_time * 1000:>9.2f} ms {duckdb_time * 1000:>9.2f} ms '
+                f'{sqlite_time / duckdb_time:>7.1f}x'
+            )
@@ -0,0 +1,237 @@
+from timeit import Timer
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from django.core.management.base import BaseCommand
+
+from gelfmp.charts import figures, theme
+from gelfmp.charts.utils import WEEK_DTICK
+
+HOVERTEMPLATE = '<b>Volume Total:</b> %{y:.2f} m³<br><b>Umidade Média:</b> %{customdata[0]:.2f}%<br><extra></extra>'
+
+
+def px_charcoal_entries(entries, title, hovertemplate, dtick, xrange=None):
+    """Gráfico de entradas de carvão montado com o plotly.express (implementação anterior)."""
+
+    y_values = entries['total_volume'].tolist()
+
+    fig = px.bar(
+        x=entries['entry_period'].tolist(),
+        y=y_values,
+        text=y_values,
+        title=title,
+        labels={'y': 'Volume Total'},
+        custom_data=[
+            entries['average_moisture'].tolist(),
+            entries['average_fines'].tolist(),
+            entries['average_density'].tolist(),
+        ],
+    )
+
+    fig.update_traces(
+        texttemplate='%{text:,.2f}',
+        textfont=dict(color='white'),
+        textposition='outside',
+        cliponaxis=False,
+        hovertemplate=hovertemplate,
+    )
+
+    fig.update_layout(
+        uniformtext_minsize=8,
+        uniformtext_mode='hide',
+        yaxis_title='Volume Total (m³)',
+        xaxis_title='',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+        xaxis=dict(dtick=dtick, range=xrange),
+        autosize=True,
+    )
+
+    return fig
+
+
+def px_average_moisture_and_fines(entries, title):
+    df = entries.rename(columns={'average_fines': 'avg_fines', 'average_moisture': 'avg_moisture'})
+
+    fig = px.line(
+        df,
+        x='entry_period',
+        y=['avg_fines', 'avg_moisture'],
+        title=title,
+        labels={'entry_period': 'Período', 'avg_fines': 'Finos (%)', 'avg_moisture': 'Umidade (%)'},
+        markers=True,
+    )
+
+    fig.update_traces(
+        selector=dict(name='avg_fines'),
+        name='Finos (%)',
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Finos:</b> %{y:.2f}%<br><extra></extra>',
+        line_shape='spline',
+    )
+
+    fig.update_traces(
+        selector=dict(name='avg_moisture'),
+        name='Umidade (%)',
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Umidade:</b> %{y:.2f}%<br><extra></extra>',
+        line_color=figures.SECONDARY_COLOR,
+        line_shape='spline',
+    )
+
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Valores Médios (%)',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+        legend_title='Variáveis',
+    )
+
+    return fig
+
+
+def px_average_density(entries, title):
+    fig = px.line(
+        entries,
+        x='entry_period',
+        y='average_density',
+        title=title,
+        labels={'entry_period': 'Período', 'average_density': 'Densidade Média'},
+        markers=True,
+    )
+
+    fig.update_traces(
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Densidade:</b> %{y:.2f}<br><extra></extra>',
+        line_shape='spline',
+    )
+
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Densidade Média',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+    )
+
+    return fig
+
+
+def px_supplier_iqfs(labels, iqfs, title):
+    df = pd.DataFrame({'month_year': labels, 'iqf': iqfs})
+
+    fig = px.area(
+        df,
+        x='month_year',
+        y='iqf',
+        text='iqf',
+        title=title,
+        labels={'month_year': 'Mês/Ano', 'iqf': 'IQF'},
+    )
+
+    xaxis_range = [-0.2, len(labels) - 0.9] if len(labels) > 1 else [-0.1, 0.1]
+
+    fig.update_layout(
+        uniformtext_minsize=8,
+        uniformtext_mode='hide',
+        title_y=0.95,
+        margin=dict(l=30, r=20, t=50, b=40),
+        autosize=True,
+        dragmode=False,
+        xaxis=dict(title='', range=xaxis_range, tickfont=dict(size=10)),
+        yaxis=dict(automargin=True, rangemode='tozero', ticksuffix='%'),
+    )
+
+    fig.update_traces(
+        hovertemplate='%{text:.1f}%',
+        texttemplate='%{text:.1f}%',
+        textfont=dict(color='white'),
+        textposition='top center',
+        cliponaxis=False,
+        marker=dict(size=8, symbol='circle'),
+        line=dict(width=2),
+    )
+
+    return fig
+
+
+def sample_entries(periods, freq):
+    rng = np.random.default_rng(0)
+
+    return pd.DataFrame({
+        'entry_period': pd.date_range('2024-01-01', periods=periods, freq=freq).date,
+        'total_volume': rng.uniform(100, 1000, periods),
+        'average_moisture': rng.uniform(2, 10, periods),
+        'average_fines': rng.uniform(5, 15, periods),
+        'average_density': rng.uniform(180, 280, periods),
+    })
+
+
+def chart_cases():
+    """
+    Retorna, para cada gráfico, o par (plotly.express, figures) que gera a mesma figura
+    a partir dos mesmos dados agregados, nas visualizações diária, semanal e mensal.
+    """
+
+    cases = {}
+
+    views = [('day', 90, 'D', ''), ('week', 26, 'W-MON', WEEK_DTICK), ('month', 12, 'MS', 'M1')]
+
+    for group_by, periods, freq, dtick in views:
+        entries = sample_entries(periods, freq)
+        args = (entries, 'Entrada de Carvão', HOVERTEMPLATE, dtick)
+
+        cases[f'charcoal_entries ({group_by})'] = (
+            lambda args=args: px_charcoal_entries(*args),
+            lambda args=args: figures.charcoal_entries(*args),
+        )
+        cases[f'average_moisture_and_fines ({group_by})'] = (
+            lambda entries=entries: px_average_moisture_and_fines(entries, 'Umidade e Finos'),
+            lambda entries=entries: figures.average_moisture_and_fines(entries, 'Umidade e Finos'),
+        )
+        cases[f'average_density ({group_by})'] = (
+            lambda entries=entries: px_average_density(entries, 'Densidade'),
+            lambda entries=entries: figures.average_density(entries, 'Densidade'),
+        )
+
+    labels, iqfs = ['1/2024', '2/2024', '3/2024'], np.array([92.5, 88.0, 95.1])
+    cases['supplier_iqfs_last_3_months'] = (
+        lambda: px_supplier_iqfs(labels, iqfs, 'IQF'),
+        lambda: figures.supplier_iqfs(labels, iqfs, 'IQF'),
+    )
+
+    return cases
+
+
+def best_time(function, repeat):
+    timer = Timer(function)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o tempo para montar e serializar cada gráfico com o plotly.express '
+        'e com o montador de figuras (gelfmp.charts.figures) a partir dos mesmos dados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Quantidade de medições por gráfico.')
+
+    def handle(self, *args, **options):
+        # O plotly.express usa o template padrão do plotly.io, como os gráficos faziam antes.
+        default_template = pio.templates.default
+        pio.templates.default = go.layout.Template(layout=theme.custom_layout)
+
+        self.stdout.write(f'{"Gráfico":<40} {"plotly.express":>16} {"figures":>12} {"ganho":>8}')
+
+        try:
+            for name, (px_build, build) in chart_cases().items():
+                px_time = best_time(lambda: px_build().to_json(), options['repeat'])
+                time = best_time(lambda: figures.to_json(build()), options['repeat'])
+
+                self.stdout.write(
+                    f'{name:<40} {px_time * 1000:>13.2f} ms {time * 1000:>9.2f} ms {px_time / time:>7.1f}x'
+                )
+        finally:
+            pio.templates.default = default_template
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gelfmp.models import Supplier
+from gelfmp.services.boundary_layers import STATE_CODES, build_boundary_layers
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera as versões simplificadas e pré-comprimidas (.gz e .br) dos limites estaduais e municipais '
+        'servidos ao mapa. Por padrão, apenas os municípios dos estados que possuem fornecedores.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--states', nargs='+', metavar='UF', help='Siglas dos estados a serem gerados.')
+        parser.add_argument('--all-states', action='store_true', help='Gera os municípios de todos os estados.')
+
+    def handle(self, *args, **options):
+        if options['all_states']:
+            states = set(STATE_CODES)
+
+        elif options['states']:
+            states = {state.upper() for state in options['states']}
+            if unknown := states - set(STATE_CODES):
+                raise CommandError(f'Estados desconhecidos: {", ".join(sorted(unknown))}.')
+
+        else:
+            states = set(Supplier.objects.order_by().values_list('state_id', flat=True).distinct()) & set(STATE_CODES)
+
+        manifest = build_boundary_layers(settings.BOUNDARY_SOURCE_DIR, settings.BOUNDARY_LAYERS_DIR, states)
+
+        self.stdout.write(self.style.SUCCESS(f'{len(manifest["layers"])} camadas disponíveis no manifesto.'))
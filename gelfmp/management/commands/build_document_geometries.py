@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from gelfmp.models import Document, GeometryLevel
+from gelfmp.services import vector_tiles
+from gelfmp.services.document_geometry import refresh_document_geometries
+
+
+class Command(BaseCommand):
+    help = 'Gera as versões simplificadas do GeoJSON de todos os Shapefiles já cadastrados.'
+
+    def handle(self, *args, **kwargs):
+        documents = Document.objects.filter(geometries__level=GeometryLevel.FULL).only('id')
+
+        count = 0
+        for document in documents.iterator(chunk_size=100):
+            refresh_document_geometries(document)
+            count += 1
+
+        # Os tiles em cache foram gerados a partir das geometrias antigas.
+        vector_tiles.clear_cache()
+
+        self.stdout.write(self.style.SUCCESS(f'Geometrias de {count} documentos geradas.'))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gelfmp.charts.utils import build_plotlyjs
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera o plotly.js (e as suas cópias .gz e .br) no diretório static, na mesma versão '
+        'do pacote plotly usado para gerar os gráficos.'
+    )
+
+    def handle(self, *args, **options):
+        path = build_plotlyjs(settings.STATICFILES_DIRS[0])
+
+        self.stdout.write(self.style.SUCCESS(f'plotly.js gerado em {path}.'))
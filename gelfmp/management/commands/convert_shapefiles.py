@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from gelfmp.models import Document, GeometryStatus
+from gelfmp.models.choices import SHAPEFILE_DOCUMENT_TYPES
+from gelfmp.services.shapefile_conversion import convert_document_shapefile
+
+
+class Command(BaseCommand):
+    help = (
+        'Converte os Shapefiles cuja conversão em segundo plano não terminou '
+        '(por exemplo, após o servidor ser reiniciado durante a conversão).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Converte novamente todos os Shapefiles.')
+
+    def handle(self, *args, **options):
+        documents = Document.objects.filter(document_type__in=SHAPEFILE_DOCUMENT_TYPES)
+        if not options['all']:
+            documents = documents.filter(geometry_status=GeometryStatus.PROCESSING)
+
+        document_ids = list(documents.values_list('id', flat=True))
+        for document_id in document_ids:
+            convert_document_shapefile(document_id)
+
+        errors = Document.objects.filter(id__in=document_ids, geometry_status=GeometryStatus.ERROR).count()
+        self.stdout.write(self.style.SUCCESS(f'{len(document_ids)} Shapefiles convertidos ({errors} com erro).'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gelfmp.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove os registros de exclusão (Tombstone) mais antigos que TOMBSTONE_RETENTION_DAYS. '
+        'A API de alterações passa a pedir uma sincronização completa para `since` anteriores a esse período.'
+    )
+
+    def handle(self, *args, **kwargs):
+        count, _ = Tombstone.objects.filter(created_at__lt=Tombstone.retention_start()).delete()
+        self.stdout.write(self.style.SUCCESS(f'{count} registros de exclusão removidos.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gelfmp.services.charcoal_rollup import refresh_daily_entries
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os totais diários (CharcoalEntryDaily) a partir de todas as entradas de carvão.'
+
+    def handle(self, *args, **kwargs):
+        count = refresh_daily_entries()
+        self.stdout.write(self.style.SUCCESS(f'{count} totais diários de entradas de carvão recalculados.'))
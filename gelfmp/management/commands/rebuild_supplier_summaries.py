@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gelfmp.services.supplier_summary import refresh_supplier_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o resumo (médias recentes e rating) de todos os fornecedores.'
+
+    def handle(self, *args, **kwargs):
+        count = refresh_supplier_summaries()
+        self.stdout.write(self.style.SUCCESS(f'{count} resumos de fornecedores recalculados.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localtime
+
+from gelfmp.services import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Sincroniza de forma incremental a cópia DuckDB (ANALYTICS_DB_PATH) das tabelas usadas '
+        'pelos painéis e exibe a última sincronização de cada tabela.'
+    )
+
+    def handle(self, *args, **options):
+        if not analytics.is_available():
+            raise CommandError('O pacote duckdb não está instalado (poetry install -E analytics).')
+
+        synced = analytics.sync()
+
+        for table, freshness in analytics.get_freshness().items():
+            updated_mark = freshness['updated_mark']
+            updated = f'{localtime(updated_mark):%d/%m/%Y %H:%M:%S}' if updated_mark else '-'
+
+            self.stdout.write(
+                f'{table:<24} {synced.get(table, 0):>8} copiadas {freshness["rows"]:>8} linhas '
+                f'(alterações até {updated})'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Cópia analítica sincronizada.'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gelfmp.services.cache_warmer import WARM_WORKERS, warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera os gráficos do painel de carvão, das estatísticas de cada fornecedor ativo, a '
+        'programação do ano e a listagem de fornecedores, para que o primeiro acesso encontre o cache pronto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=WARM_WORKERS, help='Itens aquecidos ao mesmo tempo.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        results = warm_caches(options['workers'])
+
+        for name, seconds, error in results:
+            line = f'{seconds * 1000:>10.2f} ms  {name}'
+            self.stdout.write(self.style.ERROR(f'{line}: {error}') if error else line)
+
+        errors = sum(error is not None for _, _, error in results)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{len(results)} itens aquecidos em {time.perf_counter() - start:.2f}s ({errors} com erro).'
+            )
+        )
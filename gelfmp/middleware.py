@@ -1,6 +1,8 @@
 from django.shortcuts import redirect
 from django.urls import reverse
 
+from gelfmp.charts import data as chart_data
+
 
 class AdminLoginRedirectMiddleware:
     def __init__(self, get_response):
@@ -15,3 +17,14 @@ class AdminLoginRedirectMiddleware:
             return redirect(f'{reverse("admin:login")}?next={request.path}')
 
         return self.get_response(request)
+
+
+class ChartDataMiddleware:
+    """Permite que os gráficos gerados na mesma requisição compartilhem os dados agregados."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with chart_data.request_scope():
+            return self.get_response(request)
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+
+def latest_per_supplier(queryset, order_by, limit):
+    ranked = queryset.annotate(
+        row_number=Window(RowNumber(), partition_by=F('supplier_id'), order_by=order_by),
+    ).filter(row_number__lte=limit)
+
+    return queryset.model.objects.filter(id__in=ranked.values('id')).order_by()
+
+
+def fill_summaries(apps, schema_editor):
+    CharcoalEntry = apps.get_model('gelfmp', 'CharcoalEntry')
+    CharcoalIQF = apps.get_model('gelfmp', 'CharcoalIQF')
+    Supplier = apps.get_model('gelfmp', 'Supplier')
+    SupplierSummary = apps.get_model('gelfmp', 'SupplierSummary')
+
+    # Médias das últimas 30 entradas de cada fornecedor.
+    recent_entries = latest_per_supplier(
+        CharcoalEntry.objects.all(),
+        order_by=[F('entry_date').desc(), F('id').desc()],
+        limit=30,
+    )
+    stats = {
+        row.pop('supplier_id'): row
+        for row in recent_entries.values('supplier_id').annotate(
+            average_moisture=Avg('moisture'),
+            average_fines=Avg('fines'),
+            average_density=Avg('density'),
+            first_entry_date=Min('entry_date'),
+            last_entry_date=Max('entry_date'),
+            entries_count=Count('id'),
+        )
+    }
+
+    # Média dos últimos 3 IQFs, apenas para fornecedores com 3 IQFs.
+    recent_iqfs = latest_per_supplier(
+        CharcoalIQF.objects.all(),
+        order_by=[F('year').desc(), F('month').desc()],
+        limit=3,
+    )
+    ratings = {
+        row['supplier_id']: round(row['average_iqf'], 1)
+        for row in recent_iqfs.values('supplier_id').annotate(average_iqf=Avg('iqf'), count=Count('id'))
+        if row['count'] == 3
+    }
+
+    summaries = [
+        SupplierSummary(
+            supplier_id=supplier_id,
+            rating=ratings.get(supplier_id),
+            **stats.get(supplier_id, {'entries_count': 0}),
+        )
+        for supplier_id in Supplier.objects.values_list('id', flat=True)
+    ]
+
+    SupplierSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierSummary',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('supplier', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='gelfmp.supplier', verbose_name='Fornecedor')),
+                ('average_moisture', models.FloatField(blank=True, null=True, verbose_name='Umidade Média (%)')),
+                ('average_fines', models.FloatField(blank=True, null=True, verbose_name='Finos Média (%)')),
+                ('average_density', models.FloatField(blank=True, null=True, verbose_name='Densidade Média')),
+                ('first_entry_date', models.DateField(blank=True, null=True, verbose_name='Data da Primeira Entrada')),
+                ('last_entry_date', models.DateField(blank=True, null=True, verbose_name='Data da Última Entrada')),
+                ('entries_count', models.IntegerField(default=0, verbose_name='Quantidade de Entradas')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Média dos Últimos IQFs')),
+            ],
+            options={
+                'verbose_name': 'Resumo de Fornecedor',
+                'verbose_name_plural': 'Resumos de Fornecedores',
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
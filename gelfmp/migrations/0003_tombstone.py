@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0002_suppliersummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('model', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('object_id', models.BigIntegerField(verbose_name='ID do Objeto')),
+                ('supplier_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID do Fornecedor')),
+            ],
+            options={
+                'verbose_name': 'Registro de Exclusão',
+                'verbose_name_plural': 'Registros de Exclusão',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='gelfmp_tomb_created_fb0e7d_idx')],
+            },
+        ),
+    ]
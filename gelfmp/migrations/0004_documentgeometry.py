@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0003_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentGeometry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('level', models.CharField(choices=[('overview', 'Visão Geral'), ('regional', 'Regional'), ('detail', 'Detalhe')], max_length=20, verbose_name='Nível')),
+                ('geojson', models.JSONField(verbose_name='GeoJSON')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='geometries', to='gelfmp.document', verbose_name='Documento')),
+            ],
+            options={
+                'verbose_name': 'Geometria de Documento',
+                'verbose_name_plural': 'Geometrias de Documentos',
+                'constraints': [models.UniqueConstraint(fields=('document', 'level'), name='unique_document_geometry_level')],
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:31
+
+import shapely
+from django.db import migrations, models
+
+EXTENT_FIELDS = ['min_lon', 'min_lat', 'max_lon', 'max_lat']
+
+
+def move_geojson_to_geometries(apps, schema_editor):
+    Document = apps.get_model('gelfmp', 'Document')
+    DocumentGeometry = apps.get_model('gelfmp', 'DocumentGeometry')
+
+    documents = Document.objects.filter(geojson__isnull=False).only('id', 'geojson')
+
+    for document in documents.iterator(chunk_size=100):
+        DocumentGeometry.objects.update_or_create(
+            document=document,
+            level='full',
+            defaults={'geojson': document.geojson},
+        )
+
+        geometry = shapely.from_geojson(document.geojson)
+        if geometry.is_empty:
+            continue
+
+        Document.objects.filter(pk=document.pk).update(
+            **dict(zip(EXTENT_FIELDS, geometry.bounds)),
+            centroid_lon=geometry.centroid.x,
+            centroid_lat=geometry.centroid.y,
+        )
+
+
+def move_geometries_to_geojson(apps, schema_editor):
+    Document = apps.get_model('gelfmp', 'Document')
+    DocumentGeometry = apps.get_model('gelfmp', 'DocumentGeometry')
+
+    geometries = DocumentGeometry.objects.filter(level='full')
+
+    for geometry in geometries.iterator(chunk_size=100):
+        Document.objects.filter(pk=geometry.document_id).update(geojson=geometry.geojson)
+
+    geometries.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0004_documentgeometry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='centroid_lat',
+            field=models.FloatField(blank=True, null=True, verbose_name='Latitude do Centróide'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='centroid_lon',
+            field=models.FloatField(blank=True, null=True, verbose_name='Longitude do Centróide'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='max_lat',
+            field=models.FloatField(blank=True, null=True, verbose_name='Latitude Máxima'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='max_lon',
+            field=models.FloatField(blank=True, null=True, verbose_name='Longitude Máxima'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='min_lat',
+            field=models.FloatField(blank=True, null=True, verbose_name='Latitude Mínima'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='min_lon',
+            field=models.FloatField(blank=True, null=True, verbose_name='Longitude Mínima'),
+        ),
+        migrations.AlterField(
+            model_name='documentgeometry',
+            name='level',
+            field=models.CharField(choices=[('overview', 'Visão Geral'), ('regional', 'Regional'), ('detail', 'Detalhe'), ('full', 'Original')], max_length=20, verbose_name='Nível'),
+        ),
+        migrations.RunPython(move_geojson_to_geometries, move_geometries_to_geojson),
+        migrations.RemoveField(
+            model_name='document',
+            name='geojson',
+        ),
+    ]
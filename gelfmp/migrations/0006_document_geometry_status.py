@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+def mark_converted_shapefiles(apps, schema_editor):
+    Document = apps.get_model('gelfmp', 'Document')
+
+    Document.objects.filter(geometries__level='full').update(geometry_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0005_document_geometry_full'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='geometry_error',
+            field=models.TextField(blank=True, verbose_name='Erro na Conversão'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='geometry_status',
+            field=models.CharField(blank=True, choices=[('processing', 'Processando'), ('ready', 'Pronto'), ('error', 'Erro')], help_text='O Shapefile é convertido para GeoJSON em segundo plano após o envio.', max_length=20, null=True, verbose_name='Status da Geometria'),
+        ),
+        migrations.RunPython(mark_converted_shapefiles, migrations.RunPython.noop),
+    ]
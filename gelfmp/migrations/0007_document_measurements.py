@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:43
+
+import json
+
+import geopandas as gpd
+import shapely
+from django.db import migrations, models
+
+
+def get_measurements(geojson):
+    # Cópia do cálculo de gelfmp.services.geojson no momento desta migração,
+    # para que ela não dependa do código atual do app.
+    gdf = gpd.GeoDataFrame.from_features(json.loads(geojson), crs='EPSG:4326')
+    if gdf.empty:
+        return {}
+
+    utm = gdf.to_crs(gdf.estimate_utm_crs())
+
+    return {
+        'area_ha': utm.union_all().area / 10_000,
+        'vertex_count': int(shapely.get_num_coordinates(gdf.geometry.values).sum()),
+    }
+
+
+def fill_measurements(apps, schema_editor):
+    DocumentGeometry = apps.get_model('gelfmp', 'DocumentGeometry')
+    Document = apps.get_model('gelfmp', 'Document')
+
+    geometries = DocumentGeometry.objects.filter(level='full')
+
+    for geometry in geometries.iterator(chunk_size=100):
+        Document.objects.filter(pk=geometry.document_id).update(**get_measurements(geometry.geojson))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0006_document_geometry_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='area_ha',
+            field=models.FloatField(blank=True, null=True, verbose_name='Área (ha)'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='vertex_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Quantidade de Vértices'),
+        ),
+        migrations.RunPython(fill_measurements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def fill_daily_entries(apps, schema_editor):
+    CharcoalEntry = apps.get_model('gelfmp', 'CharcoalEntry')
+    CharcoalEntryDaily = apps.get_model('gelfmp', 'CharcoalEntryDaily')
+
+    rows = (
+        CharcoalEntry.objects.order_by()
+        .values('supplier_id', 'entry_date')
+        .annotate(
+            entries_count=Count('id'),
+            total_volume=Sum('entry_volume'),
+            moisture_sum=Sum('moisture'),
+            fines_sum=Sum('fines'),
+            density_sum=Sum('density'),
+            weighted_moisture_sum=Sum(F('moisture') * F('entry_volume')),
+            weighted_fines_sum=Sum(F('fines') * F('entry_volume')),
+            weighted_density_sum=Sum(F('density') * F('entry_volume')),
+        )
+    )
+
+    CharcoalEntryDaily.objects.bulk_create([CharcoalEntryDaily(**row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gelfmp', '0007_document_measurements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharcoalEntryDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('entry_date', models.DateField(verbose_name='Data de Entrada')),
+                ('entries_count', models.IntegerField(verbose_name='Quantidade de Entradas')),
+                ('total_volume', models.FloatField(verbose_name='Volume Total (m³)')),
+                ('moisture_sum', models.FloatField(verbose_name='Soma da Umidade')),
+                ('fines_sum', models.FloatField(verbose_name='Soma dos Finos')),
+                ('density_sum', models.FloatField(verbose_name='Soma da Densidade')),
+                ('weighted_moisture_sum', models.FloatField(verbose_name='Soma da Umidade x Volume')),
+                ('weighted_fines_sum', models.FloatField(verbose_name='Soma dos Finos x Volume')),
+                ('weighted_density_sum', models.FloatField(verbose_name='Soma da Densidade x Volume')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_charcoal_entries', to='gelfmp.supplier', verbose_name='Fornecedor')),
+            ],
+            options={
+                'verbose_name': 'Entrada de Carvão Diária',
+                'verbose_name_plural': 'Entradas de Carvão Diárias',
+                'ordering': ['-entry_date'],
+                'indexes': [models.Index(fields=['entry_date'], name='gelfmp_char_entry_d_fb87b7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('supplier', 'entry_date'), name='unique_charcoal_entry_daily')],
+            },
+        ),
+        migrations.RunPython(fill_daily_entries, migrations.RunPython.noop),
+    ]
@@ -2,35 +2,54 @@ from .alias import Alias
 from .bank_details import BankDetails
 from .charcoal_contract import CharcoalContract
 from .charcoal_entry import CharcoalEntry
+from .charcoal_entry_daily import CharcoalEntryDaily
 from .charcoal_iqf import CharcoalIQF
 from .charcoal_monthly_plan import CharcoalMonthlyPlan
-from .choices import ContactType, DocumentType, MaterialType, Month, SupplierType, year_choices
+from .choices import (
+    ContactType,
+    DocumentType,
+    GeometryLevel,
+    GeometryStatus,
+    MaterialType,
+    Month,
+    SupplierType,
+    year_choices,
+)
 from .city_state import City, State
 from .contact import Contact
 from .dcf import DCF
 from .document import Document
+from .document_geometry import DocumentGeometry
 from .supplier import Supplier
+from .supplier_summary import SupplierSummary
 from .task import Task
+from .tombstone import Tombstone
 
 __all__ = [
     'Alias',
     'BankDetails',
     'CharcoalEntry',
+    'CharcoalEntryDaily',
     'City',
     'State',
     'Document',
+    'DocumentGeometry',
     'Supplier',
+    'SupplierSummary',
     'CharcoalIQF',
     'CharcoalMonthlyPlan',
     'Contact',
     'DCF',
     'CharcoalContract',
     'Task',
+    'Tombstone',
     # Choices
     'MaterialType',
     'SupplierType',
     'ContactType',
     'DocumentType',
+    'GeometryLevel',
+    'GeometryStatus',
     'Month',
     'year_choices',
 ]
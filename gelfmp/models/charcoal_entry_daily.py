@@ -0,0 +1,45 @@
+from django.db import models
+
+from .base_model import BaseModel
+
+
+class CharcoalEntryDaily(BaseModel):
+    """
+    Totais diários das entradas de carvão de cada fornecedor, usados pelos gráficos
+    no lugar das entradas individuais. Atualizado pelo processamento de entradas.
+    """
+
+    supplier = models.ForeignKey(
+        'Supplier',
+        on_delete=models.CASCADE,
+        related_name='daily_charcoal_entries',
+        verbose_name='Fornecedor',
+    )
+
+    entry_date = models.DateField(verbose_name='Data de Entrada')
+    entries_count = models.IntegerField(verbose_name='Quantidade de Entradas')
+    total_volume = models.FloatField(verbose_name='Volume Total (m³)')
+
+    # Somas simples, para as médias por entrada.
+    moisture_sum = models.FloatField(verbose_name='Soma da Umidade')
+    fines_sum = models.FloatField(verbose_name='Soma dos Finos')
+    density_sum = models.FloatField(verbose_name='Soma da Densidade')
+
+    # Somas ponderadas pelo volume de entrada, para as médias por volume.
+    weighted_moisture_sum = models.FloatField(verbose_name='Soma da Umidade x Volume')
+    weighted_fines_sum = models.FloatField(verbose_name='Soma dos Finos x Volume')
+    weighted_density_sum = models.FloatField(verbose_name='Soma da Densidade x Volume')
+
+    def __str__(self):
+        return f'{self.entry_date} - {self.supplier}'
+
+    class Meta:
+        ordering = ['-entry_date']
+        constraints = [
+            models.UniqueConstraint(fields=['supplier', 'entry_date'], name='unique_charcoal_entry_daily'),
+        ]
+        indexes = [
+            models.Index(fields=['entry_date']),
+        ]
+        verbose_name = 'Entrada de Carvão Diária'
+        verbose_name_plural = 'Entradas de Carvão Diárias'
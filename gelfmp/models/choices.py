@@ -56,6 +56,22 @@ class DocumentType(models.TextChoices):
     OTHER = 'other', 'OUTRO'
 
 
+SHAPEFILE_DOCUMENT_TYPES = [DocumentType.PROPERTY_SHAPEFILE, DocumentType.SHAPEFILE]
+
+
+class GeometryStatus(models.TextChoices):
+    PROCESSING = 'processing', 'Processando'
+    READY = 'ready', 'Pronto'
+    ERROR = 'error', 'Erro'
+
+
+class GeometryLevel(models.TextChoices):
+    OVERVIEW = 'overview', 'Visão Geral'
+    REGIONAL = 'regional', 'Regional'
+    DETAIL = 'detail', 'Detalhe'
+    FULL = 'full', 'Original'
+
+
 class SupplierType(models.TextChoices):
     GELF = 'gelf', 'GELF'
     BOTUMIRIM = 'botumirim', 'Botumirim'
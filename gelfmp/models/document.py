@@ -9,7 +9,10 @@ from gelfmp.utils.functions import handle_file_cleanup, handle_file_cleanup_on_d
 from gelfmp.utils.normalization import normalize_file_and_folder
 
 from .base_model import BaseModel
-from .choices import DocumentType
+from .choices import DocumentType, GeometryLevel, GeometryStatus
+
+EXTENT_FIELDS = ['min_lon', 'min_lat', 'max_lon', 'max_lat', 'centroid_lon', 'centroid_lat']
+MEASUREMENT_FIELDS = ['area_ha', 'vertex_count']
 
 
 class Document(BaseModel):
@@ -33,13 +36,6 @@ class Document(BaseModel):
         validators=[validators.validate_max_file_size],
     )
 
-    geojson = models.JSONField(
-        blank=True,
-        null=True,
-        verbose_name='GeoJSON',
-        help_text='Este campo é gerado automaticamente ao subir um Shapefile e não deve ser alterado manualmente.',
-    )
-
     validity = models.DateField(
         blank=True,
         null=True,
@@ -60,10 +56,54 @@ class Document(BaseModel):
         verbose_name='Fornecedor',
     )
 
+    geometry_status = models.CharField(
+        max_length=20,
+        choices=GeometryStatus.choices,
+        blank=True,
+        null=True,
+        verbose_name='Status da Geometria',
+        help_text='O Shapefile é convertido para GeoJSON em segundo plano após o envio.',
+    )
+
+    geometry_error = models.TextField(blank=True, verbose_name='Erro na Conversão')
+
+    # Caixa delimitadora e centróide (EPSG:4326), área e quantidade de vértices
+    # do GeoJSON, preenchidos automaticamente ao converter um Shapefile.
+    min_lon = models.FloatField(null=True, blank=True, verbose_name='Longitude Mínima')
+    min_lat = models.FloatField(null=True, blank=True, verbose_name='Latitude Mínima')
+    max_lon = models.FloatField(null=True, blank=True, verbose_name='Longitude Máxima')
+    max_lat = models.FloatField(null=True, blank=True, verbose_name='Latitude Máxima')
+    centroid_lon = models.FloatField(null=True, blank=True, verbose_name='Longitude do Centróide')
+    centroid_lat = models.FloatField(null=True, blank=True, verbose_name='Latitude do Centróide')
+
+    area_ha = models.FloatField(null=True, blank=True, verbose_name='Área (ha)')
+    vertex_count = models.PositiveIntegerField(null=True, blank=True, verbose_name='Quantidade de Vértices')
+
     @property
     def filename(self):
         return os.path.basename(self.file.name)
 
+    @property
+    def geojson(self):
+        """
+        GeoJSON original do Shapefile. É armazenado em `DocumentGeometry`
+        e só é carregado do banco quando acessado.
+        """
+
+        if not hasattr(self, '_geojson'):
+            self._geojson = None
+
+            if self.pk:
+                full = self.geometries.filter(level=GeometryLevel.FULL)
+                self._geojson = full.values_list('geojson', flat=True).first()
+
+        return self._geojson
+
+    @geojson.setter
+    def geojson(self, value):
+        self._geojson = value
+        self._geojson_changed = True
+
     def delete(self, *args, **kwargs):
         handle_file_cleanup_on_delete(self)
         super().delete(*args, **kwargs)
@@ -103,20 +143,31 @@ class Document(BaseModel):
                 ).exists():
                     raise ValidationError('O fornecedor ja possui um Shapefile de Propriedade.')
 
-            if self.file:
-                try:
-                    if self.file.name.lower().endswith('.zip'):
-                        self.geojson = geojson.from_shapefile_zip(self.file)
-                    else:
-                        raise ValidationError('O arquivo enviado deve ser um arquivo ZIP válido.')
+            if self.file and not self.file.name.lower().endswith('.zip'):
+                raise ValidationError('O arquivo enviado deve ser um arquivo ZIP válido.')
 
-                except ValidationError as e:
-                    raise e
+            # Apenas valida o ZIP de um novo arquivo enviado. A conversão
+            # para GeoJSON é feita em segundo plano, após o documento ser salvo.
+            if self.file and not self.file._committed:
+                geojson.validate_shapefile_zip(self.file)
+                self.geometry_status = GeometryStatus.PROCESSING
+                self._shapefile_uploaded = True
 
         return super().clean()
 
     def save(self, *args, **kwargs):
         handle_file_cleanup(self)
+
+        # As geometrias são gravadas em `DocumentGeometry`
+        # pelo sinal post_save, após o documento ser salvo.
+        if getattr(self, '_geojson_changed', False):
+            summary = {}
+            if self._geojson:
+                summary = geojson.get_extent(self._geojson) | geojson.get_measurements(self._geojson)
+
+            for field in EXTENT_FIELDS + MEASUREMENT_FIELDS:
+                setattr(self, field, summary.get(field))
+
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,33 @@
+from django.db import models
+
+from .base_model import BaseModel
+from .choices import GeometryLevel
+
+
+class DocumentGeometry(BaseModel):
+    """
+    GeoJSON de um Shapefile em um nível de detalhe: o original ou uma versão
+    simplificada para um nível de zoom do mapa. Fica fora da tabela de documentos
+    para que as consultas de documentos não carreguem os polígonos.
+    """
+
+    document = models.ForeignKey(
+        'Document',
+        on_delete=models.CASCADE,
+        related_name='geometries',
+        verbose_name='Documento',
+    )
+
+    level = models.CharField(max_length=20, choices=GeometryLevel.choices, verbose_name='Nível')
+    geojson = models.JSONField(verbose_name='GeoJSON')
+
+    def __str__(self):
+        return f'{self.document} ({self.level})'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'level'], name='unique_document_geometry_level'),
+        ]
+
+        verbose_name = 'Geometria de Documento'
+        verbose_name_plural = 'Geometrias de Documentos'
@@ -0,0 +1,33 @@
+from django.db import models
+
+from .base_model import BaseModel
+
+
+class SupplierSummary(BaseModel):
+    """
+    Resumo desnormalizado das entradas de carvão recentes e do IQF de um fornecedor.
+    Atualizado pelo processamento de entradas e pelo cálculo de IQF.
+    """
+
+    supplier = models.OneToOneField(
+        'Supplier',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary',
+        verbose_name='Fornecedor',
+    )
+
+    average_moisture = models.FloatField(null=True, blank=True, verbose_name='Umidade Média (%)')
+    average_fines = models.FloatField(null=True, blank=True, verbose_name='Finos Média (%)')
+    average_density = models.FloatField(null=True, blank=True, verbose_name='Densidade Média')
+    first_entry_date = models.DateField(null=True, blank=True, verbose_name='Data da Primeira Entrada')
+    last_entry_date = models.DateField(null=True, blank=True, verbose_name='Data da Última Entrada')
+    entries_count = models.IntegerField(default=0, verbose_name='Quantidade de Entradas')
+    rating = models.FloatField(null=True, blank=True, verbose_name='Média dos Últimos IQFs')
+
+    def __str__(self):
+        return f'Resumo - {self.supplier}'
+
+    class Meta:
+        verbose_name = 'Resumo de Fornecedor'
+        verbose_name_plural = 'Resumos de Fornecedores'
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .base_model import BaseModel
+
+
+class Tombstone(BaseModel):
+    """
+    Registro de um objeto excluído, usado pela sincronização incremental
+    de fornecedores para informar exclusões aos clientes.
+    """
+
+    model = models.CharField(max_length=100, verbose_name='Modelo')
+    object_id = models.BigIntegerField(verbose_name='ID do Objeto')
+
+    # Não é uma ForeignKey pois o fornecedor pode ter sido excluído.
+    supplier_id = models.BigIntegerField(null=True, blank=True, verbose_name='ID do Fornecedor')
+
+    def __str__(self):
+        return f'{self.model} ({self.object_id})'
+
+    @staticmethod
+    def retention_start():
+        """Data a partir da qual os registros de exclusão são mantidos (TOMBSTONE_RETENTION_DAYS)."""
+
+        return timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+        ordering = ['-created_at']
+        verbose_name = 'Registro de Exclusão'
+        verbose_name_plural = 'Registros de Exclusão'
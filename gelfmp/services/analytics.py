@@ -0,0 +1,293 @@
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import Max
+
+from gelfcore.logger import log
+from gelfmp.models import CharcoalEntry, CharcoalIQF, CharcoalMonthlyPlan, Supplier
+from gelfmp.services import chart_cache
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+_sync_lock = threading.Lock()
+_reader_lock = threading.Lock()
+
+# Conexão de leitura reaproveitada entre as consultas e a identificação do arquivo em que foi aberta.
+_reader = None
+
+# Tabelas copiadas para o DuckDB: modelo de origem e colunas (nome e tipo no DuckDB).
+TABLES = {
+    'supplier': (
+        Supplier,
+        [
+            ('id', 'BIGINT PRIMARY KEY'),
+            ('corporate_name', 'VARCHAR'),
+            ('material_type', 'VARCHAR'),
+            ('supplier_type', 'VARCHAR'),
+            ('state_id', 'VARCHAR'),
+        ],
+    ),
+    'charcoal_entry': (
+        CharcoalEntry,
+        [
+            ('id', 'BIGINT PRIMARY KEY'),
+            ('supplier_id', 'BIGINT'),
+            ('dcf_id', 'BIGINT'),
+            ('entry_date', 'DATE'),
+            ('entry_volume', 'DOUBLE'),
+            ('moisture', 'DOUBLE'),
+            ('fines', 'DOUBLE'),
+            ('density', 'DOUBLE'),
+        ],
+    ),
+    'charcoal_iqf': (
+        CharcoalIQF,
+        [
+            ('id', 'BIGINT PRIMARY KEY'),
+            ('supplier_id', 'BIGINT'),
+            ('month', 'INTEGER'),
+            ('year', 'INTEGER'),
+            ('iqf', 'DOUBLE'),
+        ],
+    ),
+    'charcoal_monthly_plan': (
+        CharcoalMonthlyPlan,
+        [
+            ('id', 'BIGINT PRIMARY KEY'),
+            ('supplier_id', 'BIGINT'),
+            ('month', 'INTEGER'),
+            ('year', 'INTEGER'),
+            ('planned_volume', 'DOUBLE'),
+        ],
+    ),
+}
+
+TRUNC_UNITS = {'day': 'day', 'week': 'week', 'month': 'month'}
+
+
+def is_available():
+    return duckdb is not None
+
+
+def is_enabled():
+    """Indica se as agregações devem ser feitas na cópia DuckDB (habilitada e já sincronizada)."""
+
+    return settings.ANALYTICS_BACKEND == 'duckdb' and is_available() and os.path.isfile(settings.ANALYTICS_DB_PATH)
+
+
+@contextmanager
+def reader():
+    """
+    Fornece a conexão de leitura do processo. Abrir uma conexão custa mais que as próprias
+    consultas dos painéis, então ela é mantida aberta e só é reaberta quando a sincronização
+    substitui o arquivo. As consultas são serializadas pelo lock, o que também garante que a
+    conexão antiga não esteja em uso ao ser fechada.
+    """
+
+    global _reader
+
+    path = str(settings.ANALYTICS_DB_PATH)
+    stat = os.stat(path)
+    key = (path, stat.st_ino, stat.st_mtime_ns)
+
+    with _reader_lock:
+        if _reader is None or _reader[0] != key:
+            if _reader is not None:
+                # O DuckDB reaproveita o banco já aberto no mesmo caminho, então a conexão
+                # antiga precisa ser fechada para que a nova leia o arquivo substituído.
+                _reader[1].close()
+                _reader = None
+
+            _reader = (key, duckdb.connect(path, read_only=True))
+
+        yield _reader[1]
+
+
+def to_utc(value):
+    # As datas são gravadas no DuckDB em UTC sem fuso (o tipo TIMESTAMPTZ exige o pytz).
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value else None
+
+
+def from_utc(value):
+    return value.replace(tzinfo=timezone.utc) if value else None
+
+
+def create_tables(connection):
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS sync_state ('
+        'table_name VARCHAR PRIMARY KEY, updated_mark TIMESTAMP, synced_at TIMESTAMP, row_count BIGINT)'
+    )
+
+    for table, (_, columns) in TABLES.items():
+        definition = ', '.join(f'{column} {column_type}' for column, column_type in columns)
+        connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definition})')
+
+
+def sync_table(connection, table):
+    """
+    Copia as linhas criadas ou alteradas desde a última sincronização (pelo `updated_at`) e remove
+    as que não existem mais no SQLite. Retorna a quantidade de linhas copiadas e se a tabela mudou.
+    """
+
+    model, columns = TABLES[table]
+    names = [column for column, _ in columns]
+
+    row = connection.execute('SELECT updated_mark FROM sync_state WHERE table_name = ?', [table]).fetchone()
+    updated_mark = from_utc(row[0]) if row else None
+
+    # A marca é lida antes das linhas, para que nada alterado durante a cópia fique para trás.
+    objects = model.objects.order_by()
+    new_mark = objects.aggregate(mark=Max('updated_at'))['mark']
+
+    changed = objects if updated_mark is None else objects.filter(updated_at__gte=updated_mark)
+    rows = pd.DataFrame.from_records(list(changed.values_list(*names)), columns=names)
+
+    if not rows.empty:
+        connection.register('changed_rows', rows)
+        connection.execute(f'INSERT OR REPLACE INTO {table} SELECT {", ".join(names)} FROM changed_rows')
+        connection.unregister('changed_rows')
+
+    # Exclusões não alteram o `updated_at`, então os IDs são conferidos com os do SQLite.
+    ids = pd.DataFrame({'id': list(objects.values_list('id', flat=True))}, dtype='int64')
+    connection.register('current_ids', ids)
+    (deleted,) = connection.execute(f'DELETE FROM {table} WHERE id NOT IN (SELECT id FROM current_ids)').fetchone()
+    connection.unregister('current_ids')
+
+    connection.execute(
+        'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)',
+        [table, to_utc(new_mark or updated_mark), to_utc(datetime.now(timezone.utc)), len(ids)],
+    )
+
+    # As linhas gravadas no mesmo instante da marca são copiadas de novo a cada sincronização,
+    # então só há mudança quando a marca avança ou alguma linha é removida.
+    return len(rows), deleted > 0 or new_mark != updated_mark
+
+
+def sync():
+    """
+    Atualiza a cópia DuckDB de forma incremental. A sincronização é feita em uma cópia do
+    arquivo, que depois substitui o original, para não bloquear as leituras dos painéis.
+    Retorna a quantidade de linhas copiadas de cada tabela.
+
+    Quando algo muda, a versão do cache dos gráficos também muda, já que os gráficos
+    gerados antes da sincronização (inclusive após a última alteração no SQLite)
+    refletem a cópia antiga.
+    """
+
+    path = str(settings.ANALYTICS_DB_PATH)
+    temp_path = f'{path}.sync'
+
+    with _sync_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if os.path.isfile(path):
+            shutil.copyfile(path, temp_path)
+        elif os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+        connection = duckdb.connect(temp_path)
+        try:
+            create_tables(connection)
+            results = {table: sync_table(connection, table) for table in TABLES}
+        finally:
+            connection.close()
+
+        os.replace(temp_path, path)
+
+    synced = {table: copied for table, (copied, _) in results.items()}
+    if any(changed for _, changed in results.values()):
+        chart_cache.bump_version()
+
+    log.info(f'Cópia analítica sincronizada: {synced}')
+    return synced
+
+
+def get_freshness():
+    """Retorna, por tabela, a última sincronização, a marca de atualização e a quantidade de linhas."""
+
+    if not is_available() or not os.path.isfile(settings.ANALYTICS_DB_PATH):
+        return {}
+
+    with reader() as connection:
+        rows = connection.execute('SELECT table_name, updated_mark, synced_at, row_count FROM sync_state').fetchall()
+
+    return {
+        table: {'updated_mark': from_utc(updated_mark), 'synced_at': from_utc(synced_at), 'rows': row_count}
+        for table, updated_mark, synced_at, row_count in rows
+    }
+
+
+def query(sql, parameters=None):
+    with reader() as connection:
+        return connection.execute(sql, parameters or []).df()
+
+
+def entries_frame(group_by, start_date, end_date, supplier_id):
+    """Mesma agregação de `chart_data.build_entries_frame`, feita diretamente nas entradas da cópia DuckDB."""
+
+    conditions, parameters = ['TRUE'], []
+
+    if start_date:
+        conditions.append('entry_date >= ?')
+        parameters.append(start_date)
+
+    if end_date:
+        conditions.append('entry_date <= ?')
+        parameters.append(end_date)
+
+    if supplier_id is not None:
+        conditions.append('supplier_id = ?')
+        parameters.append(int(supplier_id))
+
+    frame = query(
+        f"""
+        SELECT
+            CAST(date_trunc('{TRUNC_UNITS[group_by]}', entry_date) AS DATE) AS entry_period,
+            SUM(entry_volume) AS total_volume,
+            AVG(moisture) AS average_moisture,
+            AVG(fines) AS average_fines,
+            AVG(density) AS average_density
+        FROM charcoal_entry
+        WHERE {' AND '.join(conditions)}
+        GROUP BY entry_period
+        ORDER BY entry_period
+        """,
+        parameters,
+    )
+
+    frame['entry_period'] = frame['entry_period'].dt.date
+    return frame
+
+
+def schedule_volumes(year):
+    """Volumes programado e realizado por tipo de fornecedor e mês, como no painel de programação."""
+
+    planned = query(
+        """
+        SELECT s.supplier_type, p.month, SUM(p.planned_volume) AS volume
+        FROM charcoal_monthly_plan p JOIN supplier s ON s.id = p.supplier_id
+        WHERE p.year = ?
+        GROUP BY s.supplier_type, p.month
+        """,
+        [year],
+    )
+
+    realized = query(
+        """
+        SELECT s.supplier_type, month(e.entry_date) AS month, SUM(e.entry_volume) AS volume
+        FROM charcoal_entry e JOIN supplier s ON s.id = e.supplier_id
+        WHERE year(e.entry_date) = ?
+        GROUP BY s.supplier_type, month
+        """,
+        [year],
+    )
+
+    return planned.itertuples(index=False, name=None), realized.itertuples(index=False, name=None)
@@ -0,0 +1,161 @@
+import os
+
+import geopandas as gpd
+import numpy as np
+import orjson
+import shapely
+import topojson
+
+from gelfcore.logger import log
+from gelfmp.services.geojson import GEOMETRY_LEVELS
+from gelfmp.utils.precompressed import write_precompressed
+
+MANIFEST_NAME = 'manifest.json'
+
+# Casas decimais mantidas nas coordenadas de cada nível. Coordenadas com precisão
+# maior que a tolerância de simplificação só aumentam o tamanho do arquivo.
+LEVEL_PRECISION = {level: round(-np.log10(tolerance)) + 1 for level, tolerance, _ in GEOMETRY_LEVELS}
+
+# Código IBGE de cada estado, usado no nome dos arquivos de municípios (geojs-XX-mun.json).
+STATE_CODES = {
+    'RO': 11,
+    'AC': 12,
+    'AM': 13,
+    'RR': 14,
+    'PA': 15,
+    'AP': 16,
+    'TO': 17,
+    'MA': 21,
+    'PI': 22,
+    'CE': 23,
+    'RN': 24,
+    'PB': 25,
+    'PE': 26,
+    'AL': 27,
+    'SE': 28,
+    'BA': 29,
+    'MG': 31,
+    'ES': 32,
+    'RJ': 33,
+    'SP': 35,
+    'PR': 41,
+    'SC': 42,
+    'RS': 43,
+    'MS': 50,
+    'MT': 51,
+    'GO': 52,
+    'DF': 53,
+}
+
+STATES_LAYER = 'states'
+STATES_SOURCE = 'br_states.json'
+
+
+def cities_layer(state):
+    return f'cities-{STATE_CODES[state]}'
+
+
+def cities_source(state):
+    return f'geojs-{STATE_CODES[state]}-mun.json'
+
+
+def layer_filename(layer, level):
+    return f'{layer}.{level}.json'
+
+
+def simplify_layer(gdf, level, tolerance):
+    """
+    Simplifica as geometrias preservando as divisas compartilhadas entre os
+    polígonos (via topologia), para que não surjam buracos entre municípios vizinhos.
+    """
+
+    simplified = topojson.Topology(gdf, toposimplify=tolerance, prequantize=False).to_gdf()
+    decimals = LEVEL_PRECISION[level]
+    simplified['geometry'] = shapely.transform(simplified.geometry.values, lambda coords: np.round(coords, decimals))
+
+    return simplified
+
+
+def read_layer(source_path):
+    """Lê a camada original, mantendo o `id` dos features (usado pelo frontend) como índice."""
+
+    with open(source_path, 'rb') as file:
+        features = orjson.loads(file.read())['features']
+
+    gdf = gpd.GeoDataFrame.from_features(features, crs='EPSG:4326')
+    has_ids = any('id' in feature for feature in features)
+
+    if has_ids:
+        gdf.index = [feature.get('id') for feature in features]
+
+    return gdf, has_ids
+
+
+def build_layer(source_path, output_dir, layer):
+    """Gera os arquivos de cada nível de simplificação de uma camada. Retorna os tamanhos gerados."""
+
+    gdf, has_ids = read_layer(source_path)
+
+    sizes = {}
+    for level, tolerance, _ in GEOMETRY_LEVELS:
+        simplified = simplify_layer(gdf, level, tolerance)
+        content = simplified.to_json(drop_id=not has_ids, separators=(',', ':')).encode()
+
+        write_precompressed(os.path.join(output_dir, layer_filename(layer, level)), content)
+        sizes[str(level)] = len(content)
+
+    log.info(f'Camada {layer} gerada: {os.path.getsize(source_path)} bytes originais, níveis {sizes}.')
+
+    return sizes
+
+
+def write_manifest(output_dir):
+    """
+    Gera o manifesto lido pelo frontend com os níveis disponíveis (e o maior zoom
+    de cada um) e as camadas já geradas no diretório, inclusive em execuções anteriores.
+    """
+
+    levels = [level for level, _, _ in GEOMETRY_LEVELS]
+    layers = {}
+
+    for filename in sorted(os.listdir(output_dir)):
+        if not filename.endswith('.json') or filename == MANIFEST_NAME:
+            continue
+
+        layer, level = filename.removesuffix('.json').rsplit('.', 1)
+        if level in levels:
+            layers.setdefault(layer, []).append(level)
+
+    manifest = {
+        # O último nível é usado em qualquer zoom acima dos anteriores.
+        'levels': [
+            {'level': level, 'max_zoom': max_zoom if index < len(GEOMETRY_LEVELS) - 1 else None}
+            for index, (level, _, max_zoom) in enumerate(GEOMETRY_LEVELS)
+        ],
+        'layers': {layer: [level for level in levels if level in available] for layer, available in layers.items()},
+    }
+
+    write_precompressed(os.path.join(output_dir, MANIFEST_NAME), orjson.dumps(manifest))
+
+    return manifest
+
+
+def build_boundary_layers(source_dir, output_dir, states, include_states_layer=True):
+    """Gera as camadas simplificadas dos limites estaduais e dos municípios dos estados informados."""
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    layers = [(STATES_LAYER, STATES_SOURCE)] if include_states_layer else []
+    layers += [(cities_layer(state), cities_source(state)) for state in sorted(states)]
+
+    for layer, source in layers:
+        source_path = os.path.join(source_dir, source)
+
+        # Camadas sem o arquivo original continuam sendo servidas pelo frontend sem simplificação.
+        if not os.path.isfile(source_path):
+            log.warning(f'Arquivo {source} não encontrado, a camada {layer} não será gerada.')
+            continue
+
+        build_layer(source_path, output_dir, layer)
+
+    return write_manifest(output_dir)
@@ -0,0 +1,142 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils.timezone import now
+
+from gelfcore.logger import log
+from gelfmp import views
+from gelfmp.api import charts as chart_api
+from gelfmp.api import suppliers as supplier_api
+from gelfmp.charts.downsampling import DEFAULT_MAX_POINTS
+from gelfmp.models import MaterialType, Supplier
+from gelfmp.services import analytics, chart_cache
+
+# Itens aquecidos ao mesmo tempo. Cada um ocupa uma conexão com o banco,
+# então poucos por vez para não disputar o SQLite com as requisições.
+WARM_WORKERS = 4
+
+# Aquecimentos agendados após a importação de entradas, um por vez.
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cache-warmer')
+
+DASHBOARD_CHARTS = ['charcoal_entries', 'average_density', 'average_moisture_and_fines']
+
+SUPPLIER_CHARTS = ['supplier_charcoal_entries', 'supplier_average_moisture_and_fines', 'supplier_average_density']
+
+GROUP_BY_OPTIONS = ['day', 'week', 'month']
+
+
+def chart_item(chart_id, **params):
+    """Gera o gráfico com os mesmos parâmetros (e a mesma chave de cache) da requisição do navegador."""
+
+    def warm():
+        content, _ = chart_api.get_chart_data(chart_id, params)
+        if chart_cache.is_chart_error(content):
+            raise ValueError('o gráfico não pôde ser gerado')
+
+    return f'chart {chart_id} {params}', warm
+
+
+def get_warm_items():
+    """
+    Retorna os itens aquecidos, como pares (nome, função), na mesma forma em que são pedidos pelas páginas:
+
+    - os gráficos do painel de carvão carregados via htmx e os enviados pelo formulário de
+      filtro em cada modo de exibição (diário, semanal e mensal), sem outros filtros;
+    - os gráficos da página de estatísticas de cada fornecedor de carvão ativo;
+    - a programação do ano atual;
+    - a listagem de fornecedores da API.
+    """
+
+    items = [chart_item(chart_id, max_points=DEFAULT_MAX_POINTS, html=True) for chart_id in DASHBOARD_CHARTS]
+
+    for group_by in GROUP_BY_OPTIONS:
+        form_params = {'group_by': group_by, 'supplier': '', 'start_date': '', 'end_date': ''}
+        items += [chart_item(chart_id, **form_params, max_points=DEFAULT_MAX_POINTS) for chart_id in DASHBOARD_CHARTS]
+
+    suppliers = Supplier.objects.filter(active=True, material_type=MaterialType.CHARCOAL).order_by('id')
+    for supplier_id in suppliers.values_list('id', flat=True):
+        items.append(chart_item('supplier_iqfs_last_3_months', supplier_id=supplier_id, html=True))
+        items += [
+            chart_item(chart_id, supplier=supplier_id, max_points=DEFAULT_MAX_POINTS, html=True)
+            for chart_id in SUPPLIER_CHARTS
+        ]
+
+    year = now().year
+    items.append((f'charcoal_schedule {year}', lambda: warm_schedule(year)))
+    items.append(('api suppliers', fetch_suppliers))
+
+    return items
+
+
+def warm_schedule(year):
+    schedule, _ = views.get_charcoal_schedule(year)
+    if chart_cache.is_chart_error(schedule):
+        raise ValueError('o gráfico da programação não pôde ser gerado')
+
+
+def fetch_suppliers():
+    # A listagem não tem cache no servidor (é enviada em partes e revalidada pelo ETag),
+    # então gerá-la apenas carrega os dados do banco para a memória.
+    response = supplier_api.get_suppliers(RequestFactory().get(reverse('get_suppliers')))
+    for _ in response.streaming_content:
+        pass
+
+
+def run_item(name, warm):
+    start = time.perf_counter()
+    error = None
+
+    try:
+        warm()
+
+    except Exception as e:
+        error = str(e)
+        log.error(f'Erro ao aquecer o cache de {name}: {e}')
+
+    finally:
+        # Cada thread do executor abre a sua própria conexão com o banco.
+        connection.close()
+
+    return name, time.perf_counter() - start, error
+
+
+def warm_caches(workers=WARM_WORKERS):
+    """
+    Gera os gráficos e as páginas mais acessados para que o primeiro acesso após uma
+    importação já encontre o cache pronto. Retorna, para cada item, o nome, o tempo
+    gasto (em segundos) e o erro, caso tenha ocorrido.
+    """
+
+    # Com a cópia analítica habilitada, ela precisa refletir os dados novos antes dos
+    # gráficos serem gerados, senão o cache seria gravado com os dados antigos.
+    if analytics.is_enabled():
+        analytics.sync()
+
+    items = get_warm_items()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warmer-item') as pool:
+        return list(pool.map(lambda item: run_item(*item), items))
+
+
+def run_warm_caches():
+    try:
+        start = time.perf_counter()
+        results = warm_caches()
+        errors = sum(error is not None for _, _, error in results)
+
+        log.info(f'Cache aquecido: {len(results)} itens em {time.perf_counter() - start:.2f}s ({errors} com erro).')
+
+    except Exception as e:
+        log.error(f'Erro ao aquecer o cache: {e}')
+
+    finally:
+        connection.close()
+
+
+def schedule_warm_caches():
+    """Agenda o aquecimento do cache em segundo plano, sem ocupar a requisição de importação."""
+
+    executor.submit(run_warm_caches)
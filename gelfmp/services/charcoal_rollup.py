@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast
+
+from gelfmp.models import CharcoalEntry, CharcoalEntryDaily
+
+ROLLUP_FIELDS = [
+    'entries_count',
+    'total_volume',
+    'moisture_sum',
+    'fines_sum',
+    'density_sum',
+    'weighted_moisture_sum',
+    'weighted_fines_sum',
+    'weighted_density_sum',
+    'updated_at',
+]
+
+
+def aggregate_entries(entries):
+    """Agrupa as entradas por fornecedor e dia, calculando os totais do `CharcoalEntryDaily`."""
+
+    return (
+        entries
+        .order_by()
+        .values('supplier_id', 'entry_date')
+        .annotate(
+            entries_count=Count('id'),
+            total_volume=Sum('entry_volume'),
+            moisture_sum=Sum('moisture'),
+            fines_sum=Sum('fines'),
+            density_sum=Sum('density'),
+            weighted_moisture_sum=Sum(F('moisture') * F('entry_volume')),
+            weighted_fines_sum=Sum(F('fines') * F('entry_volume')),
+            weighted_density_sum=Sum(F('density') * F('entry_volume')),
+        )
+    )
+
+
+@transaction.atomic
+def refresh_daily_entries(keys=None):
+    """
+    Recalcula os totais diários dos pares (fornecedor, dia) informados em `keys`,
+    ou de todas as entradas caso seja None. Dias que não possuem mais entradas são removidos.
+    """
+
+    if keys is None:
+        CharcoalEntryDaily.objects.all().delete()
+        entries = CharcoalEntry.objects.all()
+        existing = CharcoalEntryDaily.objects.none()
+
+    else:
+        keys = set(keys)
+        if not keys:
+            return 0
+
+        # Filtra pelos fornecedores e dias separadamente, em vez de um OR por par. Os demais
+        # pares que entram no filtro são apenas recalculados com os mesmos valores.
+        supplier_ids = {supplier_id for supplier_id, _ in keys}
+        entry_dates = {entry_date for _, entry_date in keys}
+
+        entries = CharcoalEntry.objects.filter(supplier_id__in=supplier_ids, entry_date__in=entry_dates)
+        existing = CharcoalEntryDaily.objects.filter(supplier_id__in=supplier_ids, entry_date__in=entry_dates)
+
+    rows = [CharcoalEntryDaily(**row) for row in aggregate_entries(entries)]
+
+    CharcoalEntryDaily.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['supplier', 'entry_date'],
+        update_fields=ROLLUP_FIELDS,
+        batch_size=500,
+    )
+
+    refreshed = {(row.supplier_id, row.entry_date) for row in rows}
+    empty_ids = [
+        id
+        for id, supplier_id, entry_date in existing.values_list('id', 'supplier_id', 'entry_date')
+        if (supplier_id, entry_date) not in refreshed
+    ]
+
+    if empty_ids:
+        CharcoalEntryDaily.objects.filter(id__in=empty_ids).delete()
+
+    return len(rows)
+
+
+def average(field):
+    """Média por entrada de um dos campos a partir das somas diárias."""
+
+    return Cast(Sum(f'{field}_sum'), FloatField()) / Sum('entries_count')
@@ -0,0 +1,79 @@
+import time
+
+from django.core.cache import cache
+
+from gelfmp.utils.error_handlers import ChartError
+
+CHART_CACHE_TIMEOUT = 60 * 60 * 24  # 24 horas
+
+CHART_CACHE_VERSION_KEY = 'chart_cache_version'
+CHART_CACHE_HITS_KEY = 'chart_cache_hits'
+CHART_CACHE_MISSES_KEY = 'chart_cache_misses'
+
+
+def get_version():
+    """
+    Retorna a versão atual do cache dos gráficos, que faz parte da chave de cada gráfico.
+    A versão inicial é baseada no horário para que, caso a chave da versão seja removida
+    do cache, os gráficos gravados com as versões anteriores não voltem a ser usados.
+    """
+
+    return cache.get_or_set(CHART_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_version():
+    """Invalida todos os gráficos em cache, que passam a ser gerados novamente."""
+
+    try:
+        cache.incr(CHART_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CHART_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def increment_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def is_chart_error(content):
+    """Indica se o conteúdo (ou algum dos valores, no caso de um dict) é o html de erro de um gráfico."""
+
+    if isinstance(content, dict):
+        return any(isinstance(value, ChartError) for value in content.values())
+
+    return isinstance(content, ChartError)
+
+
+def get_or_build(cache_key, build):
+    """
+    Retorna o gráfico em cache ou o gera com `build`. Retorna também se houve acerto no cache.
+    Gráficos que falharam não são guardados, para que a próxima requisição tente novamente.
+    """
+
+    content = cache.get(cache_key)
+    if content is not None:
+        increment_counter(CHART_CACHE_HITS_KEY)
+        return content, True
+
+    increment_counter(CHART_CACHE_MISSES_KEY)
+
+    content = build()
+    if not is_chart_error(content):
+        cache.set(cache_key, content, CHART_CACHE_TIMEOUT)
+
+    return content, False
+
+
+def get_stats():
+    hits = cache.get(CHART_CACHE_HITS_KEY, 0)
+    misses = cache.get(CHART_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        'version': get_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
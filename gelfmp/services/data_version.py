@@ -0,0 +1,32 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+DATA_VERSION_KEY = 'data_version'
+
+
+def get_version():
+    """
+    Retorna a versão atual dos dados expostos pela API (fornecedores, documentos, entradas e IQFs),
+    usada na chave do fingerprint dos modelos. Assim como a versão do cache dos gráficos, a versão
+    inicial é baseada no horário para que fingerprints de versões anteriores não voltem a ser usados.
+    """
+
+    return cache.get_or_set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_version():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_on_commit():
+    """
+    Invalida os fingerprints após o commit da transação atual, para que nenhum
+    fingerprint seja calculado com os dados antigos e gravado na nova versão.
+    """
+
+    transaction.on_commit(bump_version)
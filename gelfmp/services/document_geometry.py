@@ -0,0 +1,53 @@
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from gelfmp.models import DocumentGeometry, GeometryLevel
+from gelfmp.services import data_version, geojson
+
+
+def refresh_document_geometries(document):
+    """
+    Grava o GeoJSON original do documento e regera as suas versões
+    simplificadas, removendo-as caso o documento não possua GeoJSON.
+    """
+
+    # As geometrias são gravadas em massa, sem sinais, então o fingerprint da API é invalidado aqui.
+    data_version.bump_on_commit()
+
+    if not document.geojson:
+        DocumentGeometry.objects.filter(document=document).delete()
+        return 0
+
+    levels = {GeometryLevel.FULL: document.geojson, **geojson.simplify_levels(document.geojson)}
+
+    geometries = [
+        DocumentGeometry(document=document, level=level, geojson=level_geojson)
+        for level, level_geojson in levels.items()
+    ]
+
+    DocumentGeometry.objects.bulk_create(
+        geometries,
+        update_conflicts=True,
+        unique_fields=['document', 'level'],
+        update_fields=['geojson', 'updated_at'],
+    )
+
+    return len(geometries)
+
+
+def level_geojson(level):
+    return Subquery(DocumentGeometry.objects.filter(document=OuterRef('pk'), level=level).values('geojson'))
+
+
+def document_geojson(level=None):
+    """
+    Expressão que retorna o GeoJSON do documento no nível informado, usando o
+    GeoJSON original caso o nível não seja informado ou ainda não tenha sido gerado.
+    """
+
+    full = level_geojson(GeometryLevel.FULL)
+
+    if not level or level == GeometryLevel.FULL:
+        return full
+
+    return Coalesce(level_geojson(level), full)
@@ -8,6 +8,7 @@ from gelfmp.management.commands.collectors.utils import get_best_matches
 from gelfmp.models import CharcoalEntry, Supplier
 from gelfmp.models.alias import Alias
 from gelfmp.models.dcf import DCF
+from gelfmp.services import charcoal_rollup, chart_cache, data_version, entries_store, supplier_summary
 
 CHARCOAL_ENTRIES_SHEET_NAME = 'Entrada de Carvão'
 MINIMUM_SIMILARITY = 95
@@ -124,6 +125,21 @@ class EntriesProcessor:
                 with transaction.atomic():
                     CharcoalEntry.objects.bulk_create(self.entries)
 
+                    # Atualiza o resumo apenas dos fornecedores
+                    # que receberam novas entradas.
+                    supplier_summary.refresh_supplier_summaries({entry.supplier_id for entry in self.entries})
+
+                    # Atualiza os totais diários apenas dos dias que receberam novas entradas.
+                    charcoal_rollup.refresh_daily_entries({
+                        (entry.supplier_id, entry.entry_date) for entry in self.entries
+                    })
+
+                    # O bulk_create não dispara os sinais que invalidam o cache dos gráficos e o
+                    # fingerprint da API e que fazem o store das entradas buscar as alterações.
+                    transaction.on_commit(chart_cache.bump_version)
+                    transaction.on_commit(entries_store.mark_stale)
+                    data_version.bump_on_commit()
+
             except IntegrityError as e:
                 if 'ticket' not in str(e).lower():
                     raise
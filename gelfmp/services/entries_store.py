@@ -0,0 +1,173 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from django.db.models import Count, Max
+
+from gelfmp.models import CharcoalEntry, Tombstone
+
+_store = None
+_checked_at = None
+_lock = threading.Lock()
+
+# Intervalo mínimo (em segundos) entre as verificações do estado das entradas no banco. As gravações
+# feitas pelo ORM neste processo marcam o store para ser verificado já na próxima consulta.
+STATE_CHECK_INTERVAL = 5
+
+# Idade máxima (em segundos) do store. Alterações que não passam pelo `updated_at` nem pelos sinais
+# (ex: `QuerySet.update`) só são percebidas pela carga completa feita após esse tempo.
+MAX_AGE = 15 * 60
+
+# Colunas carregadas de CharcoalEntry e o tipo do array de cada uma.
+COLUMNS = {
+    'id': np.int64,
+    'supplier_id': np.int64,
+    'dcf_id': np.int64,
+    'entry_date': 'datetime64[D]',
+    'entry_volume': np.float64,
+    'moisture': np.float64,
+    'fines': np.float64,
+    'density': np.float64,
+}
+
+
+def get_entries_state():
+    """Última alteração e quantidade de entradas, usadas para saber se o store está atualizado."""
+
+    state = CharcoalEntry.objects.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return state['last_modified'], state['count']
+
+
+def load_columns(queryset):
+    rows = list(queryset.order_by('id').values_list(*COLUMNS))
+    if not rows:
+        return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+
+    return {column: np.array(values, dtype=COLUMNS[column]) for column, values in zip(COLUMNS, zip(*rows))}
+
+
+class EntriesStore:
+    """
+    Cópia em memória (um array NumPy por coluna, ordenada pelo id) das entradas de carvão,
+    usada pelas análises para filtrar e agregar sem criar objetos do ORM a cada chamada.
+
+    O store é atualizado de forma incremental: as entradas criadas ou alteradas desde a última
+    carga são buscadas pelo `updated_at` e as excluídas pelos registros de `Tombstone`.
+    """
+
+    def __init__(self, state):
+        # Marcas d'água: as próximas cargas buscam apenas o que mudou a partir delas. São lidas
+        # antes das entradas, para que nada alterado durante a carga fique para trás.
+        self.state = state
+        self.loaded_at = time.monotonic()
+        self.updated_mark = state[0]
+        self.deleted_mark = Tombstone.objects.order_by().aggregate(mark=Max('created_at'))['mark']
+
+        self.columns = load_columns(CharcoalEntry.objects.all())
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def remove(self, ids):
+        keep = ~np.isin(self.columns['id'], ids)
+        self.columns = {column: values[keep] for column, values in self.columns.items()}
+
+    def upsert(self, columns):
+        # As versões anteriores das entradas alteradas são substituídas pelas novas.
+        self.remove(columns['id'])
+
+        merged = {column: np.concatenate([self.columns[column], columns[column]]) for column in COLUMNS}
+        order = np.argsort(merged['id'], kind='stable')
+        self.columns = {column: values[order] for column, values in merged.items()}
+
+    def refresh(self, state):
+        """Aplica as alterações feitas desde a última carga. Retorna False se o store ficou inconsistente."""
+
+        changed = CharcoalEntry.objects.all()
+        if self.updated_mark is not None:
+            # `>=` pois outras entradas podem ter sido gravadas no mesmo instante da marca.
+            changed = changed.filter(updated_at__gte=self.updated_mark)
+
+        changed = load_columns(changed)
+        if len(changed['id']):
+            self.upsert(changed)
+
+        deletions = Tombstone.objects.filter(model=CharcoalEntry._meta.label)
+        if self.deleted_mark is not None:
+            deletions = deletions.filter(created_at__gte=self.deleted_mark)
+
+        deleted = list(deletions.values_list('object_id', 'created_at'))
+        if deleted:
+            self.remove([object_id for object_id, _ in deleted])
+            self.deleted_mark = max(created_at for _, created_at in deleted)
+
+        self.updated_mark = state[0]
+        self.state = state
+
+        # Exclusões que não geram Tombstone (ex: `QuerySet.delete` sem sinais ou direto no banco)
+        # deixam a contagem diferente e exigem uma nova carga.
+        return len(self) == state[1]
+
+    def frame(self, supplier_ids=None, start_date=None, end_date=None):
+        """Retorna um DataFrame com as entradas filtradas pelos fornecedores e pelo período informados."""
+
+        # As atualizações trocam o dict inteiro, então basta ler a referência uma única vez.
+        columns = self.columns
+        mask = np.ones(len(columns['id']), dtype=bool)
+
+        if supplier_ids is not None:
+            mask &= np.isin(columns['supplier_id'], np.asarray(list(supplier_ids), dtype=np.int64))
+
+        if start_date is not None:
+            mask &= columns['entry_date'] >= np.datetime64(start_date, 'D')
+
+        if end_date is not None:
+            mask &= columns['entry_date'] <= np.datetime64(end_date, 'D')
+
+        return pd.DataFrame({column: values[mask] for column, values in columns.items()})
+
+
+def get_store():
+    global _store, _checked_at
+
+    with _lock:
+        current = time.monotonic()
+        if _store is not None and _checked_at is not None and current - _checked_at < STATE_CHECK_INTERVAL:
+            return _store
+
+        state = get_entries_state()
+
+        if _store is None or current - _store.loaded_at >= MAX_AGE:
+            _store = EntriesStore(state)
+
+        elif _store.state != state and not _store.refresh(state):
+            _store = EntriesStore(state)
+
+        _checked_at = current
+        return _store
+
+
+def mark_stale():
+    """Faz a próxima consulta verificar as alterações no banco, sem esperar o intervalo entre as verificações."""
+
+    global _checked_at
+
+    with _lock:
+        _checked_at = None
+
+
+def invalidate():
+    global _store
+
+    with _lock:
+        _store = None
+
+
+def query(supplier_ids=None, start_date=None, end_date=None):
+    """
+    Retorna as entradas de carvão (supplier_id, dcf_id, entry_date, entry_volume, moisture,
+    fines e density) filtradas pelos fornecedores e pelo período (datas inclusivas).
+    """
+
+    return get_store().frame(supplier_ids, start_date, end_date)
@@ -1,16 +1,49 @@
+import json
 import os
 import tempfile
+import threading
 import zipfile
 
 import geopandas as gpd
+import shapely
 from django.core.exceptions import ValidationError
 from pyogrio import set_gdal_config_options
 
 from gelfcore.logger import log
+from gelfmp.models.choices import GeometryLevel
 
-set_gdal_config_options({
-    'SHAPE_RESTORE_SHX': 'YES',
-})
+# As opções de configuração do GDAL são globais ao processo, então a leitura
+# dos Shapefiles é serializada para que a conversão em segundo plano não altere
+# a opção SHAPE_RESTORE_SHX durante a leitura feita por outra thread.
+_gdal_lock = threading.Lock()
+
+# Tolerância de simplificação (em graus, EPSG:4326) e maior zoom do mapa
+# em que cada nível é usado. Acima do último nível, usa-se o GeoJSON original.
+GEOMETRY_LEVELS = [
+    (GeometryLevel.OVERVIEW, 0.01, 7),
+    (GeometryLevel.REGIONAL, 0.001, 10),
+    (GeometryLevel.DETAIL, 0.0001, 14),
+]
+
+
+def level_for_zoom(zoom):
+    """Retorna o nível de geometria adequado ao zoom do mapa, ou None para a resolução original."""
+
+    for level, _, max_zoom in GEOMETRY_LEVELS:
+        if zoom <= max_zoom:
+            return level
+
+    return None
+
+
+def level_for_tolerance(tolerance):
+    """Retorna o nível mais simplificado cuja tolerância não excede a informada, ou None."""
+
+    for level, level_tolerance, _ in GEOMETRY_LEVELS:
+        if level_tolerance <= tolerance:
+            return level
+
+    return None
 
 
 def optimize_geojson(gdf, simplify_tolerance=0.001):
@@ -23,54 +56,136 @@ def optimize_geojson(gdf, simplify_tolerance=0.001):
         raise ValidationError(f'Erro ao otimizar o GeoJSON: {e}')
 
 
-def from_shapefile_zip(file):
-    try:
-        if not zipfile.is_zipfile(file):
-            raise ValidationError('O arquivo enviado não é um ZIP válido contendo o Shapefile.')
+def simplify_levels(geojson):
+    """Gera, a partir do GeoJSON em EPSG:4326, o GeoJSON simplificado de cada nível."""
+
+    gdf = gpd.GeoDataFrame.from_features(json.loads(geojson), crs='EPSG:4326')
+
+    return {
+        level: optimize_geojson(gdf.copy(), simplify_tolerance=tolerance) for level, tolerance, _ in GEOMETRY_LEVELS
+    }
+
+
+def get_extent(geojson):
+    """Calcula a caixa delimitadora e o centróide (em EPSG:4326) do GeoJSON."""
+
+    geometry = shapely.from_geojson(geojson)
+    if geometry.is_empty:
+        return {}
+
+    min_lon, min_lat, max_lon, max_lat = geometry.bounds
+    centroid = geometry.centroid
+
+    return {
+        'min_lon': min_lon,
+        'min_lat': min_lat,
+        'max_lon': max_lon,
+        'max_lat': max_lat,
+        'centroid_lon': centroid.x,
+        'centroid_lat': centroid.y,
+    }
+
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with zipfile.ZipFile(file) as zf:
-                zf.extractall(temp_dir)
+def get_measurements(geojson):
+    """
+    Calcula a área em hectares (em uma projeção UTM, para que a medida seja em metros)
+    e a quantidade de vértices do GeoJSON. Áreas sobrepostas são contadas uma única vez.
+    """
 
-            shapefile_path = None
-            for root, _, files in os.walk(temp_dir):
-                for filename in files:
-                    if filename.lower().endswith('.shp'):
-                        shapefile_path = os.path.join(root, filename)
-                        break
+    gdf = gpd.GeoDataFrame.from_features(json.loads(geojson), crs='EPSG:4326')
+    if gdf.empty:
+        return {}
+
+    utm = gdf.to_crs(gdf.estimate_utm_crs())
+
+    return {
+        'area_ha': utm.union_all().area / 10_000,
+        'vertex_count': int(shapely.get_num_coordinates(gdf.geometry.values).sum()),
+    }
+
+
+def find_shapefile(zf):
+    """Retorna o caminho do primeiro arquivo .shp dentro do ZIP."""
+
+    for name in zf.namelist():
+        if name.lower().endswith('.shp'):
+            return name
+
+    raise ValidationError('O arquivo ZIP não contém um arquivo .shp válido.')
+
+
+def validate_shapefile_zip(file):
+    """
+    Validação rápida feita ao salvar o documento: verifica apenas se o arquivo é um ZIP
+    que contém um .shp, sem ler as geometrias (a conversão é feita em segundo plano).
+    """
+
+    if not zipfile.is_zipfile(file):
+        raise ValidationError('O arquivo enviado não é um ZIP válido contendo o Shapefile.')
+
+    with zipfile.ZipFile(file) as zf:
+        find_shapefile(zf)
+
+    file.seek(0)
+
+
+def read_shapefile(path, restore_shx=False):
+    with _gdal_lock:
+        set_gdal_config_options({'SHAPE_RESTORE_SHX': 'YES' if restore_shx else None})
+        return gpd.read_file(path, engine='pyogrio')
+
+
+def from_shapefile_zip(path):
+    """
+    Converte o Shapefile do ZIP em `path` para GeoJSON (EPSG:4326). O ZIP é lido
+    diretamente pelo sistema de arquivos virtual do GDAL (/vsizip/), sem extraí-lo.
+    """
+
+    try:
+        if not zipfile.is_zipfile(path):
+            raise ValidationError('O arquivo enviado não é um ZIP válido contendo o Shapefile.')
 
-            if not shapefile_path:
-                raise ValidationError('O arquivo ZIP não contém um arquivo .shp válido.')
+        with zipfile.ZipFile(path) as zf:
+            shapefile_name = find_shapefile(zf)
+            basename = os.path.splitext(shapefile_name)[0]
+            names = {name.lower(): name for name in zf.namelist()}
 
-            gdf = gpd.read_file(shapefile_path)
+            prj_name = names.get(f'{basename}.prj'.lower())
+            prj_content = zf.read(prj_name).decode(errors='ignore') if prj_name else None
 
-            if gdf.empty:
-                raise ValidationError('O Shapefile está vazio e não pode ser convertido para GeoJSON.')
+            if f'{basename}.shx'.lower() in names:
+                # As chaves delimitam o caminho do ZIP, já que o arquivo salvo não termina em .zip.
+                gdf = read_shapefile(f'/vsizip/{{{path}}}/{shapefile_name}')
 
-            if gdf.crs is None:
-                prj_path = shapefile_path.replace('.shp', '.prj')
+            else:
+                # Sem o .shx o GDAL precisa reconstruí-lo, o que exige um diretório gravável.
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    members = [name for name in zf.namelist() if os.path.splitext(name)[0] == basename]
+                    zf.extractall(temp_dir, members=members)
+                    gdf = read_shapefile(os.path.join(temp_dir, shapefile_name), restore_shx=True)
 
-                if os.path.exists(prj_path):
-                    with open(prj_path, 'r') as prj_file:
-                        prj_content = prj_file.read()
+        if gdf.empty:
+            raise ValidationError('O Shapefile está vazio e não pode ser convertido para GeoJSON.')
 
-                    inferred_crs = gpd.tools.crs.CRS.from_string(prj_content).to_string()
-                    gdf.set_crs(inferred_crs, inplace=True)
+        if gdf.crs is None:
+            if prj_content:
+                inferred_crs = gpd.tools.crs.CRS.from_string(prj_content).to_string()
+                gdf.set_crs(inferred_crs, inplace=True)
 
-                else:
-                    # Força a conversão para EPSG:31983 SIRGAS 2000 / UTM zone 23S
-                    # (UTM Brasil) caso não consiga inferir qual é o crs adequado.
-                    gdf.set_crs('EPSG:31983', inplace=True)
+            else:
+                # Força a conversão para EPSG:31983 SIRGAS 2000 / UTM zone 23S
+                # (UTM Brasil) caso não consiga inferir qual é o crs adequado.
+                gdf.set_crs('EPSG:31983', inplace=True)
 
-            if not gdf.geometry.is_valid.all():
-                raise ValidationError('Algumas geometrias no Shapefile são inválidas.')
+        if not gdf.geometry.is_valid.all():
+            raise ValidationError('Algumas geometrias no Shapefile são inválidas.')
 
-            for col in gdf.select_dtypes(include=['datetime']).columns:
-                gdf[col] = gdf[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        for col in gdf.select_dtypes(include=['datetime']).columns:
+            gdf[col] = gdf[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
 
-            geojson = gdf.to_crs('EPSG:4326').to_json()
+        geojson = gdf.to_crs('EPSG:4326').to_json()
 
-            return geojson
+        return geojson
 
     except ValidationError as ve:
         log.error(f'Erro de validação ao tentar converter Shapefile: {ve}')
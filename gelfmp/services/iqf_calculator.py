@@ -1,9 +1,12 @@
+import calendar
 from dataclasses import dataclass
+from datetime import date
 
 import pandas as pd
 
 from gelfcore.logger import log
-from gelfmp.models import CharcoalEntry, CharcoalIQF, CharcoalMonthlyPlan, MaterialType, Supplier, SupplierType
+from gelfmp.models import CharcoalIQF, CharcoalMonthlyPlan, MaterialType, Supplier, SupplierType
+from gelfmp.services import entries_store
 
 MOISTURE_MAX = 7
 FINES_MAX = 10
@@ -105,16 +108,18 @@ def calculate_iqf(planned_volume: float, entries: pd.DataFrame):
 def calculate_suppliers_iqf(month, year):
     """Função principal para calcular IQF por fornecedor e mês."""
 
-    entries = CharcoalEntry.objects.filter(
-        entry_date__month=month,
-        entry_date__year=year,
-        supplier__material_type=MaterialType.CHARCOAL,
+    month, year = int(month), int(year)
+
+    entries_df = entries_store.query(
+        supplier_ids=Supplier.objects.filter(material_type=MaterialType.CHARCOAL).values_list('id', flat=True),
+        start_date=date(year, month, 1),
+        end_date=date(year, month, calendar.monthrange(year, month)[1]),
     )
 
-    if not entries.exists():
+    if entries_df.empty:
         raise ValueError(f'Não há entradas de carvão para o mês {month}/{year}.')
 
-    entries_df = pd.DataFrame(entries.values())
+    # O resumo dos fornecedores (rating) é atualizado pelo sinal post_save de cada IQF gravado.
     processed_suppliers = []
 
     for _, supplier_entries in entries_df.groupby('supplier_id'):
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.forms import ValidationError
+
+from gelfcore.logger import log
+from gelfmp.models import Document, GeometryStatus
+from gelfmp.models.document import EXTENT_FIELDS, MEASUREMENT_FIELDS
+from gelfmp.services import geojson
+
+# Conversões simultâneas por processo. A conversão é pesada
+# (leitura, validação e reprojeção), então poucas por vez.
+CONVERSION_WORKERS = 2
+
+executor = ThreadPoolExecutor(max_workers=CONVERSION_WORKERS, thread_name_prefix='shapefile-conversion')
+
+
+def convert_document_shapefile(document_id):
+    """Converte o Shapefile do documento para GeoJSON e atualiza o status da geometria."""
+
+    document = Document.objects.filter(pk=document_id).first()
+    if not document or not document.file:
+        return
+
+    try:
+        document.geojson = geojson.from_shapefile_zip(document.file.path)
+        document.geometry_status = GeometryStatus.READY
+        document.geometry_error = ''
+
+    except ValidationError as e:
+        document.geojson = None
+        document.geometry_status = GeometryStatus.ERROR
+        document.geometry_error = '; '.join(e.messages)
+
+    document.save(
+        update_fields=['geometry_status', 'geometry_error', *EXTENT_FIELDS, *MEASUREMENT_FIELDS, 'updated_at']
+    )
+
+
+def run_conversion(document_id):
+    try:
+        convert_document_shapefile(document_id)
+
+    except Exception as e:
+        log.error(f'Erro ao converter o Shapefile do documento {document_id}: {e}')
+
+    finally:
+        # Cada thread do executor abre a sua própria conexão com o banco.
+        connection.close()
+
+
+def schedule_conversion(document_id):
+    """Agenda a conversão em segundo plano, sem ocupar a requisição do admin."""
+
+    executor.submit(run_conversion, document_id)
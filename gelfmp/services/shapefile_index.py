@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import shapely
+from django.db.models import Count, Max
+
+from gelfmp.models import Document
+from gelfmp.models.choices import SHAPEFILE_DOCUMENT_TYPES
+
+_index = None
+_lock = threading.Lock()
+
+
+class ShapefileIndex:
+    """Índice espacial (STRtree) das caixas delimitadoras dos Shapefiles."""
+
+    def __init__(self, document_ids, boxes, state):
+        self.document_ids = np.array(document_ids, dtype=np.int64)
+        self.tree = shapely.STRtree(boxes)
+        self.state = state
+
+    def query(self, bbox):
+        positions = self.tree.query(shapely.box(*bbox), predicate='intersects')
+        return self.document_ids[positions].tolist()
+
+
+def get_shapefile_documents():
+    return Document.objects.filter(document_type__in=SHAPEFILE_DOCUMENT_TYPES, min_lon__isnull=False)
+
+
+def get_index_state():
+    """
+    Identifica a versão dos Shapefiles cadastrados. Permite que cada processo
+    perceba alterações feitas por outros processos e reconstrua seu índice.
+    """
+
+    state = get_shapefile_documents().order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return state['last_modified'], state['count']
+
+
+def build_index(state):
+    documents = list(get_shapefile_documents().values_list('id', 'min_lon', 'min_lat', 'max_lon', 'max_lat'))
+
+    document_ids = [document_id for document_id, *_ in documents]
+    boxes = [shapely.box(*bounds) for _, *bounds in documents]
+
+    return ShapefileIndex(document_ids, boxes, state)
+
+
+def get_index():
+    global _index
+
+    state = get_index_state()
+
+    with _lock:
+        if _index is None or _index.state != state:
+            _index = build_index(state)
+
+        return _index
+
+
+def invalidate():
+    global _index
+
+    with _lock:
+        _index = None
+
+
+def query(bbox):
+    """Retorna os IDs dos Shapefiles cuja caixa delimitadora intersecta o `bbox` (minx, miny, maxx, maxy)."""
+
+    return get_index().query(bbox)
@@ -0,0 +1,117 @@
+from django.db.models import Avg, Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+from gelfmp.models import CharcoalEntry, CharcoalIQF, Supplier, SupplierSummary
+from gelfmp.services import data_version
+
+RECENT_ENTRIES_LIMIT = 30
+RATING_IQFS_LIMIT = 3
+
+SUMMARY_FIELDS = [
+    'average_moisture',
+    'average_fines',
+    'average_density',
+    'first_entry_date',
+    'last_entry_date',
+    'entries_count',
+    'rating',
+    'updated_at',
+]
+
+
+def latest_per_supplier(queryset, order_by, limit):
+    """
+    Restringe o queryset aos `limit` registros mais recentes de cada fornecedor,
+    numerando as linhas com ROW_NUMBER() particionado pelo fornecedor.
+    """
+
+    ranked = queryset.annotate(
+        row_number=Window(RowNumber(), partition_by=F('supplier_id'), order_by=order_by),
+    ).filter(row_number__lte=limit)
+
+    return queryset.model.objects.filter(id__in=ranked.values('id')).order_by()
+
+
+def get_recent_entries_stats(supplier_ids=None):
+    """Calcula, em uma única consulta, as médias das últimas entradas de cada fornecedor."""
+
+    entries = CharcoalEntry.objects.all()
+    if supplier_ids is not None:
+        entries = entries.filter(supplier_id__in=supplier_ids)
+
+    recent_entries = latest_per_supplier(
+        entries,
+        order_by=[F('entry_date').desc(), F('id').desc()],
+        limit=RECENT_ENTRIES_LIMIT,
+    )
+
+    stats = recent_entries.values('supplier_id').annotate(
+        average_moisture=Avg('moisture'),
+        average_fines=Avg('fines'),
+        average_density=Avg('density'),
+        first_entry_date=Min('entry_date'),
+        last_entry_date=Max('entry_date'),
+        entries_count=Count('id'),
+    )
+
+    return {row.pop('supplier_id'): row for row in stats}
+
+
+def get_ratings(supplier_ids=None):
+    """
+    Calcula, em uma única consulta, a média dos últimos 3 IQFs de cada fornecedor.
+    Fornecedores com menos de 3 IQFs não possuem rating.
+    """
+
+    iqfs = CharcoalIQF.objects.all()
+    if supplier_ids is not None:
+        iqfs = iqfs.filter(supplier_id__in=supplier_ids)
+
+    recent_iqfs = latest_per_supplier(
+        iqfs,
+        order_by=[F('year').desc(), F('month').desc()],
+        limit=RATING_IQFS_LIMIT,
+    )
+
+    ratings = recent_iqfs.values('supplier_id').annotate(average_iqf=Avg('iqf'), count=Count('id'))
+
+    return {row['supplier_id']: round(row['average_iqf'], 1) for row in ratings if row['count'] == RATING_IQFS_LIMIT}
+
+
+def refresh_supplier_summaries(supplier_ids=None):
+    """
+    Recalcula o resumo dos fornecedores informados (ou de todos, caso
+    `supplier_ids` seja None) e grava o resultado em `SupplierSummary`.
+    """
+
+    if supplier_ids is not None:
+        supplier_ids = set(supplier_ids)
+        if not supplier_ids:
+            return 0
+
+    stats = get_recent_entries_stats(supplier_ids)
+    ratings = get_ratings(supplier_ids)
+
+    if supplier_ids is None:
+        supplier_ids = Supplier.objects.values_list('id', flat=True)
+
+    summaries = [
+        SupplierSummary(
+            supplier_id=supplier_id,
+            rating=ratings.get(supplier_id),
+            **stats.get(supplier_id, {'entries_count': 0}),
+        )
+        for supplier_id in supplier_ids
+    ]
+
+    SupplierSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['supplier'],
+        update_fields=SUMMARY_FIELDS,
+    )
+
+    # O bulk_create não dispara sinais, então o fingerprint da API é invalidado aqui.
+    data_version.bump_on_commit()
+
+    return len(summaries)
@@ -0,0 +1,72 @@
+import geopandas as gpd
+import orjson
+import topojson
+from shapely.geometry import shape
+
+from gelfcore.logger import log
+
+# Quantização das coordenadas da topologia (≈ 1 m em um estado inteiro).
+TOPOLOGY_QUANTIZATION = 1e6
+
+
+def build_topology(shapefiles):
+    """
+    Converte os shapefiles (id, nome, fornecedor e GeoJSON) em uma única topologia
+    TopoJSON quantizada, em que as bordas compartilhadas entre polígonos vizinhos
+    são armazenadas uma única vez. Cada documento vira um objeto da topologia.
+    """
+
+    documents, frames, properties = [], [], []
+
+    for document_id, name, supplier_name, geojson in shapefiles:
+        features = [feature for feature in orjson.loads(geojson)['features'] if feature.get('geometry')]
+        if not features:
+            continue
+
+        documents.append({'id': document_id, 'name': name, 'supplier_name': supplier_name})
+        frames.append(gpd.GeoSeries([shape(feature['geometry']) for feature in features], crs='EPSG:4326'))
+        properties.append([feature.get('properties') or {} for feature in features])
+
+    if not frames:
+        return {'documents': [], 'topology': None}
+
+    topology = topojson.Topology(
+        [frame.to_frame('geometry') for frame in frames],
+        object_name=[str(document['id']) for document in documents],
+        prequantize=TOPOLOGY_QUANTIZATION,
+    ).to_dict()
+
+    # As propriedades são recolocadas depois da conversão para
+    # manter os valores originais (o GeoDataFrame usa NaN para ausentes).
+    for document, document_properties in zip(documents, properties):
+        for geometry, feature_properties in zip(
+            topology['objects'][str(document['id'])]['geometries'],
+            document_properties,
+        ):
+            geometry.pop('id', None)
+            geometry['properties'] = feature_properties
+
+    return {'documents': documents, 'topology': topology}
+
+
+def encode_topology(shapefiles):
+    """
+    Retorna a topologia serializada e o tamanho que os mesmos
+    shapefiles teriam no formato GeoJSON, para comparação.
+    """
+
+    shapefiles = list(shapefiles)
+
+    geojson_size = len(
+        orjson.dumps([
+            {'supplier_name': supplier_name, 'id': document_id, 'name': name, 'geojson': geojson}
+            for document_id, name, supplier_name, geojson in shapefiles
+        ])
+    )
+
+    content = orjson.dumps(build_topology(shapefiles))
+
+    if geojson_size:
+        log.info(f'TopoJSON gerado: {len(content)} bytes ({1 - len(content) / geojson_size:.1%} menor que o GeoJSON).')
+
+    return content, geojson_size
@@ -0,0 +1,176 @@
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import mapbox_vector_tile
+import numpy as np
+import orjson
+import shapely
+from django.conf import settings
+from django.core.cache import cache
+from shapely.geometry import shape
+
+from gelfmp.models import Document
+from gelfmp.services import document_geometry, geojson, shapefile_index
+
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+TILE_LAYER_NAME = 'shapefiles'
+
+TILE_CACHE_VERSION_KEY = 'tile_cache_version'
+
+# Margem (em unidades do tile) mantida ao recortar as geometrias,
+# evitando que as bordas dos polígonos apareçam entre os tiles.
+TILE_BUFFER = 64
+
+EARTH_RADIUS = 6378137
+MERCATOR_ORIGIN = math.pi * EARTH_RADIUS
+
+
+def tile_bounds(z, x, y):
+    """Retorna os limites do tile em longitude/latitude (EPSG:4326)."""
+
+    n = 2**z
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+
+def mercator_bounds(z, x, y):
+    """Retorna os limites do tile em metros (EPSG:3857)."""
+
+    size = 2 * MERCATOR_ORIGIN / 2**z
+    minx = -MERCATOR_ORIGIN + x * size
+    maxy = MERCATOR_ORIGIN - y * size
+
+    return minx, maxy - size, minx + size, maxy
+
+
+def to_mercator(coordinates):
+    lon, lat = coordinates[:, 0], np.clip(coordinates[:, 1], -85.0511, 85.0511)
+
+    return np.column_stack([
+        np.radians(lon) * EARTH_RADIUS,
+        np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * EARTH_RADIUS,
+    ])
+
+
+def tile_projection(z, x, y):
+    """Retorna a função que converte longitude/latitude para as coordenadas internas do tile."""
+
+    minx, miny, maxx, _ = mercator_bounds(z, x, y)
+    scale = TILE_EXTENT / (maxx - minx)
+
+    def project(coordinates):
+        return (to_mercator(coordinates) - (minx, miny)) * scale
+
+    return project
+
+
+def get_tile_documents(z, x, y):
+    """Busca os Shapefiles que intersectam o tile, com o GeoJSON no nível adequado ao zoom."""
+
+    document_ids = shapefile_index.query(tile_bounds(z, x, y))
+    documents = Document.objects.filter(id__in=document_ids)
+
+    tile_geojson = document_geometry.document_geojson(geojson.level_for_zoom(z))
+
+    return documents.annotate(tile_geojson=tile_geojson).values_list(
+        'id', 'name', 'supplier__corporate_name', 'tile_geojson'
+    )
+
+
+def get_tile_features(z, x, y):
+    project = tile_projection(z, x, y)
+
+    for document_id, name, supplier_name, document_geojson in get_tile_documents(z, x, y):
+        for feature in orjson.loads(document_geojson)['features']:
+            if not feature.get('geometry'):
+                continue
+
+            # Recorta a geometria no tile e remove os detalhes menores que uma unidade do tile.
+            geometry = shapely.transform(shape(feature['geometry']), project)
+            geometry = shapely.clip_by_rect(
+                geometry, -TILE_BUFFER, -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER, TILE_EXTENT + TILE_BUFFER
+            )
+            geometry = geometry.simplify(1, preserve_topology=True)
+
+            if geometry.is_empty:
+                continue
+
+            properties = {
+                key: value
+                for key, value in (feature.get('properties') or {}).items()
+                if isinstance(value, (str, int, float, bool))
+            }
+
+            yield {
+                'geometry': geometry,
+                'properties': {**properties, 'id': document_id, 'name': name, 'supplier_name': supplier_name},
+            }
+
+
+def render_tile(z, x, y):
+    """Gera o vector tile (MVT) dos Shapefiles recortados e simplificados para o tile."""
+
+    features = list(get_tile_features(z, x, y))
+    if not features:
+        return b''
+
+    layer = {'name': TILE_LAYER_NAME, 'features': features}
+    return mapbox_vector_tile.encode(layer, default_options={'extents': TILE_EXTENT})
+
+
+def get_version():
+    """Retorna a versão atual do cache de tiles, que é o nome do diretório onde os tiles são gravados."""
+
+    return cache.get_or_set(TILE_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_tile_path(z, x, y):
+    return os.path.join(settings.TILE_CACHE_DIR, str(get_version()), str(z), str(x), f'{y}.mvt')
+
+
+def get_tile(z, x, y):
+    """Retorna o tile do cache em disco, gerando-o caso ainda não exista."""
+
+    path = get_tile_path(z, x, y)
+
+    try:
+        with open(path, 'rb') as tile_file:
+            return tile_file.read()
+    except FileNotFoundError:
+        pass
+
+    tile = render_tile(z, x, y)
+
+    # Grava em um arquivo temporário e o move para o destino, evitando
+    # que outro processo leia um tile gravado pela metade.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as temp_file:
+        temp_file.write(tile)
+
+    os.replace(temp_file.name, path)
+
+    return tile
+
+
+def clear_cache():
+    """
+    Passa a gravar os tiles em um novo diretório e remove os das versões anteriores. Como os tiles
+    da nova versão nunca são apagados, uma requisição em andamento não perde o tile que acabou de gravar.
+    """
+
+    version = time.time_ns()
+    cache.set(TILE_CACHE_VERSION_KEY, version, timeout=None)
+
+    if not os.path.isdir(settings.TILE_CACHE_DIR):
+        return
+
+    for entry in os.scandir(settings.TILE_CACHE_DIR):
+        if entry.is_dir() and entry.name != str(version):
+            shutil.rmtree(entry.path, ignore_errors=True)
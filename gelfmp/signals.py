@@ -0,0 +1,180 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from gelfmp.models import CharcoalEntry, CharcoalIQF, CharcoalMonthlyPlan, Document, Supplier, Tombstone
+from gelfmp.models.choices import SHAPEFILE_DOCUMENT_TYPES
+from gelfmp.services import (
+    charcoal_rollup,
+    chart_cache,
+    data_version,
+    document_geometry,
+    entries_store,
+    shapefile_conversion,
+    shapefile_index,
+    supplier_summary,
+    vector_tiles,
+)
+
+
+@receiver(post_delete, sender=Supplier)
+def register_supplier_deletion(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.label, object_id=instance.pk, supplier_id=instance.pk)
+
+
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalIQF)
+def register_supplier_child_deletion(sender, instance, **kwargs):
+    # A exclusão de um objeto relacionado altera os
+    # dados do fornecedor na sincronização incremental.
+    Tombstone.objects.create(model=sender._meta.label, object_id=instance.pk, supplier_id=instance.supplier_id)
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_save, sender=Document)
+@receiver(post_save, sender=CharcoalEntry)
+@receiver(post_save, sender=CharcoalIQF)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalIQF)
+def invalidate_models_fingerprint(sender, instance, **kwargs):
+    data_version.bump_on_commit()
+
+
+@receiver(post_save, sender=Document)
+def refresh_document_geometries(sender, instance, created, **kwargs):
+    # O GeoJSON só muda quando o Shapefile enviado
+    # termina de ser convertido em segundo plano.
+    if getattr(instance, '_geojson_changed', False):
+        document_geometry.refresh_document_geometries(instance)
+        instance._geojson_changed = False
+
+
+@receiver(pre_save, sender=Document)
+def remember_document_tile_fields(sender, instance, **kwargs):
+    # Os tiles exibem a geometria e o nome do documento e do fornecedor,
+    # então só precisam ser gerados novamente quando algum deles muda.
+    previous = (
+        Document.objects.filter(pk=instance.pk).values_list('name', 'document_type', 'supplier_id').first()
+        if instance.pk
+        else None
+    )
+
+    instance._previous_document_type = previous[1] if previous else None
+    instance._tiles_changed = getattr(instance, '_geojson_changed', False) or previous != (
+        instance.name,
+        instance.document_type,
+        instance.supplier_id,
+    )
+
+
+@receiver(post_save, sender=Document)
+def invalidate_shapefile_caches(sender, instance, **kwargs):
+    document_types = {instance.document_type, getattr(instance, '_previous_document_type', None)}
+
+    if getattr(instance, '_tiles_changed', True) and document_types.intersection(SHAPEFILE_DOCUMENT_TYPES):
+        shapefile_index.invalidate()
+        # Os tiles só passam para a nova versão após o commit, para que nenhum
+        # tile seja gerado com os dados antigos e gravado no novo diretório.
+        transaction.on_commit(vector_tiles.clear_cache)
+
+
+@receiver(post_delete, sender=Document)
+def invalidate_deleted_shapefile_caches(sender, instance, **kwargs):
+    if instance.document_type in SHAPEFILE_DOCUMENT_TYPES:
+        shapefile_index.invalidate()
+        transaction.on_commit(vector_tiles.clear_cache)
+
+
+@receiver(pre_save, sender=Supplier)
+def remember_supplier_name(sender, instance, **kwargs):
+    instance._previous_corporate_name = (
+        Supplier.objects.filter(pk=instance.pk).values_list('corporate_name', flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Supplier)
+def invalidate_supplier_tiles(sender, instance, created, **kwargs):
+    # Os tiles exibem o nome do fornecedor de cada Shapefile.
+    if created or getattr(instance, '_previous_corporate_name', None) == instance.corporate_name:
+        return
+
+    if instance.documents.filter(document_type__in=SHAPEFILE_DOCUMENT_TYPES).exists():
+        transaction.on_commit(vector_tiles.clear_cache)
+
+
+@receiver(post_save, sender=Document)
+def schedule_shapefile_conversion(sender, instance, **kwargs):
+    # A conversão só começa após o commit, para que a
+    # thread de conversão encontre o documento salvo.
+    if getattr(instance, '_shapefile_uploaded', False):
+        transaction.on_commit(partial(shapefile_conversion.schedule_conversion, instance.pk))
+        instance._shapefile_uploaded = False
+
+
+@receiver(post_save, sender=CharcoalEntry)
+@receiver(post_save, sender=CharcoalIQF)
+@receiver(post_save, sender=CharcoalMonthlyPlan)
+@receiver(post_delete, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalIQF)
+@receiver(post_delete, sender=CharcoalMonthlyPlan)
+def invalidate_chart_cache(sender, instance, **kwargs):
+    # A versão só muda após o commit, para que nenhum gráfico seja
+    # gerado com os dados antigos e gravado na nova versão do cache.
+    transaction.on_commit(chart_cache.bump_version)
+
+
+@receiver(post_save, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalEntry)
+def mark_entries_store_stale(sender, instance, **kwargs):
+    transaction.on_commit(entries_store.mark_stale)
+
+
+@receiver(pre_save, sender=CharcoalEntry)
+def remember_charcoal_entry_day(sender, instance, **kwargs):
+    # Guarda o dia anterior da entrada, que também precisa
+    # ser recalculado caso o fornecedor ou a data mudem.
+    instance._previous_daily_key = (
+        CharcoalEntry.objects.filter(pk=instance.pk).values_list('supplier_id', 'entry_date').first()
+        if instance.pk
+        else None
+    )
+    instance._previous_supplier_id = instance._previous_daily_key[0] if instance._previous_daily_key else None
+
+
+@receiver(pre_save, sender=CharcoalIQF)
+def remember_previous_supplier(sender, instance, **kwargs):
+    # O IQF pode ser movido para outro fornecedor, cujo rating também muda.
+    instance._previous_supplier_id = (
+        sender.objects.filter(pk=instance.pk).values_list('supplier_id', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalEntry)
+def refresh_charcoal_entry_daily(sender, instance, **kwargs):
+    keys = {(instance.supplier_id, instance.entry_date)}
+    if previous := getattr(instance, '_previous_daily_key', None):
+        keys.add(previous)
+
+    charcoal_rollup.refresh_daily_entries(keys)
+
+
+@receiver(post_save, sender=CharcoalEntry)
+@receiver(post_save, sender=CharcoalIQF)
+@receiver(post_delete, sender=CharcoalEntry)
+@receiver(post_delete, sender=CharcoalIQF)
+def refresh_supplier_summary(sender, instance, **kwargs):
+    # As importações (bulk_create) atualizam o resumo por conta própria, mas o cálculo do
+    # IQF e as alterações e exclusões pelo admin também mudam as médias e o rating.
+    supplier_ids = {instance.supplier_id}
+    if previous_supplier_id := getattr(instance, '_previous_supplier_id', None):
+        supplier_ids.add(previous_supplier_id)
+
+    transaction.on_commit(partial(supplier_summary.refresh_supplier_summaries, supplier_ids))
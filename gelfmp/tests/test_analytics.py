@@ -0,0 +1,158 @@
+import json
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from gelfmp.api.charts import get_chart_data
+from gelfmp.charts import data as chart_data
+from gelfmp.models import DCF, CharcoalEntry, CharcoalMonthlyPlan, City, MaterialType, State, Supplier
+from gelfmp.services import analytics
+
+pytest.importorskip('duckdb')
+
+
+@pytest.fixture
+def analytics_db(settings, tmp_path):
+    settings.ANALYTICS_DB_PATH = tmp_path / 'analytics.duckdb'
+    settings.ANALYTICS_BACKEND = 'duckdb'
+    return settings.ANALYTICS_DB_PATH
+
+
+@pytest.fixture
+def dcf():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    supplier = Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+
+    for month, planned_volume in [(1, 1000), (2, 1500)]:
+        CharcoalMonthlyPlan.objects.create(supplier=supplier, month=month, year=2024, planned_volume=planned_volume)
+
+    return DCF.objects.create(process_number='0000000000001/24-00', supplier=supplier)
+
+
+def create_entry(dcf, ticket, entry_date, volume=100, moisture=5):
+    return CharcoalEntry.objects.create(
+        origin_ticket=ticket,
+        vehicle_plate='ABC1234',
+        origin_volume=volume,
+        entry_volume=volume,
+        entry_date=entry_date,
+        moisture=moisture,
+        fines=8,
+        density=220,
+        gcae='GCAE',
+        dcf=dcf,
+        supplier=dcf.supplier,
+    )
+
+
+def aggregations(settings, backend):
+    settings.ANALYTICS_BACKEND = backend
+
+    frames = {
+        group_by: chart_data.build_entries_frame(group_by, date(2024, 1, 1), date(2024, 12, 31), None)
+        for group_by in chart_data.TRUNC_FUNCTIONS
+    }
+    planned, realized = chart_data.schedule_volumes(2024)
+
+    return frames, sorted(planned), sorted(realized)
+
+
+@pytest.mark.django_db
+def test_duckdb_aggregations_match_sqlite(settings, analytics_db, dcf):
+    for day in range(1, 21):
+        create_entry(dcf, str(day), date(2024, 1 + day % 2, day), volume=50 + day, moisture=day % 7)
+
+    assert not analytics.is_enabled()
+    analytics.sync()
+    assert analytics.is_enabled()
+
+    sqlite_frames, sqlite_planned, sqlite_realized = aggregations(settings, 'sqlite')
+    duckdb_frames, duckdb_planned, duckdb_realized = aggregations(settings, 'duckdb')
+
+    for group_by, frame in sqlite_frames.items():
+        assert list(duckdb_frames[group_by]['entry_period']) == list(frame['entry_period'])
+        assert duckdb_frames[group_by].drop(columns='entry_period').to_numpy() == pytest.approx(
+            frame.drop(columns='entry_period').to_numpy()
+        )
+
+    assert duckdb_planned == sqlite_planned == [('third_party', 1, 1000), ('third_party', 2, 1500)]
+    assert duckdb_realized == pytest.approx(sqlite_realized)
+
+
+@pytest.mark.django_db
+def test_sync_is_incremental(analytics_db, dcf):
+    first = create_entry(dcf, '1', date(2024, 1, 10))
+    second = create_entry(dcf, '2', date(2024, 1, 11))
+
+    assert analytics.sync()['charcoal_entry'] == 2
+    assert analytics.query('SELECT COUNT(*) AS count FROM charcoal_entry')['count'][0] == 2
+
+    # Apenas as linhas alteradas desde a última marca são copiadas novamente.
+    second.entry_volume = 300
+    second.save()
+    first.delete()
+
+    assert analytics.sync()['charcoal_entry'] == 1
+
+    # A conexão de leitura é reaberta após a sincronização substituir o arquivo.
+    assert analytics.query('SELECT id, entry_volume FROM charcoal_entry').to_dict('list') == {
+        'id': [second.id],
+        'entry_volume': [300],
+    }
+
+    freshness = analytics.get_freshness()
+    assert set(freshness) == set(analytics.TABLES)
+    assert freshness['charcoal_entry']['rows'] == 1
+    assert freshness['charcoal_entry']['updated_mark'] == CharcoalEntry.objects.get().updated_at
+
+
+@pytest.mark.django_db
+def test_sync_analytics_command(analytics_db, dcf, capsys):
+    create_entry(dcf, '1', date(2024, 1, 10))
+
+    call_command('sync_analytics')
+
+    output = capsys.readouterr().out
+    assert 'charcoal_monthly_plan' in output
+    assert analytics_db.is_file()
+
+
+@pytest.mark.django_db
+def test_sync_invalidates_charts_built_from_the_old_copy(
+    settings, analytics_db, dcf, django_capture_on_commit_callbacks
+):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    params = {'group_by': 'day', 'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+
+    def chart_volumes():
+        chart, hit = get_chart_data('charcoal_entries', params)
+        return json.loads(chart)['data'][0]['y'], hit
+
+    entry = create_entry(dcf, '1', date(2024, 1, 10))
+    analytics.sync()
+
+    assert chart_volumes() == ([100], False)
+    assert chart_volumes() == ([100], True)
+
+    # A alteração muda a versão do cache, mas o gráfico ainda é gerado com a cópia antiga.
+    with django_capture_on_commit_callbacks(execute=True):
+        entry.entry_volume = 300
+        entry.save()
+
+    assert chart_volumes() == ([100], False)
+
+    analytics.sync()
+    assert chart_volumes() == ([300], False)
+
+    # Uma sincronização sem alterações mantém o cache.
+    analytics.sync()
+    assert chart_volumes() == ([300], True)
@@ -0,0 +1,117 @@
+import gzip
+import json
+import urllib.request
+
+import brotli
+import pytest
+from django.core.management import call_command
+
+from gelfmp.models import City, MaterialType, State, Supplier
+from gelfmp.utils.precompressed import write_precompressed
+from gelfmp.utils.static_server import LocalStaticServer
+
+
+def write_layer(path, features):
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+
+
+def square_feature(x, y, name, points_per_side=200, **extra):
+    steps = [step / points_per_side for step in range(points_per_side)]
+    ring = [
+        *([x + step, y] for step in steps),
+        *([x + 1, y + step] for step in steps),
+        *([x + 1 - step, y + 1] for step in steps),
+        *([x, y + 1 - step] for step in steps),
+        [x, y],
+    ]
+
+    return {
+        'type': 'Feature',
+        'properties': {'name': name},
+        'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+        **extra,
+    }
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / 'geojson'
+    source.mkdir()
+
+    write_layer(source / 'br_states.json', [square_feature(-45, -20, 'Minas Gerais', id='MG')])
+    write_layer(source / 'geojs-31-mun.json', [square_feature(-45, -20, 'A'), square_feature(-44, -20, 'B')])
+    write_layer(source / 'geojs-35-mun.json', [square_feature(-48, -23, 'C')])
+
+    return source
+
+
+@pytest.mark.django_db
+def test_build_boundary_layers_for_states_with_suppliers(source_dir, tmp_path, settings):
+    settings.BOUNDARY_SOURCE_DIR = source_dir
+    settings.BOUNDARY_LAYERS_DIR = output = tmp_path / 'boundaries'
+
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+
+    call_command('build_boundary_layers')
+
+    manifest = json.loads((output / 'manifest.json').read_text())
+    levels = [level['level'] for level in manifest['levels']]
+
+    # Apenas os municípios de MG, único estado com fornecedores.
+    assert set(manifest['layers']) == {'states', 'cities-31'}
+    assert manifest['layers']['cities-31'] == levels
+    assert manifest['levels'][-1]['max_zoom'] is None
+
+    overview = output / f'cities-31.{levels[0]}.json'
+    content = overview.read_bytes()
+    cities = json.loads(content)
+
+    assert [city['properties']['name'] for city in cities['features']] == ['A', 'B']
+    assert len(content) < len((source_dir / 'geojs-31-mun.json').read_bytes()) / 10
+    assert gzip.decompress((output / f'{overview.name}.gz').read_bytes()) == content
+    assert brotli.decompress((output / f'{overview.name}.br').read_bytes()) == content
+
+    # O `id` dos features é mantido, já que o frontend identifica os estados por ele.
+    states = json.loads((output / f'states.{levels[0]}.json').read_text())
+    assert states['features'][0]['id'] == 'MG'
+
+    # Gerar outro estado mantém as camadas anteriores no manifesto.
+    call_command('build_boundary_layers', states=['sp'])
+    manifest = json.loads((output / 'manifest.json').read_text())
+    assert set(manifest['layers']) == {'states', 'cities-31', 'cities-35'}
+
+
+def test_static_server_serves_precompressed_files(tmp_path):
+    content = b'{"type":"FeatureCollection","features":[]}'
+    write_precompressed(str(tmp_path / 'layer.json'), content)
+
+    server = LocalStaticServer(str(tmp_path))
+    server.start()
+
+    try:
+        url = f'http://127.0.0.1:{server.port}/layer.json'
+
+        with urllib.request.urlopen(urllib.request.Request(url, headers={'Accept-Encoding': 'gzip, br'})) as response:
+            assert response.headers['Content-Encoding'] == 'br'
+            assert response.headers['Content-Type'] == 'application/json'
+            assert brotli.decompress(response.read()) == content
+
+        with urllib.request.urlopen(urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})) as response:
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.read()) == content
+
+        with urllib.request.urlopen(url) as response:
+            assert response.headers['Content-Encoding'] is None
+            assert response.read() == content
+
+    finally:
+        server.stop()
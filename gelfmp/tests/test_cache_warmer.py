@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import now
+
+from gelfmp import views
+from gelfmp.charts.downsampling import DEFAULT_MAX_POINTS
+from gelfmp.models import DCF, CharcoalEntry, City, MaterialType, State, Supplier
+from gelfmp.services import cache_warmer
+
+
+@pytest.fixture
+def supplier(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    supplier = Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+    dcf = DCF.objects.create(process_number='0000000000001/24-00', supplier=supplier)
+
+    for day in range(1, 11):
+        CharcoalEntry.objects.create(
+            origin_ticket=str(day),
+            vehicle_plate='ABC1234',
+            origin_volume=100,
+            entry_volume=100,
+            entry_date=now().date() - timedelta(days=day),
+            moisture=day,
+            fines=10,
+            density=200,
+            gcae='GCAE',
+            dcf=dcf,
+            supplier=supplier,
+        )
+
+    return supplier
+
+
+# As threads do aquecimento usam as suas próprias conexões, que só enxergam dados já gravados.
+@pytest.mark.django_db(transaction=True)
+def test_warm_caches_fills_page_caches(supplier, client):
+    results = cache_warmer.warm_caches(workers=2)
+
+    # 12 gráficos do painel, 4 do fornecedor, a programação e a listagem de fornecedores.
+    assert len(results) == 18
+    assert all(error is None and seconds >= 0 for _, seconds, error in results)
+
+    # Os gráficos carregados pelas páginas e pelo formulário de filtro já estão em cache.
+    for page in [reverse('charcoal_dashboard'), reverse('charcoal_supplier_stats', args=[supplier.id])]:
+        for chart in client.get(page).context['charts']:
+            assert client.get(chart['url'])['X-Cache'] == 'HIT'
+
+    params = {
+        'chart_id': cache_warmer.DASHBOARD_CHARTS,
+        'group_by': 'week',
+        'supplier': '',
+        'start_date': '',
+        'end_date': '',
+        'max_points': DEFAULT_MAX_POINTS,
+    }
+    assert client.get(reverse('batch_charts'), params)['X-Cache-Hits'] == '3/3'
+
+    assert views.get_charcoal_schedule(now().year)[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_caches_command_reports_each_item(supplier, capsys):
+    call_command('warm_caches', workers=1)
+
+    output = capsys.readouterr().out
+    assert 'api suppliers' in output
+    assert '18 itens aquecidos' in output
+
+
+@pytest.mark.django_db
+def test_entries_upload_schedules_cache_warming(admin_client, mocker):
+    mocker.patch('gelfmp.jobs.views.EntriesProcessor')
+    schedule = mocker.patch('gelfmp.jobs.views.schedule_warm_caches')
+
+    file = SimpleUploadedFile('entradas.xlsx', b'')
+    response = admin_client.post(reverse('charcoal_entries_upload'), {'file': file})
+
+    assert response.status_code == 200
+    schedule.assert_called_once()
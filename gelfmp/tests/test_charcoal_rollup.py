@@ -0,0 +1,83 @@
+import json
+from datetime import date
+
+import pytest
+from django.db.models import Avg
+
+from gelfmp.charts import charts
+from gelfmp.models import DCF, CharcoalEntry, CharcoalEntryDaily, City, MaterialType, State, Supplier
+from gelfmp.services.charcoal_rollup import refresh_daily_entries
+
+
+@pytest.fixture
+def supplier():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+
+    return Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+
+
+def create_entry(supplier, ticket, entry_date, volume, moisture):
+    return CharcoalEntry.objects.create(
+        origin_ticket=ticket,
+        vehicle_plate='ABC1234',
+        origin_volume=volume,
+        entry_volume=volume,
+        entry_date=entry_date,
+        moisture=moisture,
+        fines=10,
+        density=200,
+        gcae='GCAE',
+        dcf=DCF.objects.get_or_create(process_number='0000000000001/24-00', supplier=supplier)[0],
+        supplier=supplier,
+    )
+
+
+@pytest.mark.django_db
+def test_daily_rollup_follows_entry_changes(supplier):
+    first = create_entry(supplier, '1', date(2024, 1, 1), volume=100, moisture=4)
+    create_entry(supplier, '2', date(2024, 1, 1), volume=300, moisture=8)
+
+    daily = CharcoalEntryDaily.objects.get(supplier=supplier, entry_date=date(2024, 1, 1))
+    assert daily.entries_count == 2
+    assert daily.total_volume == 400
+    assert daily.moisture_sum / daily.entries_count == 6
+    assert daily.weighted_moisture_sum / daily.total_volume == 7
+
+    # Ao mudar a data, os dois dias são recalculados.
+    first.entry_date = date(2024, 1, 2)
+    first.save()
+
+    days = dict(CharcoalEntryDaily.objects.values_list('entry_date', 'entries_count'))
+    assert days == {date(2024, 1, 1): 1, date(2024, 1, 2): 1}
+
+    first.delete()
+    assert list(CharcoalEntryDaily.objects.values_list('entry_date', flat=True)) == [date(2024, 1, 1)]
+
+    CharcoalEntryDaily.objects.all().delete()
+    assert refresh_daily_entries() == 1
+    assert CharcoalEntryDaily.objects.get().total_volume == 300
+
+
+@pytest.mark.django_db
+def test_charts_aggregate_from_daily_rollup(supplier):
+    for day in range(1, 15):
+        create_entry(supplier, f'{day}-a', date(2024, 1, day), volume=100, moisture=day)
+        create_entry(supplier, f'{day}-b', date(2024, 1, day), volume=50, moisture=day * 2)
+
+    chart = json.loads(
+        charts.average_moisture_and_fines(group_by='week', start_date='2024-01-01', end_date='2024-01-31')
+    )
+    moisture = next(trace for trace in chart['data'] if trace['name'] == 'Umidade (%)')
+
+    expected = (
+        CharcoalEntry.objects.values('entry_date__week').annotate(value=Avg('moisture')).order_by('entry_date__week')
+    )
+    assert moisture['y'] == pytest.approx([row['value'] for row in expected])
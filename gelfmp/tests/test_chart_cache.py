@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import RequestFactory
+from django.urls import reverse
+
+from gelfmp.api.charts import update_chart
+from gelfmp.models import CharcoalMonthlyPlan, City, MaterialType, State, Supplier
+from gelfmp.utils.error_handlers import handle_chart_error
+
+
+@pytest.fixture
+def chart_function(settings, mocker):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    # O LocMemCache é compartilhado entre os testes, então os contadores começam zerados.
+    cache.clear()
+
+    def average_density(group_by='day', months=3):
+        return json.dumps({'group_by': group_by, 'months': months})
+
+    chart = mocker.Mock(side_effect=average_density)
+    mocker.patch.dict('gelfmp.api.charts.CHARTS', {'average_density': chart})
+
+    return chart
+
+
+def fetch_chart(**params):
+    response = update_chart(RequestFactory().get('/api/chart/update/', {'chart_id': 'average_density', **params}))
+    return response['X-Cache'], json.loads(response.content)['chart_data']
+
+
+@pytest.mark.django_db
+def test_update_chart_is_cached_until_charcoal_data_changes(
+    chart_function, django_capture_on_commit_callbacks, client, admin_client
+):
+    assert fetch_chart(group_by='week', months='6')[0] == 'MISS'
+
+    # A ordem dos parâmetros não altera a chave do cache.
+    cache_status, chart_data = fetch_chart(months='6', group_by='week')
+    assert cache_status == 'HIT'
+    assert json.loads(chart_data) == {'group_by': 'week', 'months': '6'}
+    assert chart_function.call_count == 1
+
+    assert fetch_chart(group_by='month', months='6')[0] == 'MISS'
+
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    supplier = Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CharcoalMonthlyPlan.objects.create(planned_volume=100, month=1, year=2025, supplier=supplier)
+
+    assert fetch_chart(group_by='week', months='6')[0] == 'MISS'
+    assert chart_function.call_count == 3
+
+    # As estatísticas do cache são restritas à equipe.
+    assert client.get(reverse('chart_cache_stats')).status_code == 302
+
+    stats = json.loads(admin_client.get(reverse('chart_cache_stats')).content)
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['hit_rate'] == 0.25
+
+
+@pytest.mark.django_db
+def test_failed_charts_are_not_cached(chart_function, mocker):
+    calls = []
+
+    @handle_chart_error
+    def average_density(group_by='day'):
+        calls.append(group_by)
+        if len(calls) == 1:
+            raise OperationalError('database is locked')
+
+        return json.dumps({'group_by': group_by})
+
+    mocker.patch.dict('gelfmp.api.charts.CHARTS', {'average_density': average_density})
+
+    cache_status, chart_data = fetch_chart(group_by='week')
+    assert cache_status == 'MISS'
+    assert isinstance(chart_data, str)
+    assert 'group_by' not in chart_data
+
+    # O erro não foi guardado, então o gráfico é gerado novamente.
+    assert fetch_chart(group_by='week') == ('MISS', json.dumps({'group_by': 'week'}))
+    assert fetch_chart(group_by='week')[0] == 'HIT'
+    assert len(calls) == 2
@@ -0,0 +1,135 @@
+import gzip
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gelfmp.charts import charts
+from gelfmp.charts import data as chart_data
+from gelfmp.charts.utils import PLOTLYJS_PATH
+from gelfmp.models import DCF, CharcoalEntry, City, MaterialType, State, Supplier
+
+
+@pytest.fixture
+def supplier():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    supplier = Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+    dcf = DCF.objects.create(process_number='0000000000001/24-00', supplier=supplier)
+
+    for day in range(1, 11):
+        CharcoalEntry.objects.create(
+            origin_ticket=str(day),
+            vehicle_plate='ABC1234',
+            origin_volume=100,
+            entry_volume=100,
+            entry_date=date(2024, 1, day),
+            moisture=day,
+            fines=10,
+            density=200,
+            gcae='GCAE',
+            dcf=dcf,
+            supplier=supplier,
+        )
+
+    return supplier
+
+
+def render_supplier_charts(supplier_id):
+    params = {'supplier': supplier_id, 'start_date': '2024-01-01', 'end_date': '2024-01-31', 'html': True}
+
+    with CaptureQueriesContext(connection) as queries:
+        rendered = [
+            charts.supplier_charcoal_entries(**params),
+            charts.supplier_average_moisture_and_fines(**params),
+            charts.supplier_average_density(**params),
+        ]
+
+    assert all('plotly' in chart for chart in rendered)
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_charts_share_aggregated_frame_within_request(supplier):
+    # Fornecedor e agregação consultados por cada um dos três gráficos.
+    assert render_supplier_charts(supplier.id) == 6
+
+    with chart_data.request_scope():
+        assert render_supplier_charts(supplier.id) == 2
+
+    # Fora da requisição nada fica guardado.
+    assert chart_data._memo.get() is None
+
+
+@pytest.mark.django_db
+def test_batch_charts_share_one_aggregation(supplier, client, settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    chart_ids = ['supplier_charcoal_entries', 'supplier_average_moisture_and_fines', 'supplier_average_density']
+    params = {'chart_id': chart_ids, 'supplier': supplier.id, 'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('batch_charts'), params)
+
+    assert response.status_code == 200
+    assert list(response.json()['charts']) == chart_ids
+    assert response['X-Cache-Hits'] == '0/3'
+    assert sum('gelfmp_charcoalentrydaily' in query['sql'] for query in queries) == 1
+
+    response = client.get(reverse('batch_charts'), params)
+    assert response['X-Cache-Hits'] == '3/3'
+
+    response = client.get(reverse('batch_charts'), {'chart_id': ['charcoal_entries', 'invalid']})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_supplier_stats_loads_charts_lazily(supplier, client, settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    response = client.get(reverse('charcoal_supplier_stats', args=[supplier.id]))
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert 'plotly-graph-div' not in content
+    assert content.count('hx-trigger="intersect once"') == 4
+
+    url = response.context['charts'][0]['url'] + '&start_date=2024-01-01&end_date=2024-01-31'
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response['X-Cache'] == 'MISS'
+    assert 'plotly-graph-div' in response.content.decode()
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+    response = client.get(reverse('chart_html'), {'chart_id': 'invalid'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_chart_fragments_use_shared_plotlyjs(supplier, client, settings, tmp_path):
+    params = {'supplier': supplier.id, 'start_date': '2024-01-01', 'end_date': '2024-01-31', 'html': True}
+    fragment = charts.supplier_charcoal_entries(**params)
+
+    # Apenas a div e o json da figura, sem o bundle do plotly.js.
+    assert 'Plotly.newPlot' in fragment
+    assert len(fragment) < 100_000
+
+    settings.STATICFILES_DIRS = [str(tmp_path)]
+    call_command('build_plotlyjs')
+
+    plotlyjs = tmp_path / PLOTLYJS_PATH
+    assert gzip.decompress((tmp_path / f'{PLOTLYJS_PATH}.gz').read_bytes()) == plotlyjs.read_bytes()
+    assert (tmp_path / f'{PLOTLYJS_PATH}.br').is_file()
+
+    response = client.get(reverse('charcoal_dashboard'))
+    assert f'src="/static/{PLOTLYJS_PATH}"' in response.content.decode()
@@ -0,0 +1,100 @@
+import json
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from gelfmp.charts import charts
+from gelfmp.charts.downsampling import lttb
+from gelfmp.models import DCF, CharcoalEntry, City, MaterialType, State, Supplier
+from gelfmp.services.charcoal_rollup import refresh_daily_entries
+
+DAYS = 60
+
+
+@pytest.fixture
+def supplier():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    supplier = Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=City.objects.create(name='Sete Lagoas', state=state),
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+    dcf = DCF.objects.create(process_number='0000000000001/24-00', supplier=supplier)
+
+    CharcoalEntry.objects.bulk_create([
+        CharcoalEntry(
+            origin_ticket=str(day),
+            vehicle_plate='ABC1234',
+            origin_volume=100,
+            entry_volume=100,
+            entry_date=date(2024, 1, 1) + timedelta(days=day),
+            moisture=day % 7,
+            fines=10,
+            density=200 + day,
+            gcae='GCAE',
+            dcf=dcf,
+            supplier=supplier,
+        )
+        for day in range(DAYS)
+    ])
+
+    # O bulk_create não dispara os signals que atualizam o resumo diário.
+    refresh_daily_entries()
+    return supplier
+
+
+def test_lttb_keeps_shape():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10
+
+    indices = lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    # O pico isolado é mantido.
+    assert 500 in indices
+
+
+def test_lttb_ignores_short_series_and_nan():
+    y = np.array([1.0, np.nan, 3.0, 4.0])
+
+    assert list(lttb(np.arange(4), y, 10)) == [0, 2, 3]
+    assert list(lttb(np.arange(4), y, 2)) == [0, 2, 3]
+
+
+def chart(function, **params):
+    return json.loads(function(start_date='2024-01-01', end_date='2024-03-31', **params))
+
+
+@pytest.mark.django_db
+def test_line_charts_are_downsampled(supplier):
+    assert len(chart(charts.average_density)['data'][0]['y']) == DAYS
+
+    density = chart(charts.average_density, max_points='20')['data'][0]
+    assert len(density['x']) == len(density['y']) == 20
+    assert density['x'][0] == '2024-01-01'
+    assert density['x'][-1] == '2024-02-29'
+
+    traces = chart(charts.average_moisture_and_fines, max_points=20)['data']
+    assert [len(trace['y']) for trace in traces] == [20, 20]
+
+
+@pytest.mark.django_db
+def test_bar_chart_falls_back_to_coarser_buckets(supplier):
+    assert len(chart(charts.charcoal_entries)['data'][0]['x']) == DAYS
+
+    weekly = chart(charts.charcoal_entries, max_points=20)['data'][0]
+    assert len(weekly['x']) == 9
+    assert sum(weekly['y']) == pytest.approx(DAYS * 100)
+
+    monthly = chart(charts.charcoal_entries, max_points=5)['data'][0]
+    assert weekly['hovertemplate'] != monthly['hovertemplate']
+    assert len(monthly['x']) == 2
@@ -0,0 +1,245 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+from django.core.management import call_command
+
+from gelfmp.charts import figures, theme
+from gelfmp.charts.utils import WEEK_DTICK
+
+HOVERTEMPLATE = '<b>Volume Total:</b> %{y:.2f} m³<br><b>Umidade Média:</b> %{customdata[0]:.2f}%<br><extra></extra>'
+
+
+def px_charcoal_entries(entries, title, hovertemplate, dtick, xrange=None):
+    """Gráfico de entradas de carvão montado com o plotly.express (implementação anterior), usado como referência."""
+
+    y_values = entries['total_volume'].tolist()
+
+    fig = px.bar(
+        x=entries['entry_period'].tolist(),
+        y=y_values,
+        text=y_values,
+        title=title,
+        labels={'y': 'Volume Total'},
+        custom_data=[
+            entries['average_moisture'].tolist(),
+            entries['average_fines'].tolist(),
+            entries['average_density'].tolist(),
+        ],
+    )
+
+    fig.update_traces(
+        texttemplate='%{text:,.2f}',
+        textfont=dict(color='white'),
+        textposition='outside',
+        cliponaxis=False,
+        hovertemplate=hovertemplate,
+    )
+
+    fig.update_layout(
+        uniformtext_minsize=8,
+        uniformtext_mode='hide',
+        yaxis_title='Volume Total (m³)',
+        xaxis_title='',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+        xaxis=dict(dtick=dtick, range=xrange),
+        autosize=True,
+    )
+
+    return fig
+
+
+def px_average_moisture_and_fines(entries, title):
+    df = entries.rename(columns={'average_fines': 'avg_fines', 'average_moisture': 'avg_moisture'})
+
+    fig = px.line(
+        df,
+        x='entry_period',
+        y=['avg_fines', 'avg_moisture'],
+        title=title,
+        labels={'entry_period': 'Período', 'avg_fines': 'Finos (%)', 'avg_moisture': 'Umidade (%)'},
+        markers=True,
+    )
+
+    fig.update_traces(
+        selector=dict(name='avg_fines'),
+        name='Finos (%)',
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Finos:</b> %{y:.2f}%<br><extra></extra>',
+        line_shape='spline',
+    )
+
+    fig.update_traces(
+        selector=dict(name='avg_moisture'),
+        name='Umidade (%)',
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Umidade:</b> %{y:.2f}%<br><extra></extra>',
+        line_color=figures.SECONDARY_COLOR,
+        line_shape='spline',
+    )
+
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Valores Médios (%)',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+        legend_title='Variáveis',
+    )
+
+    return fig
+
+
+def px_average_density(entries, title):
+    fig = px.line(
+        entries,
+        x='entry_period',
+        y='average_density',
+        title=title,
+        labels={'entry_period': 'Período', 'average_density': 'Densidade Média'},
+        markers=True,
+    )
+
+    fig.update_traces(
+        hovertemplate='<b>Data:</b> %{x|%d-%m-%Y}<br><b>Densidade:</b> %{y:.2f}<br><extra></extra>',
+        line_shape='spline',
+    )
+
+    fig.update_layout(
+        xaxis_title='',
+        yaxis_title='Densidade Média',
+        title_x=0.5,
+        margin=dict(l=30, r=15, t=40, b=20),
+    )
+
+    return fig
+
+
+def px_supplier_iqfs(labels, iqfs, title):
+    df = pd.DataFrame({'month_year': labels, 'iqf': iqfs})
+
+    fig = px.area(
+        df,
+        x='month_year',
+        y='iqf',
+        text='iqf',
+        title=title,
+        labels={'month_year': 'Mês/Ano', 'iqf': 'IQF'},
+    )
+
+    xaxis_range = [-0.2, len(labels) - 0.9] if len(labels) > 1 else [-0.1, 0.1]
+
+    fig.update_layout(
+        uniformtext_minsize=8,
+        uniformtext_mode='hide',
+        title_y=0.95,
+        margin=dict(l=30, r=20, t=50, b=40),
+        autosize=True,
+        dragmode=False,
+        xaxis=dict(title='', range=xaxis_range, tickfont=dict(size=10)),
+        yaxis=dict(automargin=True, rangemode='tozero', ticksuffix='%'),
+    )
+
+    fig.update_traces(
+        hovertemplate='%{text:.1f}%',
+        texttemplate='%{text:.1f}%',
+        textfont=dict(color='white'),
+        textposition='top center',
+        cliponaxis=False,
+        marker=dict(size=8, symbol='circle'),
+        line=dict(width=2),
+    )
+
+    return fig
+
+
+def sample_entries(periods, freq):
+    rng = np.random.default_rng(0)
+
+    return pd.DataFrame({
+        'entry_period': pd.date_range('2024-01-01', periods=periods, freq=freq).date,
+        'total_volume': rng.uniform(100, 1000, periods),
+        'average_moisture': rng.uniform(2, 10, periods),
+        'average_fines': rng.uniform(5, 15, periods),
+        'average_density': rng.uniform(180, 280, periods),
+    })
+
+
+def chart_cases():
+    """
+    Retorna, para cada gráfico, o par (plotly.express, figures) que gera a mesma figura
+    a partir dos mesmos dados agregados, nas visualizações diária, semanal e mensal.
+    """
+
+    cases = {}
+
+    views = [('day', 90, 'D', ''), ('week', 26, 'W-MON', WEEK_DTICK), ('month', 12, 'MS', 'M1')]
+
+    for group_by, periods, freq, dtick in views:
+        entries = sample_entries(periods, freq)
+        args = (entries, 'Entrada de Carvão', HOVERTEMPLATE, dtick)
+
+        cases[f'charcoal_entries ({group_by})'] = (
+            lambda args=args: px_charcoal_entries(*args),
+            lambda args=args: figures.charcoal_entries(*args),
+        )
+        cases[f'average_moisture_and_fines ({group_by})'] = (
+            lambda entries=entries: px_average_moisture_and_fines(entries, 'Umidade e Finos'),
+            lambda entries=entries: figures.average_moisture_and_fines(entries, 'Umidade e Finos'),
+        )
+        cases[f'average_density ({group_by})'] = (
+            lambda entries=entries: px_average_density(entries, 'Densidade'),
+            lambda entries=entries: figures.average_density(entries, 'Densidade'),
+        )
+
+    labels, iqfs = ['1/2024', '2/2024', '3/2024'], np.array([92.5, 88.0, 95.1])
+    cases['supplier_iqfs_last_3_months'] = (
+        lambda: px_supplier_iqfs(labels, iqfs, 'IQF'),
+        lambda: figures.supplier_iqfs(labels, iqfs, 'IQF'),
+    )
+
+    return cases
+
+
+def normalize(value):
+    """Decodifica os arrays em base64 do plotly e remove o `legendgroup`, que só agrupa a legenda."""
+
+    if isinstance(value, dict):
+        if 'bdata' in value:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            if 'shape' in value:
+                array = array.reshape([int(size) for size in value['shape'].split(',')])
+            return array.tolist()
+
+        return {key: normalize(item) for key, item in value.items() if key != 'legendgroup'}
+
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+
+    return value
+
+
+@pytest.fixture
+def px_template():
+    default = pio.templates.default
+    pio.templates.default = go.layout.Template(layout=theme.custom_layout)
+    yield
+    pio.templates.default = default
+
+
+@pytest.mark.parametrize('case', list(chart_cases()))
+def test_figures_match_plotly_express(case, px_template):
+    px_build, build = chart_cases()[case]
+
+    expected = normalize(json.loads(px_build().to_json()))
+    assert normalize(json.loads(figures.to_json(build()))) == expected
+
+
+def test_benchmark_charts(capsys):
+    call_command('benchmark_charts', repeat=1)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(chart_cases()) + 1
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from gelfmp.models import DCF, CharcoalEntry, City, MaterialType, State, Supplier
+from gelfmp.services import entries_store
+
+
+@pytest.fixture
+def dcf():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    city = City.objects.create(name='Sete Lagoas', state=state)
+
+    suppliers = [
+        Supplier.objects.create(
+            corporate_name=f'FORNECEDOR {index}',
+            material_type=MaterialType.CHARCOAL,
+            supplier_type='third_party',
+            state=state,
+            city=city,
+            cep='35700000',
+            cpf_cnpj=f'0000000000000{index}',
+        )
+        for index in range(2)
+    ]
+
+    entries_store.invalidate()
+    yield [
+        DCF.objects.create(process_number=f'000000000000{index}/24-00', supplier=supplier)
+        for index, supplier in enumerate(suppliers)
+    ]
+    entries_store.invalidate()
+
+
+def create_entry(dcf, ticket, entry_date, volume=100):
+    return CharcoalEntry.objects.create(
+        origin_ticket=ticket,
+        vehicle_plate='ABC1234',
+        origin_volume=volume,
+        entry_volume=volume,
+        entry_date=entry_date,
+        moisture=5,
+        fines=8,
+        density=220,
+        gcae='GCAE',
+        dcf=dcf,
+        supplier=dcf.supplier,
+    )
+
+
+@pytest.mark.django_db
+def test_query_filters_by_supplier_and_period(dcf):
+    create_entry(dcf[0], '1', date(2024, 1, 10))
+    create_entry(dcf[0], '2', date(2024, 2, 10))
+    create_entry(dcf[1], '3', date(2024, 1, 20))
+
+    january = entries_store.query(start_date=date(2024, 1, 1), end_date='2024-01-31')
+    assert sorted(january['supplier_id']) == sorted([dcf[0].supplier_id, dcf[1].supplier_id])
+
+    entries = entries_store.query(supplier_ids=[dcf[0].supplier_id])
+    assert list(entries['entry_date'].dt.month) == [1, 2]
+    assert set(entries.columns) == set(entries_store.COLUMNS)
+
+
+@pytest.mark.django_db
+def test_store_is_updated_incrementally(dcf, django_capture_on_commit_callbacks):
+    first = create_entry(dcf[0], '1', date(2024, 1, 10))
+    second = create_entry(dcf[0], '2', date(2024, 1, 11))
+
+    store = entries_store.get_store()
+    assert len(store) == 2
+
+    # Os sinais das gravações fazem a próxima consulta verificar o banco, sem esperar o intervalo.
+    with django_capture_on_commit_callbacks(execute=True):
+        third = create_entry(dcf[1], '3', date(2024, 1, 12), volume=50)
+        second.entry_volume = 300
+        second.save()
+        first.delete()
+
+    with CaptureQueriesContext(connection) as queries:
+        entries = entries_store.query()
+
+    # O store é reaproveitado e apenas as alterações são buscadas.
+    assert entries_store.get_store() is store
+    assert sum('"gelfmp_charcoalentry"."updated_at" >=' in query['sql'] for query in queries) == 1
+    assert dict(zip(entries['id'], entries['entry_volume'])) == {second.id: 300, third.id: 50}
+
+    # Uma exclusão que não gera Tombstone é percebida pela contagem.
+    CharcoalEntry.objects.filter(id=second.id)._raw_delete(connection.alias)
+    entries_store.mark_stale()
+    assert list(entries_store.query()['entry_volume']) == [50]
+
+
+@pytest.mark.django_db
+def test_store_checks_the_database_at_most_once_per_interval(dcf):
+    entry = create_entry(dcf[0], '1', date(2024, 1, 10))
+    store = entries_store.get_store()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert list(entries_store.query()['id']) == [entry.id]
+
+    assert len(queries) == 0
+
+    # O `QuerySet.update` não muda o `updated_at` nem a contagem, então só a carga
+    # completa feita após a idade máxima do store traz o valor novo.
+    CharcoalEntry.objects.filter(id=entry.id).update(entry_volume=300)
+    entries_store.mark_stale()
+    assert list(entries_store.query()['entry_volume']) == [100]
+
+    store.loaded_at -= entries_store.MAX_AGE
+    entries_store.mark_stale()
+    assert list(entries_store.query()['entry_volume']) == [300]
+    assert entries_store.get_store() is not store
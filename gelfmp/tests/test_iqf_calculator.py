@@ -1,3 +1,4 @@
+from datetime import date
 from unittest.mock import MagicMock
 
 import pandas as pd
@@ -81,18 +82,16 @@ def test_calculate_iqf():
 
 
 def test_calculate_suppliers_iqf(mocker):
-    mock_entries = MagicMock()
-    mock_entries.exists.return_value = True
-    mock_entries.values.return_value = [
+    mock_entries = pd.DataFrame([
         {'supplier_id': 1, 'entry_volume': 100, 'fines': 8, 'moisture': 6, 'density': 220},
         {'supplier_id': 1, 'entry_volume': 200, 'fines': 12, 'moisture': 9, 'density': 205},
-    ]
+    ])
 
     mock_supplier = MagicMock()
     mock_supplier.corporate_name = 'Fornecedor Teste'
     mock_supplier.supplier_type = SupplierType.THIRD_PARTY
 
-    mocker.patch('gelfmp.models.CharcoalEntry.objects.filter', return_value=mock_entries)
+    query = mocker.patch('gelfmp.services.entries_store.query', return_value=mock_entries)
     mocker.patch('gelfmp.models.Supplier.objects.get', return_value=mock_supplier)
     mocker.patch('gelfmp.models.CharcoalMonthlyPlan.objects.get', return_value=MagicMock(planned_volume=500))
     mocker.patch('gelfmp.models.CharcoalIQF.objects.filter', return_value=MagicMock(first=MagicMock(return_value=None)))
@@ -115,18 +114,21 @@ def test_calculate_suppliers_iqf(mocker):
         assert data['density_percentage'] == 33.33
 
     mocker.patch('gelfmp.models.CharcoalIQF.objects.update_or_create', side_effect=custom_update_or_create)
+    refresh_summaries = mocker.patch('gelfmp.services.supplier_summary.refresh_supplier_summaries')
 
-    processed_suppliers = calculate_suppliers_iqf(12, 2024)
+    processed_suppliers = calculate_suppliers_iqf('12', '2024')
 
+    assert query.call_args.kwargs['start_date'] == date(2024, 12, 1)
+    assert query.call_args.kwargs['end_date'] == date(2024, 12, 31)
     assert len(processed_suppliers) == 1
     assert 'IQF CALCULADO' in processed_suppliers[0]
 
+    # O resumo é atualizado pelo sinal post_save do IQF, e não uma segunda vez pelo cálculo.
+    refresh_summaries.assert_not_called()
 
-def test_calculate_suppliers_iqf_no_entries(mocker):
-    mock_entries = MagicMock()
-    mock_entries.exists.return_value = False
 
-    mocker.patch('gelfmp.models.CharcoalEntry.objects.filter', return_value=mock_entries)
+def test_calculate_suppliers_iqf_no_entries(mocker):
+    mocker.patch('gelfmp.services.entries_store.query', return_value=pd.DataFrame())
 
     with pytest.raises(ValueError, match=r'Não há entradas de carvão para o mês 12/2024.'):
         calculate_suppliers_iqf(12, 2024)
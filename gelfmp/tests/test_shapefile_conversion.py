@@ -0,0 +1,114 @@
+import io
+import json
+import zipfile
+
+import geopandas as gpd
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from shapely.geometry import box
+
+from gelfmp.models import City, Document, DocumentType, GeometryLevel, GeometryStatus, MaterialType, State, Supplier
+from gelfmp.services import geojson
+from gelfmp.services.shapefile_conversion import convert_document_shapefile
+
+
+def shapefile_zip(tmp_path, folder='TALHOES/'):
+    # Talhão de 1 km² em UTM 23S, nas proximidades de Sete Lagoas.
+    gdf = gpd.GeoDataFrame({'TALHAO': [1]}, geometry=[box(580000, 7850000, 581000, 7851000)], crs='EPSG:31983')
+    gdf.to_file(tmp_path / 'talhoes.shp', engine='pyogrio')
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for extension in ('shp', 'shx', 'dbf', 'prj'):
+            zf.write(tmp_path / f'talhoes.{extension}', f'{folder}talhoes.{extension}')
+
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def supplier():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    city = City.objects.create(name='Sete Lagoas', state=state)
+
+    return Supplier.objects.create(
+        corporate_name='FORNECEDOR',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=city,
+        cep='35700000',
+        cpf_cnpj='00000000000000',
+    )
+
+
+def test_from_shapefile_zip_reads_archive_without_extracting(tmp_path):
+    path = tmp_path / 'shapefile.zip'
+    path.write_bytes(shapefile_zip(tmp_path))
+
+    data = geojson.from_shapefile_zip(str(path))
+    extent = geojson.get_extent(data)
+
+    assert json.loads(data)['features'][0]['properties']['TALHAO'] == 1
+    assert extent['min_lon'] == pytest.approx(-44.23, abs=0.01)
+    assert extent['min_lat'] == pytest.approx(-19.44, abs=0.01)
+
+
+def test_from_shapefile_zip_restores_missing_shx(tmp_path):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(shapefile_zip(tmp_path))) as source, zipfile.ZipFile(archive, 'w') as zf:
+        for name in source.namelist():
+            if not name.endswith('.shx'):
+                zf.writestr(name, source.read(name))
+
+    path = tmp_path / 'shapefile.zip'
+    path.write_bytes(archive.getvalue())
+
+    assert geojson.get_extent(geojson.from_shapefile_zip(str(path)))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_shapefile_upload_is_converted_in_background(supplier, settings, tmp_path, mocker):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    schedule_conversion = mocker.patch('gelfmp.services.shapefile_conversion.schedule_conversion')
+
+    document = Document(
+        supplier=supplier,
+        document_type=DocumentType.SHAPEFILE,
+        file=SimpleUploadedFile('talhoes.zip', shapefile_zip(tmp_path)),
+    )
+    document.full_clean()
+    document.save()
+
+    # O documento é salvo imediatamente, sem o GeoJSON.
+    assert document.geometry_status == GeometryStatus.PROCESSING
+    assert document.geojson is None
+    schedule_conversion.assert_called_once_with(document.pk)
+
+    convert_document_shapefile(document.pk)
+    document = Document.objects.get(pk=document.pk)
+
+    assert document.geometry_status == GeometryStatus.READY
+    assert document.min_lon == pytest.approx(-44.23, abs=0.01)
+    assert document.geometries.filter(level=GeometryLevel.FULL).exists()
+
+
+@pytest.mark.django_db
+def test_invalid_shapefile_conversion_sets_error_status(supplier, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('talhoes.shp', b'invalido')
+
+    document = Document.objects.create(
+        supplier=supplier,
+        document_type=DocumentType.SHAPEFILE,
+        file=SimpleUploadedFile('talhoes.zip', archive.getvalue()),
+        geometry_status=GeometryStatus.PROCESSING,
+    )
+
+    convert_document_shapefile(document.pk)
+    document.refresh_from_db()
+
+    assert document.geometry_status == GeometryStatus.ERROR
+    assert 'Erro ao processar o Shapefile' in document.geometry_error
@@ -0,0 +1,636 @@
+import json
+import os
+from datetime import date, timedelta
+
+import mapbox_vector_tile
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from gelfmp.api.conditional import get_models_fingerprint
+from gelfmp.api.suppliers import (
+    get_shapefiles,
+    get_shapefiles_overview,
+    get_state_shapefiles,
+    get_supplier_changes,
+    get_suppliers,
+)
+from gelfmp.api.tiles import get_tile
+from gelfmp.models import (
+    DCF,
+    CharcoalEntry,
+    CharcoalIQF,
+    City,
+    Document,
+    DocumentGeometry,
+    DocumentType,
+    GeometryLevel,
+    MaterialType,
+    State,
+    Supplier,
+    SupplierSummary,
+    Tombstone,
+)
+from gelfmp.services import geojson, shapefile_index, vector_tiles
+from gelfmp.services.supplier_summary import refresh_supplier_summaries
+
+
+def create_supplier(index, state, city, entries=35, iqfs=3):
+    supplier = Supplier.objects.create(
+        corporate_name=f'FORNECEDOR {index}',
+        material_type=MaterialType.CHARCOAL,
+        supplier_type='third_party',
+        state=state,
+        city=city,
+        cep='35700000',
+        cpf_cnpj=f'{index:014d}',
+    )
+
+    dcf = DCF.objects.create(process_number=f'{index:013d}/24-00', supplier=supplier)
+
+    CharcoalEntry.objects.bulk_create([
+        CharcoalEntry(
+            origin_ticket=f'{index}-{day}',
+            vehicle_plate='ABC1234',
+            origin_volume=100,
+            entry_volume=100,
+            entry_date=date(2024, 1, 1) + timedelta(days=day),
+            moisture=day,
+            fines=10,
+            density=200,
+            gcae='GCAE',
+            dcf=dcf,
+            supplier=supplier,
+        )
+        for day in range(entries)
+    ])
+
+    for month in range(1, iqfs + 1):
+        CharcoalIQF.objects.create(
+            iqf=month * 10,
+            planned_percentage=100,
+            fines_percentage=100,
+            moisture_percentage=100,
+            density_percentage=100,
+            volume_density_below_min=0,
+            volume_fines_above_max=0,
+            volume_moisture_above_max=0,
+            planned_volume=100,
+            total_volume=100,
+            month=month,
+            year=2024,
+            supplier=supplier,
+        )
+
+    Document.objects.create(
+        name='CTF',
+        file='FORNECEDORES/CTF.pdf',
+        document_type=DocumentType.CTF,
+        validity=date(2030, 1, 1),
+        supplier=supplier,
+    )
+
+    return supplier
+
+
+def fetch_suppliers():
+    request = RequestFactory().get('/api/suppliers/')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = get_suppliers(request)
+        content = b''.join(response.streaming_content)
+
+    return json.loads(content), len(queries)
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    # Os fingerprints da API ficam em cache, que precisa começar vazio em cada teste.
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+@pytest.fixture
+def location():
+    state = State.objects.create(abbr='MG', name='Minas Gerais')
+    city = City.objects.create(name='Sete Lagoas', state=state)
+    return state, city
+
+
+@pytest.mark.django_db
+def test_get_suppliers_query_count_is_constant(location, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for index in range(2):
+            create_supplier(index, *location)
+
+        refresh_supplier_summaries()
+
+    data, small_query_count = fetch_suppliers()
+    assert len(data) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for index in range(2, 12):
+            create_supplier(index, *location)
+
+        refresh_supplier_summaries()
+
+    data, large_query_count = fetch_suppliers()
+    assert len(data) == 12
+    assert large_query_count == small_query_count
+
+
+@pytest.mark.django_db
+def test_get_suppliers_recent_stats_and_rating(location):
+    create_supplier(1, *location, entries=35, iqfs=4)
+    create_supplier(2, *location, entries=0, iqfs=2)
+
+    refresh_supplier_summaries()
+    data, _ = fetch_suppliers()
+    suppliers = {supplier['corporate_name']: supplier for supplier in data}
+
+    stats = suppliers['FORNECEDOR 1']['charcoal_recent_stats']
+    assert stats['count'] == 30
+    assert stats['average_moisture'] == pytest.approx(sum(range(5, 35)) / 30)
+    assert stats['period'] == '06/01/2024 - 04/02/2024'
+
+    # Média dos 3 IQFs mais recentes (meses 2, 3 e 4).
+    assert suppliers['FORNECEDOR 1']['rating'] == '30.0'
+    assert len(suppliers['FORNECEDOR 1']['documents']) == 1
+
+    assert suppliers['FORNECEDOR 2']['charcoal_recent_stats'] is None
+    assert suppliers['FORNECEDOR 2']['rating'] is None
+
+
+@pytest.mark.django_db
+def test_refresh_supplier_summaries_only_touches_given_suppliers(location):
+    first = create_supplier(1, *location, entries=5, iqfs=3)
+    second = create_supplier(2, *location, entries=5, iqfs=3)
+
+    assert refresh_supplier_summaries({first.id}) == 1
+    assert SupplierSummary.objects.get(supplier=first).entries_count == 5
+    assert not SupplierSummary.objects.filter(supplier=second).exists()
+
+    CharcoalIQF.objects.filter(supplier=first).delete()
+    refresh_supplier_summaries({first.id})
+
+    summary = SupplierSummary.objects.get(supplier=first)
+    assert summary.rating is None
+    assert summary.entries_count == 5
+
+
+@pytest.mark.django_db
+def test_supplier_summary_follows_admin_changes(location, django_capture_on_commit_callbacks):
+    supplier = create_supplier(1, *location, entries=35, iqfs=4)
+    refresh_supplier_summaries()
+
+    # A entrada mais recente deixa de contar e a 30ª mais recente passa a fazer parte das médias.
+    with django_capture_on_commit_callbacks(execute=True):
+        CharcoalEntry.objects.filter(supplier=supplier).latest('entry_date').delete()
+
+    summary = SupplierSummary.objects.get(supplier=supplier)
+    assert summary.average_moisture == pytest.approx(sum(range(4, 34)) / 30)
+    assert summary.last_entry_date == date(2024, 2, 3)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CharcoalIQF.objects.get(supplier=supplier, month=4).delete()
+
+    # Média dos IQFs dos meses 1, 2 e 3.
+    assert SupplierSummary.objects.get(supplier=supplier).rating == 20.0
+
+    # Mover o IQF para outro fornecedor atualiza o rating dos dois.
+    other = create_supplier(2, *location, entries=0, iqfs=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        iqf = CharcoalIQF.objects.get(supplier=supplier, month=3)
+        iqf.supplier = other
+        iqf.save()
+
+    assert SupplierSummary.objects.get(supplier=supplier).rating is None
+    assert SupplierSummary.objects.get(supplier=other).rating == 20.0
+
+
+@pytest.mark.django_db
+def test_get_state_shapefiles_streams_stored_geojson(location):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+    geojson = '{"type": "FeatureCollection", "features": [], "name": "Fazenda São José"}'
+
+    Document.objects.create(
+        name='TALHOES',
+        file='FORNECEDORES/TALHOES.zip',
+        document_type=DocumentType.SHAPEFILE,
+        geojson=geojson,
+        supplier=supplier,
+    )
+
+    Document.objects.create(
+        name='PROPRIEDADE',
+        file='FORNECEDORES/PROPRIEDADE.zip',
+        document_type=DocumentType.PROPERTY_SHAPEFILE,
+        geojson=geojson,
+        supplier=supplier,
+    )
+
+    response = get_state_shapefiles(RequestFactory().get('/api/shapefiles/MG'), 'MG')
+    data = json.loads(b''.join(response.streaming_content))
+
+    assert [shapefile['name'] for shapefile in data] == ['PROPRIEDADE', 'TALHOES']
+    assert all(shapefile['geojson'] == geojson for shapefile in data)
+    assert data[0]['supplier_name'] == 'FORNECEDOR 1'
+
+
+@pytest.mark.django_db
+def test_get_suppliers_conditional_get(location, django_capture_on_commit_callbacks):
+    supplier = create_supplier(1, *location)
+    refresh_supplier_summaries()
+
+    response = get_suppliers(RequestFactory().get('/api/suppliers/'))
+    etag = response['ETag']
+    assert response['Cache-Control'] == 'no-cache'
+
+    request = RequestFactory().get('/api/suppliers/', headers={'If-None-Match': etag})
+    with CaptureQueriesContext(connection) as queries:
+        response = get_suppliers(request)
+
+    # O fingerprint dos modelos fica em cache até a próxima alteração.
+    assert response.status_code == 304
+    assert len(queries) == 0
+
+    # Outros parâmetros geram outra representação dos mesmos dados, com outro ETag.
+    request = RequestFactory().get('/api/suppliers/?fields=id,rating&active=true', headers={'If-None-Match': etag})
+    response = get_suppliers(request)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+    # A ordem dos parâmetros não altera o ETag.
+    reordered = get_suppliers(RequestFactory().get('/api/suppliers/?active=true&fields=id,rating'))
+    assert reordered['ETag'] == response['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        supplier.distance_in_meters = 1000
+        supplier.save()
+
+    response = get_suppliers(RequestFactory().get('/api/suppliers/', headers={'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+    # Uma exclusão também conta como modificação no Last-Modified.
+    with django_capture_on_commit_callbacks(execute=True):
+        supplier.documents.get().delete()
+
+    tombstone = Tombstone.objects.get(model=Document._meta.label)
+    assert get_models_fingerprint([Supplier, Document])[1] == tombstone.created_at
+
+
+@pytest.mark.django_db
+def test_get_suppliers_fields_and_filters(location):
+    active = create_supplier(1, *location)
+    inactive = create_supplier(2, *location)
+    inactive.active = False
+    inactive.save()
+
+    request = RequestFactory().get('/api/suppliers/', {'fields': 'corporate_name,id', 'active': 'true'})
+    data = json.loads(b''.join(get_suppliers(request).streaming_content))
+    assert data == [{'id': active.id, 'corporate_name': 'FORNECEDOR 1'}]
+
+    request = RequestFactory().get('/api/suppliers/', {'fields': 'id,password'})
+    assert get_suppliers(request).status_code == 400
+
+
+@pytest.mark.django_db
+def test_get_suppliers_keyset_pagination(location):
+    for index in range(5):
+        create_supplier(index, *location, entries=0, iqfs=0)
+
+    names, cursor = [], None
+
+    while True:
+        params = {'fields': 'corporate_name', 'limit': 2}
+        if cursor:
+            params['cursor'] = cursor
+
+        response = get_suppliers(RequestFactory().get('/api/suppliers/', params))
+        names += [supplier['corporate_name'] for supplier in json.loads(b''.join(response.streaming_content))]
+
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert names == [f'FORNECEDOR {index}' for index in range(5)]
+
+    response = get_suppliers(RequestFactory().get('/api/suppliers/', {'cursor': 'invalido'}))
+    assert response.status_code == 400
+
+
+def fetch_changes(since, **params):
+    request = RequestFactory().get('/api/suppliers/changes', {'since': since, **params})
+    return json.loads(get_supplier_changes(request).content)
+
+
+@pytest.mark.django_db
+def test_get_supplier_changes(location):
+    unchanged = create_supplier(1, *location, entries=0, iqfs=0)
+    changed = create_supplier(2, *location, entries=0, iqfs=0)
+    deleted = create_supplier(3, *location, entries=0, iqfs=0)
+
+    since = fetch_changes((timezone.now() - timedelta(days=1)).isoformat())['until']
+
+    Document.objects.filter(supplier__in=[changed, deleted]).delete()
+    DCF.objects.filter(supplier=deleted).delete()
+    Supplier.objects.filter(id=deleted.id).delete()
+
+    data = fetch_changes(since, fields='id,documents')
+    assert data['changed'] == [{'id': changed.id, 'documents': []}]
+    assert data['deleted'] == [deleted.id]
+
+    unchanged.corporate_name = 'FORNECEDOR 1 LTDA'
+    unchanged.save()
+
+    data = fetch_changes(data['until'], fields='id,corporate_name')
+    assert data['changed'] == [{'id': unchanged.id, 'corporate_name': 'FORNECEDOR 1 LTDA'}]
+    assert data['deleted'] == []
+
+
+@pytest.mark.django_db
+def test_tombstones_are_pruned_after_the_retention_period(location, settings):
+    settings.TOMBSTONE_RETENTION_DAYS = 30
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+
+    supplier.documents.get().delete()
+    Tombstone.objects.update(created_at=timezone.now() - timedelta(days=31))
+    recent = Tombstone.objects.create(model=Supplier._meta.label, object_id=999, supplier_id=999)
+
+    call_command('prune_tombstones')
+    assert list(Tombstone.objects.all()) == [recent]
+
+    # Clientes que não sincronizam desde antes do período podem ter perdido exclusões.
+    since = (timezone.now() - timedelta(days=31)).isoformat()
+    response = get_supplier_changes(RequestFactory().get('/api/suppliers/changes', {'since': since}))
+    assert response.status_code == 410
+    assert json.loads(response.content)['full_resync'] is True
+
+    assert fetch_changes((timezone.now() - timedelta(days=29)).isoformat())['deleted'] == [999]
+
+
+@pytest.mark.django_db
+def test_get_supplier_changes_requires_valid_since():
+    assert get_supplier_changes(RequestFactory().get('/api/suppliers/changes')).status_code == 400
+    assert get_supplier_changes(RequestFactory().get('/api/suppliers/changes', {'since': 'ontem'})).status_code == 400
+
+
+def polygon_geojson(vertices=200):
+    # Polígono com muitos vértices quase colineares em uma das arestas.
+    edge = [[-44 + 0.00001 * (index % 2), -19 + 0.00005 * index] for index in range(vertices)]
+    ring = [*edge, [-43.99, -19 + 0.00005 * vertices], [-43.99, -19], edge[0]]
+
+    return json.dumps({
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'properties': {'TALHAO': 1}, 'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+        ],
+    })
+
+
+def vertex_count(geojson_text):
+    return len(json.loads(geojson_text)['features'][0]['geometry']['coordinates'][0])
+
+
+def test_geometry_level_selection():
+    assert geojson.level_for_zoom(5) == GeometryLevel.OVERVIEW
+    assert geojson.level_for_zoom(10) == GeometryLevel.REGIONAL
+    assert geojson.level_for_zoom(12) == GeometryLevel.DETAIL
+    assert geojson.level_for_zoom(17) is None
+
+    assert geojson.level_for_tolerance(0.05) == GeometryLevel.OVERVIEW
+    assert geojson.level_for_tolerance(0.005) == GeometryLevel.REGIONAL
+    assert geojson.level_for_tolerance(0.00001) is None
+
+
+@pytest.mark.django_db
+def test_get_state_shapefiles_serves_simplified_levels(location):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+    full_geojson = polygon_geojson()
+
+    document = Document.objects.create(
+        name='TALHOES',
+        file='FORNECEDORES/TALHOES.zip',
+        document_type=DocumentType.SHAPEFILE,
+        geojson=full_geojson,
+        supplier=supplier,
+    )
+
+    assert document.geometries.count() == len(geojson.GEOMETRY_LEVELS) + 1
+
+    def fetch_vertex_count(**params):
+        request = RequestFactory().get('/api/shapefiles/MG', params)
+        data = json.loads(b''.join(get_state_shapefiles(request, 'MG').streaming_content))
+        return vertex_count(data[0]['geojson'])
+
+    overview, detail, full = fetch_vertex_count(zoom=5), fetch_vertex_count(zoom=13), fetch_vertex_count()
+    assert overview < detail < full == vertex_count(full_geojson)
+    assert fetch_vertex_count(tolerance=0.01) == overview
+
+    # Sem a geometria simplificada, o GeoJSON original é usado.
+    DocumentGeometry.objects.filter(document=document).exclude(level=GeometryLevel.FULL).delete()
+    assert fetch_vertex_count(zoom=5) == full
+
+    request = RequestFactory().get('/api/shapefiles/MG', {'zoom': 'perto'})
+    assert get_state_shapefiles(request, 'MG').status_code == 400
+
+
+def square_geojson(x, y, size=0.01, points_per_side=1):
+    steps = [size * step / points_per_side for step in range(points_per_side)]
+    ring = [
+        *([x + step, y] for step in steps),
+        *([x + size, y + step] for step in steps),
+        *([x + size - step, y + size] for step in steps),
+        *([x, y + size - step] for step in steps),
+        [x, y],
+    ]
+    return json.dumps({
+        'type': 'FeatureCollection',
+        'features': [{'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Polygon', 'coordinates': [ring]}}],
+    })
+
+
+@pytest.mark.django_db
+def test_get_shapefiles_by_bbox(location):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+
+    def create_shapefile(name, x, y):
+        return Document.objects.create(
+            name=name,
+            file=f'FORNECEDORES/{name}.zip',
+            document_type=DocumentType.SHAPEFILE,
+            geojson=square_geojson(x, y),
+            supplier=supplier,
+        )
+
+    def fetch_names(bbox):
+        response = get_shapefiles(RequestFactory().get('/api/shapefiles', {'bbox': bbox}))
+        return sorted(shapefile['name'] for shapefile in json.loads(b''.join(response.streaming_content)))
+
+    create_shapefile('NORTE', -44.0, -19.0)
+    south = create_shapefile('SUL', -44.0, -20.0)
+
+    assert fetch_names('-44.5,-19.5,-43.5,-18.5') == ['NORTE']
+    assert fetch_names('-45,-21,-43,-18') == ['NORTE', 'SUL']
+
+    # O índice é reconstruído quando um shapefile é alterado.
+    south.geojson = square_geojson(-44.0, -19.1)
+    south.save()
+    assert fetch_names('-44.5,-19.5,-43.5,-18.5') == ['NORTE', 'SUL']
+    assert shapefile_index.get_index() is shapefile_index.get_index()
+
+    response = get_shapefiles(RequestFactory().get('/api/shapefiles', {'bbox': '-43,-19,-44'}))
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_get_shapefiles_overview(location):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+    document = Document.objects.create(
+        name='TALHAO',
+        file='FORNECEDORES/TALHAO.zip',
+        document_type=DocumentType.SHAPEFILE,
+        geojson=square_geojson(-44.0, -19.0, points_per_side=10),
+        supplier=supplier,
+    )
+
+    # Um quadrado de 0,01° nessa latitude tem cerca de 1,1 km x 1,05 km.
+    assert document.area_ha == pytest.approx(117, rel=0.01)
+    assert document.vertex_count == 41
+
+    with CaptureQueriesContext(connection) as queries:
+        response = get_shapefiles_overview(RequestFactory().get('/api/shapefiles/overview', {'state': 'MG'}))
+        (overview,) = json.loads(b''.join(response.streaming_content))
+
+    # Apenas as consultas do ETag e a dos próprios documentos, sem tocar nas geometrias.
+    assert not any('gelfmp_documentgeometry"."geojson' in query['sql'] for query in queries)
+    assert overview['bbox'] == pytest.approx([-44.0, -19.0, -43.99, -18.99])
+    assert overview['centroid'] == pytest.approx([-43.995, -18.995])
+    assert overview['area_ha'] == document.area_ha
+    assert overview['supplier_id'] == supplier.id
+
+    response = get_shapefiles_overview(RequestFactory().get('/api/shapefiles/overview', {'state': 'SP'}))
+    assert json.loads(b''.join(response.streaming_content)) == []
+
+
+@pytest.mark.django_db
+def test_get_tile_encodes_and_caches_shapefiles(location, settings, tmp_path, django_capture_on_commit_callbacks):
+    settings.TILE_CACHE_DIR = tmp_path
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+
+    Document.objects.create(
+        name='TALHOES',
+        file='FORNECEDORES/TALHOES.zip',
+        document_type=DocumentType.SHAPEFILE,
+        geojson=square_geojson(-44.0, -19.0),
+        supplier=supplier,
+    )
+
+    # Tile de zoom 12 que contém o ponto (-44.0, -19.0).
+    z, x, y = 12, 1547, 2268
+    response = get_tile(RequestFactory().get(f'/api/tiles/{z}/{x}/{y}.mvt'), z, x, y)
+    assert response['Content-Type'] == 'application/vnd.mapbox-vector-tile'
+
+    layer = mapbox_vector_tile.decode(response.content)[vector_tiles.TILE_LAYER_NAME]
+    assert layer['features'][0]['properties']['name'] == 'TALHOES'
+    assert os.path.exists(vector_tiles.get_tile_path(z, x, y))
+
+    # Tiles sem nenhum shapefile também são válidos (e vazios).
+    assert mapbox_vector_tile.decode(vector_tiles.get_tile(z, x + 10, y)) == {}
+
+    # Salvar o documento sem alterar a geometria ou o nome mantém os tiles.
+    path = vector_tiles.get_tile_path(z, x, y)
+    with django_capture_on_commit_callbacks(execute=True):
+        Document.objects.filter(supplier=supplier, document_type=DocumentType.SHAPEFILE).first().save()
+
+    assert vector_tiles.get_tile_path(z, x, y) == path
+
+    # Os tiles exibem o nome do fornecedor, então renomeá-lo troca o diretório dos tiles e remove o anterior.
+    with django_capture_on_commit_callbacks(execute=True):
+        supplier.corporate_name = 'FORNECEDOR RENOMEADO'
+        supplier.save()
+
+    assert not os.path.exists(path)
+    assert os.listdir(tmp_path) == []
+
+    response = get_tile(RequestFactory().get(f'/api/tiles/{z}/{x}/{y}.mvt'), z, x, y)
+    layer = mapbox_vector_tile.decode(response.content)[vector_tiles.TILE_LAYER_NAME]
+    assert layer['features'][0]['properties']['supplier_name'] == 'FORNECEDOR RENOMEADO'
+    assert os.listdir(tmp_path) == [str(vector_tiles.get_version())]
+
+    assert get_tile(RequestFactory().get('/api/tiles/1/5/0.mvt'), 1, 5, 0).status_code == 400
+
+
+@pytest.mark.django_db
+def test_document_geojson_is_stored_outside_document_row(location):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+
+    document = Document.objects.create(
+        name='TALHOES',
+        file='FORNECEDORES/TALHOES.zip',
+        document_type=DocumentType.SHAPEFILE,
+        geojson=square_geojson(-44.0, -19.0),
+        supplier=supplier,
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        document = Document.objects.get(pk=document.pk)
+
+    assert 'geojson' not in queries[0]['sql']
+    assert (document.min_lon, document.max_lat) == pytest.approx((-44.0, -18.99))
+    assert (document.centroid_lon, document.centroid_lat) == pytest.approx((-43.995, -18.995))
+    assert document.geojson == square_geojson(-44.0, -19.0)
+
+    document.geojson = None
+    document.save()
+
+    assert document.min_lon is None
+    assert not document.geometries.exists()
+
+
+@pytest.mark.django_db
+def test_get_state_shapefiles_as_topojson(location, django_capture_on_commit_callbacks):
+    supplier = create_supplier(1, *location, entries=0, iqfs=0)
+
+    # Dois talhões vizinhos, que compartilham uma borda.
+    for name, x in (('OESTE', -44.0), ('LESTE', -43.99)):
+        Document.objects.create(
+            name=name,
+            file=f'FORNECEDORES/{name}.zip',
+            document_type=DocumentType.SHAPEFILE,
+            geojson=square_geojson(x, -19.0, points_per_side=50),
+            supplier=supplier,
+        )
+
+    def fetch_topojson():
+        request = RequestFactory().get('/api/shapefiles/MG', {'format': 'topojson'})
+        response = get_state_shapefiles(request, 'MG')
+        return response, json.loads(response.content)
+
+    response, data = fetch_topojson()
+    assert int(response['X-TopoJSON-Size']) < int(response['X-GeoJSON-Size'])
+
+    documents = {document['name']: document['id'] for document in data['documents']}
+    assert sorted(documents) == ['LESTE', 'OESTE']
+    assert data['topology']['type'] == 'Topology'
+    assert 'transform' in data['topology']
+
+    # A borda compartilhada é usada pelos dois polígonos (uma vez invertida).
+    west, east = (data['topology']['objects'][str(documents[name])]['geometries'][0] for name in ('OESTE', 'LESTE'))
+    west_arcs, east_arcs = ({arc if arc >= 0 else ~arc for arc in geometry['arcs'][0]} for geometry in (west, east))
+    assert west_arcs & east_arcs
+    assert west['properties'] == {}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Document.objects.filter(name='LESTE').delete()
+
+    _, data = fetch_topojson()
+    assert [document['name'] for document in data['documents']] == ['OESTE']
+
+    request = RequestFactory().get('/api/shapefiles/MG', {'format': 'kml'})
+    assert get_state_shapefiles(request, 'MG').status_code == 400
@@ -5,6 +5,13 @@ from django.template.loader import render_to_string
 from gelfcore.logger import log
 
 
+class ChartError(str):
+    """
+    Html de erro retornado no lugar do gráfico. Como o erro pode ser temporário
+    (ex: banco bloqueado), ele é exibido, mas não é guardado no cache dos gráficos.
+    """
+
+
 def handle_chart_error(function):
     """Decorador para lidar com erros em funções que geram gráficos plotly."""
 
@@ -15,10 +22,10 @@ def handle_chart_error(function):
 
         except (ValueError, KeyError) as e:
             log.error(f'at: {function.__module__}.{function.__name__} | {e}')
-            return render_to_string('components/errors/chart_error.html', {'error': str(e)})
+            return ChartError(render_to_string('components/errors/chart_error.html', {'error': str(e)}))
 
         except Exception as e:
             log.error(f'at: {function.__module__}.{function.__name__} | {e}')
-            return render_to_string('components/errors/internal.html')
+            return ChartError(render_to_string('components/errors/internal.html'))
 
     return wrapper
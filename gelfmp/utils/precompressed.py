@@ -0,0 +1,25 @@
+import gzip
+import os
+import tempfile
+
+import brotli
+
+# Extensão e função de compressão dos arquivos pré-comprimidos,
+# servidos diretamente pelo nginx (gzip_static) e pelo LocalStaticServer.
+PRECOMPRESSED_FORMATS = [
+    ('.gz', lambda content: gzip.compress(content, compresslevel=9, mtime=0)),
+    ('.br', lambda content: brotli.compress(content, quality=11)),
+]
+
+
+def write_precompressed(path, content):
+    """Grava o arquivo e as suas cópias pré-comprimidas de forma atômica."""
+
+    for extension, compress in [('', lambda content: content), *PRECOMPRESSED_FORMATS]:
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), delete=False) as temp:
+            temp.write(compress(content))
+
+        # O arquivo temporário é criado apenas com permissão para o dono,
+        # mas precisa ser lido pelo nginx.
+        os.chmod(temp.name, 0o644)
+        os.replace(temp.name, path + extension)
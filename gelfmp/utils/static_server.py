@@ -1,3 +1,4 @@
+import os
 import socket
 from functools import partial
 from http.server import HTTPServer, SimpleHTTPRequestHandler
@@ -7,6 +8,39 @@ from gelfcore.logger import log
 
 STATIC_SERVER_ADDRESS = '127.0.0.1'
 
+# Codificações aceitas e a extensão das cópias pré-comprimidas, em ordem de preferência.
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+class PrecompressedRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serve a cópia pré-comprimida (.br ou .gz) do arquivo quando ela existe e o cliente
+    aceita a codificação, da mesma forma que o `gzip_static` do nginx.
+    """
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        accepted = {part.split(';')[0].strip() for part in self.headers.get('Accept-Encoding', '').split(',')}
+
+        for encoding, extension in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted or not os.path.isfile(path + extension):
+                continue
+
+            file = open(path + extension, 'rb')
+            stat = os.fstat(file.fileno())
+
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(stat.st_size))
+            self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+
+            return file
+
+        return super().send_head()
+
 
 class LocalStaticServer:
     """Classe que cria um servidor estático para servir o `directory` informado"""
@@ -30,7 +64,7 @@ class LocalStaticServer:
             return
 
         log.info(f'Initializing static server on port {self.port}')
-        handler = partial(SimpleHTTPRequestHandler, directory=self.directory)
+        handler = partial(PrecompressedRequestHandler, directory=self.directory)
         self.server = HTTPServer((STATIC_SERVER_ADDRESS, self.port), handler)
         self.port = self.server.server_port
 
@@ -0,0 +1,47 @@
+import orjson
+from django.http import StreamingHttpResponse
+
+# Tamanho aproximado (em bytes) de cada pedaço enviado ao cliente.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Quantidade de linhas buscadas por vez no cursor do banco de dados.
+STREAM_CHUNK_SIZE = 500
+
+
+def raw_json(value):
+    """
+    Envolve um texto que já está em JSON para que o orjson o escreva
+    literalmente, sem precisar decodificá-lo e codificá-lo novamente.
+    """
+
+    return orjson.Fragment(value) if value is not None else None
+
+
+def json_array_chunks(items):
+    """Serializa os itens com orjson, gerando um array JSON de forma incremental."""
+
+    buffer = bytearray(b'[')
+    separator = b''
+
+    for item in items:
+        buffer += separator
+        buffer += orjson.dumps(item)
+        separator = b','
+
+        if len(buffer) >= STREAM_BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += b']'
+    yield bytes(buffer)
+
+
+class StreamingJSONArrayResponse(StreamingHttpResponse):
+    """
+    Resposta que envia um array JSON conforme os itens são produzidos,
+    evitando montar a lista inteira em memória antes de serializá-la.
+    """
+
+    def __init__(self, items, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(json_array_chunks(items), **kwargs)
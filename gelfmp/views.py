@@ -1,18 +1,30 @@
-from django.db.models import Q, Sum
+from urllib.parse import urlencode
+
+from django.db.models import Q
 from django.http import HttpRequest
 from django.shortcuts import redirect, render
+from django.urls import reverse
 from django.utils.timezone import now
 from httpx import ReadTimeout
 
 from gelfcore.router import Router
 from gelfmp.charts import charts, forms
-from gelfmp.models import CharcoalEntry, CharcoalMonthlyPlan, Supplier, SupplierType
+from gelfmp.charts import data as chart_data
+from gelfmp.charts.downsampling import DEFAULT_MAX_POINTS
+from gelfmp.models import Supplier, SupplierType
+from gelfmp.services import chart_cache
 from gelfmp.services.cnpj_info import CNPJInfoService
 
 router = Router()
 cnpj_service = CNPJInfoService()
 
 
+def lazy_chart_url(chart_id, **params):
+    """Monta a url usada pelo htmx para carregar o gráfico somente quando ele estiver visível."""
+
+    return f'{reverse("chart_html")}?{urlencode({"chart_id": chart_id, **params})}'
+
+
 @router()
 def index(request: HttpRequest):
     return render(request, 'index.html')
@@ -43,22 +55,26 @@ def charcoal_supplier_stats(request: HttpRequest, id):
             {
                 'id': 'supplier_charcoal_entries',
                 'form_id': 'supplier_stats_form',
-                'data': charts.supplier_charcoal_entries(supplier=id, html=True),
+                'url': lazy_chart_url('supplier_charcoal_entries', supplier=id, max_points=DEFAULT_MAX_POINTS),
                 'form': forms.CharcoalSupplierEntriesChartForm(supplier_id=id),
             },
             {
                 'id': 'supplier_iqfs_last_3_months',
-                'data': charts.supplier_iqfs_last_3_months(supplier_id=id, html=True),
+                'url': lazy_chart_url('supplier_iqfs_last_3_months', supplier_id=id),
             },
             {
                 'id': 'supplier_average_moisture_and_fines',
                 'form_id': 'supplier_stats_form',
-                'data': charts.supplier_average_moisture_and_fines(supplier=id, html=True),
+                'url': lazy_chart_url(
+                    'supplier_average_moisture_and_fines',
+                    supplier=id,
+                    max_points=DEFAULT_MAX_POINTS,
+                ),
             },
             {
                 'id': 'supplier_average_density',
                 'form_id': 'supplier_stats_form',
-                'data': charts.supplier_average_density(supplier=id, html=True),
+                'url': lazy_chart_url('supplier_average_density', supplier=id, max_points=DEFAULT_MAX_POINTS),
             },
         ],
     }
@@ -127,16 +143,16 @@ def charcoal_dashboard(request: HttpRequest):
             {
                 'id': 'charcoal_entries',
                 'form_id': 'charcoal_entries_form',
-                'data': charts.charcoal_entries(html=True),
+                'url': lazy_chart_url('charcoal_entries', max_points=DEFAULT_MAX_POINTS),
                 'form': forms.CharcoalEntriesChartForm(),
             },
             {
                 'id': 'average_density',
-                'data': charts.average_density(html=True),
+                'url': lazy_chart_url('average_density', max_points=DEFAULT_MAX_POINTS),
             },
             {
                 'id': 'average_moisture_and_fines',
-                'data': charts.average_moisture_and_fines(html=True),
+                'url': lazy_chart_url('average_moisture_and_fines', max_points=DEFAULT_MAX_POINTS),
             },
         ],
     }
@@ -144,71 +160,72 @@ def charcoal_dashboard(request: HttpRequest):
     return render(request, 'dashboard/charcoal.html', context=context)
 
 
-@router('dashboard/schedule/')
-def charcoal_schedule(request: HttpRequest):
-    current_year = now().year
+MONTH_LABELS = [
+    'Janeiro',
+    'Fevereiro',
+    'Março',
+    'Abril',
+    'Maio',
+    'Junho',
+    'Julho',
+    'Agosto',
+    'Setembro',
+    'Outubro',
+    'Novembro',
+    'Dezembro',
+]
+
 
-    year_plans = CharcoalMonthlyPlan.objects.filter(year=current_year).order_by(
-        'supplier__supplier_type',
-        'supplier__corporate_name',
-        'month',
-    )
+def build_charcoal_schedule(year):
+    """Monta a tabela de volumes programados e realizados por tipo de fornecedor e o gráfico do ano."""
 
     supplier_types = {supplier_type: display for supplier_type, display in SupplierType.choices}
     grouped_data = {supplier_type: {'planned': ['-'] * 12, 'realized': ['-'] * 12} for supplier_type in supplier_types}
 
-    for plan in year_plans:
-        month_index = plan.month - 1
-        supplier_type = plan.supplier.supplier_type
-
-        if grouped_data[supplier_type]['planned'][month_index] == '-':
-            grouped_data[supplier_type]['planned'][month_index] = 0
+    planned_volumes, realized_volumes = chart_data.schedule_volumes(year)
 
-        grouped_data[supplier_type]['planned'][month_index] += plan.planned_volume
+    for supplier_type, month, planned_volume in planned_volumes:
+        grouped_data[supplier_type]['planned'][month - 1] = planned_volume
 
-    charcoal_entries = (
-        CharcoalEntry.objects.filter(entry_date__year=current_year)
-        .values('supplier__supplier_type', 'entry_date__month')
-        .annotate(realized_volume=Sum('entry_volume'))
-    )
-
-    for entry in charcoal_entries:
-        supplier_type = entry['supplier__supplier_type']
-        month_index = entry['entry_date__month'] - 1
-        realized_volume = entry['realized_volume']
-
-        grouped_data[supplier_type]['realized'][month_index] = round(realized_volume, 2)
+    for supplier_type, month, realized_volume in realized_volumes:
+        grouped_data[supplier_type]['realized'][month - 1] = round(realized_volume, 2)
 
     table_data = [
         {'supplier_type': supplier_types[supplier_type], 'planned': data['planned'], 'realized': data['realized']}
         for supplier_type, data in grouped_data.items()
     ]
 
-    month_labels = [
-        'Janeiro',
-        'Fevereiro',
-        'Março',
-        'Abril',
-        'Maio',
-        'Junho',
-        'Julho',
-        'Agosto',
-        'Setembro',
-        'Outubro',
-        'Novembro',
-        'Dezembro',
-    ]
+    return {
+        'table_data': table_data,
+        'chart': charts.charcoal_schedule(table_data, year, MONTH_LABELS, html=True),
+    }
+
+
+def get_charcoal_schedule(year):
+    """
+    Retorna a programação do ano guardada no cache dos gráficos, que é invalidado
+    quando as entradas ou as programações mensais mudam. Retorna também se houve acerto no cache.
+    """
+
+    cache_key = f'charcoal_schedule_{chart_cache.get_version()}_{year}'
+    return chart_cache.get_or_build(cache_key, lambda: build_charcoal_schedule(year))
+
+
+@router('dashboard/schedule/')
+def charcoal_schedule(request: HttpRequest):
+    current_year = now().year
+    schedule, _ = get_charcoal_schedule(current_year)
 
     context = {
-        'table_data': table_data,
+        'table_data': schedule['table_data'],
         'year': current_year,
         'charts': [
             {
                 'id': 'charcoal_schedule',
-                'data': charts.charcoal_schedule(table_data, current_year, month_labels, html=True),
+                'data': schedule['chart'],
             },
         ],
-        'months': month_labels,
+        'months': MONTH_LABELS,
     }
 
     return render(request, 'dashboard/charcoal_schedule.html', context=context)
@@ -19,54 +19,61 @@ document.addEventListener("DOMContentLoaded", function () {
         }, 200);
     });
 
+    function renderChart(chartContainer, chartData) {
+        // Garante que qualquer html existente
+        // seja removido antes do novo gráfico
+        // ser adicionado ao container
+        chartContainer.innerHTML = "";
+
+        try {
+            const updatedChart = JSON.parse(chartData);
+
+            const plotlyConfig = {
+                displayModeBar: false,
+                showTips: false,
+            };
+
+            // IMPORTANTE: Plotly.purge para limpar o container antes
+            // de adicionar o novo gráfico, para limpar qualquer resto
+            // de html anterior (os que não foram adicionados pelo plotly)
+            Plotly.purge(chartContainer);
+
+            Plotly.react(chartContainer, updatedChart.data, updatedChart.layout, plotlyConfig);
+            Plotly.relayout(chartContainer, {
+                autosize: true,
+            });
+
+            Plotly.Plots.resize(chartContainer);
+        } catch {
+            chartContainer.innerHTML = chartData;
+        }
+    }
+
     /*
-        Event listener que escuta eventos
-        de submit para os forms de filtro
+        Atualiza todos os gráficos de um form em uma
+        única requisição, com os mesmos parâmetros
     */
-    async function updateChart(chartId, formData) {
+    async function updateCharts(chartIds, formData) {
         // Transforma os dados do form em parâmetros de URL
         const urlParams = new URLSearchParams();
+        chartIds.forEach((chartId) => {
+            urlParams.append("chart_id", chartId);
+        });
         formData.forEach((value, key) => {
             urlParams.append(key, value);
         });
 
-        const chartContainer = document.getElementById(chartId);
-
         try {
-            const response = await fetch(`${updateChartUrl}?chart_id=${chartId}&${urlParams.toString()}`, {
+            const response = await fetch(`${batchChartsUrl}?${urlParams.toString()}`, {
                 method: "GET",
             });
             if (response.ok) {
                 const data = await response.json();
-                const chartContainer = document.getElementById(chartId);
-
-                if (data.chart_data) {
-                    // Garante que qualquer html existente
-                    // seja removido antes do novo gráfico
-                    // ser adicionado ao container
-                    chartContainer.innerHTML = "";
-
-                    try {
-                        const updatedChart = JSON.parse(data.chart_data);
-
-                        const plotlyConfig = {
-                            displayModeBar: false,
-                            showTips: false,
-                        };
-
-                        // IMPORTANTE: Plotly.purge para limpar o container antes
-                        // de adicionar o novo gráfico, para limpar qualquer resto
-                        // de html anterior (os que não foram adicionados pelo plotly)
-                        Plotly.purge(chartContainer);
-
-                        Plotly.react(chartContainer, updatedChart.data, updatedChart.layout, plotlyConfig);
-                        Plotly.relayout(chartContainer, {
-                            autosize: true,
-                        });
-
-                        Plotly.Plots.resize(chartContainer);
-                    } catch {
-                        chartContainer.innerHTML = data.chart_data;
+
+                for (const [chartId, chartData] of Object.entries(data.charts)) {
+                    const chartContainer = document.getElementById(chartId);
+                    if (chartContainer && chartData) {
+                        renderChart(chartContainer, chartData);
                     }
                 }
             }
@@ -75,6 +82,10 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     }
 
+    /*
+        Event listener que escuta eventos
+        de submit para os forms de filtro
+    */
     document.addEventListener("submit", async function (e) {
         e.preventDefault();
 
@@ -82,11 +93,12 @@ document.addEventListener("DOMContentLoaded", function () {
         const filterID = form.getAttribute("id");
         const chartElements = document.querySelectorAll(`.plotly-chart[data-related-form="${filterID}"]`);
 
-        for (const ce of chartElements) {
-            const chartID = ce?.id;
-            if (chartID) {
-                updateChart(chartID, new FormData(form));
-            }
+        const chartIds = Array.from(chartElements)
+            .map((ce) => ce?.id)
+            .filter(Boolean);
+
+        if (chartIds.length) {
+            updateCharts(chartIds, new FormData(form));
         }
     });
 
@@ -100,12 +100,14 @@ export function SupplierCard(supplier: Supplier, borderColor: string, ratingColo
             ? `${Math.round((supplier.distance_in_meters / 1000) * 10) / 10} km`
             : " - ";
 
-    const documentRows = supplier.documents.reduce(
+    const documents = supplier.documents ?? [];
+
+    const documentRows = documents.reduce(
         (rows, document) => rows + documentTableRow(document.type.toUpperCase(), document),
         ""
     );
 
-    const hasDocuments = supplier.documents.length > 0;
+    const hasDocuments = documents.length > 0;
 
     return html`
         <div class="p-3 w-full text-slate-200" id="supplier-card-template">
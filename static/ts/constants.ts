@@ -4,22 +4,41 @@ export const APP_CONFIG: {
     geojson: {
         states: string;
         cities: string;
+        boundaryManifest: string;
+        boundaryLayer: string;
     };
     api: {
         suppliers: string;
-        shapefiles: (state: string) => string;
+        shapefiles: (bbox: string, zoom: number) => string;
+        stateShapefiles: (state: string, zoom: number) => string;
     };
 } = {
     geojson: {
         states: "static/data/geojson/br_states.json",
         cities: "static/data/geojson/geojs-{uf}-mun.json",
+        boundaryManifest: "static/data/boundaries/manifest.json",
+        boundaryLayer: "static/data/boundaries/{layer}.{level}.json",
     },
     api: {
         suppliers: "api/suppliers/",
-        shapefiles: (state) => `api/shapefiles/${state}`,
+        shapefiles: (bbox, zoom) => `api/shapefiles?bbox=${bbox}&zoom=${zoom}`,
+        stateShapefiles: (state, zoom) => `api/shapefiles/${state}?format=topojson&zoom=${zoom}`,
     },
 };
 
+export const SUPPLIER_MAP_FIELDS = [
+    "id",
+    "corporate_name",
+    "cpf_cnpj",
+    "material_type",
+    "rating",
+    "state",
+    "city",
+    "distance_in_meters",
+];
+
+export const SUPPLIER_DETAIL_FIELDS = ["id", "documents", "charcoal_recent_stats"];
+
 export const html = String.raw;
 export const DEFAULT_MATERIAL_TYPE = "Todos";
 export const BRAZIL_COORDINATES: [number, number] = [-14.235, -51.925];
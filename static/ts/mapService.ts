@@ -15,8 +15,16 @@ import {
     html,
 } from "./constants";
 
-import type { Cache, CitySuppliers, ShapefileData } from "./types";
+import type {
+    BoundaryManifest,
+    Cache,
+    CitySuppliers,
+    ShapefileData,
+    ShapefileInfo,
+    ShapefileTopology,
+} from "./types";
 import { supplierService } from "./supplierService";
+import { decodeTopology } from "./topojson";
 import { getCityKey, getRandomPastelColor } from "./utils";
 import { StyleService } from "./styleService";
 
@@ -48,8 +56,11 @@ class MapService {
     private activeMaterialType: string | null = null;
 
     private citiesGeojsonLayer: L.GeoJSON | null = null;
+    private activeCitiesLevel: string | null = null;
+    private boundaryManifest: Promise<BoundaryManifest | null> | null = null;
     private activeCityLayers = new Set<L.Layer>();
     private activeShapefileLayers = new Set<L.Layer>();
+    private loadedShapefileIds = new Set<number>();
 
 
     private indexedLayers: Map<string, L.Layer[]> = new Map();
@@ -94,6 +105,26 @@ class MapService {
                 */
                 this.disableSatelliteMode();
             }
+
+            /*
+                Recarrega os municípios do estado ativo caso o
+                novo zoom use outro nível de simplificação.
+            */
+            if (this.activeStateCode !== null && !this.inSatelliteMode) {
+                this.reloadCitiesIfLevelChanged();
+            }
+        });
+
+        this.map.on("moveend", () => {
+            /*
+                No modo satélite, carrega os shapefiles que
+                passaram a ficar visíveis após mover o mapa.
+                Com um estado ativo, todos os seus shapefiles
+                já foram carregados de uma vez.
+            */
+            if (this.inSatelliteMode && !this.activeStateFeature) {
+                this.loadVisibleShapefiles();
+            }
         });
     }
 
@@ -184,8 +215,9 @@ class MapService {
         const currentState = this.activeStateFeature?.id;
 
         if (showSatellite && currentState) {
-            const shapefiles: ShapefileData[] = await this.loadGeoJSON("shapefiles", currentState);
-            shapefiles.forEach((shapefile) => this.addShapefileLayer(shapefile));
+            await this.loadStateShapefiles(currentState);
+        } else if (showSatellite) {
+            await this.loadVisibleShapefiles();
         } else {
             /*
                 Caso showSatellite seja falso, limpa as
@@ -195,8 +227,71 @@ class MapService {
         }
     }
 
-    private addShapefileLayer(shapefile: ShapefileData) {
-        const geojson = JSON.parse(shapefile.geojson);
+    private async loadVisibleShapefiles() {
+        /*
+            Busca apenas os shapefiles que intersectam a área
+            visível do mapa, ignorando os que já foram adicionados.
+        */
+        const bbox = this.map.getBounds().toBBoxString();
+        const zoom = Math.round(this.map.getZoom());
+
+        try {
+            const response = await fetch(APP_CONFIG.api.shapefiles(bbox, zoom));
+            if (!response.ok) {
+                throw new Error("failed to load shapefiles");
+            }
+
+            const shapefiles: ShapefileData[] = await response.json();
+
+            shapefiles.forEach((shapefile) => {
+                if (!this.loadedShapefileIds.has(shapefile.id)) {
+                    this.addShapefileLayer(shapefile, JSON.parse(shapefile.geojson));
+                }
+            });
+        } catch (error) {
+            console.error("error loading shapefiles:", error);
+        }
+    }
+
+    private async loadStateShapefiles(state: string) {
+        /*
+            Busca todos os shapefiles do estado em TopoJSON, em que
+            as bordas compartilhadas entre propriedades vizinhas são
+            enviadas uma única vez, e os converte para GeoJSON.
+        */
+        const zoom = Math.round(this.map.getZoom());
+
+        try {
+            const response = await fetch(APP_CONFIG.api.stateShapefiles(state, zoom));
+            if (!response.ok) {
+                throw new Error(`failed to load shapefiles-${state}`);
+            }
+
+            const data: ShapefileTopology = await response.json();
+            if (!data.topology) {
+                return;
+            }
+
+            const collections = decodeTopology(data.topology);
+
+            data.documents.forEach((shapefile) => {
+                this.addShapefileLayer(shapefile, collections[shapefile.id.toString()]);
+            });
+        } catch (error) {
+            console.error(`error loading shapefiles-${state}:`, error);
+        }
+    }
+
+    private addShapefileLayer(shapefile: ShapefileInfo, geojson: any) {
+        /*
+            Ignora os shapefiles que já foram adicionados ao mapa.
+        */
+        if (this.loadedShapefileIds.has(shapefile.id)) {
+            return;
+        }
+
+        this.loadedShapefileIds.add(shapefile.id);
+
         const randomColor = getRandomPastelColor();
 
         const mainLayer = L.geoJSON(geojson, {
@@ -264,6 +359,7 @@ class MapService {
         });
 
         this.activeShapefileLayers.clear();
+        this.loadedShapefileIds.clear();
     }
 
     private searchShapefileLayers(query: string): Array<L.Layer> {
@@ -382,8 +478,55 @@ class MapService {
         `;
     }
 
-    private async loadGeoJSON(type: "states" | "cities" | "shapefiles", uf: string | null = null) {
-        const cacheKey = type === "states" ? type : `${type}-${uf}`;
+    private loadBoundaryManifest() {
+        /*
+            O manifesto lista as camadas simplificadas geradas pelo
+            comando build_boundary_layers. Sem ele, os arquivos
+            originais são usados.
+        */
+        if (!this.boundaryManifest) {
+            this.boundaryManifest = fetch(APP_CONFIG.geojson.boundaryManifest)
+                .then((response) => (response.ok ? (response.json() as Promise<BoundaryManifest>) : null))
+                .catch(() => null);
+        }
+
+        return this.boundaryManifest;
+    }
+
+    private async resolveGeoJSON(type: "states" | "cities", uf: string | null = null) {
+        const layer = type === "states" ? "states" : `cities-${uf}`;
+        const manifest = await this.loadBoundaryManifest();
+        const availableLevels = manifest?.layers[layer];
+
+        if (manifest && availableLevels) {
+            /*
+                Usa o primeiro nível disponível cujo zoom máximo
+                comporta o zoom atual do mapa (ou o último nível).
+            */
+            const zoom = this.map.getZoom();
+            const levels = manifest.levels.filter(({ level }) => availableLevels.includes(level));
+            const { level } =
+                levels.find(({ max_zoom }) => max_zoom === null || zoom <= max_zoom) ?? levels[levels.length - 1];
+
+            return {
+                level,
+                url: APP_CONFIG.geojson.boundaryLayer.replace("{layer}", layer).replace("{level}", level),
+            };
+        }
+
+        const url =
+            type === "states" ? APP_CONFIG.geojson.states : APP_CONFIG.geojson.cities.replace("{uf}", uf as string);
+
+        return { level: null, url };
+    }
+
+    private async loadGeoJSON(type: "states" | "cities", uf: string | null = null) {
+        /*
+            Define a URL do recurso com base no tipo, no estado
+            (se aplicável) e no nível de simplificação do zoom atual.
+        */
+        const { url } = await this.resolveGeoJSON(type, uf);
+        const cacheKey = url;
 
         /*
             Verifica se o GeoJSON já está em cache.
@@ -391,20 +534,6 @@ class MapService {
         */
         if (!this.cache.geojson.has(cacheKey)) {
             try {
-                let url = "";
-
-                /*
-                    Define a URL do recurso com base no tipo
-                    e no estado (se aplicável).
-                */
-                if (type === "shapefiles") {
-                    url = APP_CONFIG.api.shapefiles(uf as string);
-                } else if (type === "states") {
-                    url = APP_CONFIG.geojson.states;
-                } else if (type === "cities") {
-                    url = APP_CONFIG.geojson.cities.replace("{uf}", uf as string);
-                }
-
                 /*
                     Faz a requisição ao recurso e lança uma exceção
                     em caso de erro na resposta.
@@ -429,6 +558,15 @@ class MapService {
         return this.cache.geojson.get(cacheKey);
     }
 
+    private async reloadCitiesIfLevelChanged() {
+        const stateCode = this.activeStateCode!;
+        const { level } = await this.resolveGeoJSON("cities", stateCode.toString());
+
+        if (level !== this.activeCitiesLevel) {
+            await this.loadStateCities(stateCode);
+        }
+    }
+
     private cityStyleFunction(feature: any) {
         /*
             Calcula e retorna o estilo da cidade com base na
@@ -474,8 +612,10 @@ class MapService {
             });
             this.activeCityLayers.clear();
 
+            const { level } = await this.resolveGeoJSON("cities", stateCode.toString());
             const data = await this.loadGeoJSON("cities", stateCode.toString());
             this.activeStateCode = stateCode;
+            this.activeCitiesLevel = level;
 
             this.citiesGeojsonLayer = L.geoJSON(data, {
                 style: this.cityStyleFunction.bind(this),
@@ -546,7 +686,14 @@ class MapService {
     }
 
     async preloadCities() {
-        const states = Object.keys(STATE_CODE_MAP);
+        /*
+            Com o manifesto, pré-carrega apenas os estados cujas
+            camadas foram geradas (os que possuem fornecedores).
+        */
+        const manifest = await this.loadBoundaryManifest();
+        const states = Object.keys(STATE_CODE_MAP).filter(
+            (state) => !manifest || manifest.layers[`cities-${STATE_CODE_MAP[state]}`]
+        );
         const maxConcurrent = 5;
         const pool = [];
 
@@ -1,5 +1,13 @@
 import type { Supplier, CitySuppliers } from "./types";
-import { STATE_CODE_MAP, APP_CONFIG, GREEN_COLOR, ORANGE_COLOR, STROKE_COLOR } from "./constants";
+import {
+    STATE_CODE_MAP,
+    APP_CONFIG,
+    GREEN_COLOR,
+    ORANGE_COLOR,
+    STROKE_COLOR,
+    SUPPLIER_MAP_FIELDS,
+    SUPPLIER_DETAIL_FIELDS,
+} from "./constants";
 import { SupplierCard } from "./components/supplierCard";
 import { getCityKey } from "./utils";
 
@@ -8,8 +16,15 @@ class SupplierService {
     public supplierData: Supplier[] = [];
     public materialTypes: Set<string> = new Set();
 
+    private loadedDetails: Set<string> = new Set();
+
     async loadCitySuppliers() {
-        const response = await fetch(APP_CONFIG.api.suppliers);
+        /*
+            Carrega apenas os campos necessários para montar o mapa,
+            documentos e estatísticas são carregados ao abrir os detalhes.
+        */
+        const url = `${APP_CONFIG.api.suppliers}?fields=${SUPPLIER_MAP_FIELDS.join(",")}`;
+        const response = await fetch(url);
         this.supplierData = await response.json();
 
         const suppliers: CitySuppliers = {};
@@ -61,10 +76,40 @@ class SupplierService {
         });
     }
 
-    openDetails(cityKey: string, currentType: string | null) {
+    private async loadSupplierDetails(cityKey: string, suppliers: Supplier[]) {
+        if (this.loadedDetails.has(cityKey)) return;
+
+        const params = new URLSearchParams({
+            city: suppliers[0].city.id.toString(),
+            fields: SUPPLIER_DETAIL_FIELDS.join(","),
+        });
+
+        const response = await fetch(`${APP_CONFIG.api.suppliers}?${params.toString()}`);
+        if (!response.ok) return;
+
+        const details: Partial<Supplier>[] = await response.json();
+        const detailsById = new Map<number, Partial<Supplier>>();
+        details.forEach((detail) => detailsById.set(detail.id as number, detail));
+
+        // Completa os fornecedores do município com os detalhes carregados
+        for (const supplier of suppliers) {
+            const detail = detailsById.get(supplier.id);
+
+            if (detail) {
+                supplier.documents = detail.documents;
+                supplier.charcoal_recent_stats = detail.charcoal_recent_stats;
+            }
+        }
+
+        this.loadedDetails.add(cityKey);
+    }
+
+    async openDetails(cityKey: string, currentType: string | null) {
         let suppliers = this.citySuppliers[cityKey];
         if (!suppliers) return;
 
+        await this.loadSupplierDetails(cityKey, suppliers);
+
         const detailsTitle = document.querySelector("#details-title");
         const detailsElement = document.getElementById("details");
 
@@ -0,0 +1,118 @@
+import type { Topology, TopologyGeometry } from "./types";
+
+/*
+    Decodificador mínimo de TopoJSON: converte os objetos da topologia
+    em GeoJSON, reconstruindo as geometrias a partir dos arcos compartilhados.
+*/
+
+function decodeArcs(topology: Topology): number[][][] {
+    const transform = topology.transform;
+
+    return topology.arcs.map((arc) => {
+        if (!transform) {
+            return arc;
+        }
+
+        /*
+            Em topologias quantizadas, cada ponto do arco é
+            codificado como a diferença em relação ao anterior.
+        */
+        let x = 0;
+        let y = 0;
+
+        return arc.map((point) => {
+            x += point[0];
+            y += point[1];
+
+            return [x * transform.scale[0] + transform.translate[0], y * transform.scale[1] + transform.translate[1]];
+        });
+    });
+}
+
+function decodePosition(topology: Topology, position: number[]) {
+    const transform = topology.transform;
+
+    if (!transform) {
+        return position;
+    }
+
+    return [
+        position[0] * transform.scale[0] + transform.translate[0],
+        position[1] * transform.scale[1] + transform.translate[1],
+    ];
+}
+
+function decodeLine(arcs: number[][][], indexes: number[]) {
+    const coordinates: number[][] = [];
+
+    indexes.forEach((index, position) => {
+        // Índices negativos indicam que o arco é percorrido no sentido inverso.
+        const arc = index < 0 ? arcs[~index].slice().reverse() : arcs[index];
+
+        // O primeiro ponto de cada arco repete o último ponto do arco anterior.
+        for (let i = position > 0 ? 1 : 0; i < arc.length; i++) {
+            coordinates.push(arc[i]);
+        }
+    });
+
+    return coordinates;
+}
+
+function decodeGeometry(topology: Topology, arcs: number[][][], geometry: TopologyGeometry): any {
+    switch (geometry.type) {
+        case "Point":
+            return { type: geometry.type, coordinates: decodePosition(topology, geometry.coordinates) };
+        case "MultiPoint":
+            return {
+                type: geometry.type,
+                coordinates: geometry.coordinates.map((position: number[]) => decodePosition(topology, position)),
+            };
+        case "LineString":
+            return { type: geometry.type, coordinates: decodeLine(arcs, geometry.arcs) };
+        case "MultiLineString":
+        case "Polygon":
+            return {
+                type: geometry.type,
+                coordinates: geometry.arcs.map((line: number[]) => decodeLine(arcs, line)),
+            };
+        case "MultiPolygon":
+            return {
+                type: geometry.type,
+                coordinates: geometry.arcs.map((polygon: number[][]) =>
+                    polygon.map((ring) => decodeLine(arcs, ring))
+                ),
+            };
+        case "GeometryCollection":
+            return {
+                type: geometry.type,
+                geometries: (geometry.geometries || []).map((child) => decodeGeometry(topology, arcs, child)),
+            };
+        default:
+            return null;
+    }
+}
+
+export function decodeTopology(topology: Topology) {
+    /*
+        Retorna uma FeatureCollection GeoJSON para cada objeto
+        da topologia, indexadas pelo nome do objeto.
+    */
+    const arcs = decodeArcs(topology);
+    const collections: { [name: string]: any } = {};
+
+    Object.keys(topology.objects).forEach((name) => {
+        const object = topology.objects[name];
+        const geometries = object.type === "GeometryCollection" ? object.geometries || [] : [object];
+
+        collections[name] = {
+            type: "FeatureCollection",
+            features: geometries.map((geometry) => ({
+                type: "Feature",
+                properties: geometry.properties || {},
+                geometry: decodeGeometry(topology, arcs, geometry),
+            })),
+        };
+    });
+
+    return collections;
+}
@@ -9,6 +9,11 @@ export interface StateCodeMapping {
     [key: string]: number;
 }
 
+export interface BoundaryManifest {
+    levels: { level: string; max_zoom: number | null }[];
+    layers: { [layer: string]: string[] };
+}
+
 export interface Cache {
     geojson: Map<string, any>;
     suppliers: null | any;
@@ -21,6 +26,7 @@ export interface State {
 }
 
 export interface City {
+    id: number;
     name: string;
 }
 
@@ -40,8 +46,8 @@ export interface Supplier {
     material_type: string;
     distance_in_meters: number | null;
     rating: number;
-    documents: Document[];
-    charcoal_recent_stats: {
+    documents?: Document[];
+    charcoal_recent_stats?: {
         period: string;
         average_moisture: number;
         average_fines: number;
@@ -54,9 +60,35 @@ export interface CitySuppliers {
     [key: string]: Supplier[];
 }
 
-export interface ShapefileData {
+export interface ShapefileInfo {
     id: number;
     name: string;
     supplier_name: any;
+}
+
+export interface ShapefileData extends ShapefileInfo {
     geojson: string;
 }
+
+export interface TopologyGeometry {
+    type: string | null;
+    arcs?: any;
+    coordinates?: any;
+    geometries?: TopologyGeometry[];
+    properties?: any;
+}
+
+export interface Topology {
+    type: "Topology";
+    objects: { [name: string]: TopologyGeometry };
+    arcs: number[][][];
+    transform?: {
+        scale: [number, number];
+        translate: [number, number];
+    };
+}
+
+export interface ShapefileTopology {
+    documents: ShapefileInfo[];
+    topology: Topology | null;
+}